@@ -0,0 +1,193 @@
+"""
+순위 변동성 기반 수집 간격 조정
+observations의 최근 관측값에서 도서·서점별 순위가 얼마나 자주 바뀌는지 구해,
+자주 움직이는 순위는 짧은 간격으로, 거의 변하지 않는 순위(주간 갱신 카테고리 등)는
+긴 간격으로 수집합니다. 간격은 항상 최소/최대 간격 안에서 정해집니다.
+모니터의 URL 목록은 기본 도서의 서점별 간격을, 작업 큐는 작업(도서·서점)별 간격을 씁니다.
+
+간격 계산:
+    변화율 = 최근 window 동안 순위 지표 값이 바뀐 횟수 / 첫 관측~마지막 관측 시간
+    간격 = 1 / (변화율 × samples_per_change)   (변화 한 번에 samples_per_change번 수집)
+    기록이 min_samples보다 적으면 기본 간격, 변화가 없으면 최대 간격.
+    드문 수집으로 변화를 놓쳐 간격이 계속 늘어나지 않도록 한 번에 2배까지만 늘립니다.
+"""
+
+import logging
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import observations
+from storage import open_storage
+
+# 서점별 변동성을 볼 순위 지표 (판매지수처럼 꾸준히 오르는 누적값은 제외)
+VOLATILITY_METRICS = {
+    "kyobobook": ("domestic_rank", "it_rank"),
+    "yes24": ("it_mobile_rank",),
+    "aladin": ("computer_weekly_rank", "textbook_rank"),
+}
+MAX_GROWTH = 2.0  # 한 번에 늘릴 수 있는 간격 배수
+
+
+class AdaptiveSchedule:
+    def __init__(
+        self,
+        db_path: str,
+        default_interval: float = 30 * 60,
+        min_interval: float = 10 * 60,
+        max_interval: float = 6 * 60 * 60,
+        window: timedelta = timedelta(hours=72),
+        samples_per_change: float = 2.0,
+        min_samples: int = 6,
+        book_id: Optional[int] = None,
+    ):
+        """
+        Args:
+            db_path: observations가 있는 데이터베이스 경로
+            default_interval: 기록이 부족할 때 쓰는 간격(초)
+            min_interval: 가장 짧은 수집 간격(초)
+            max_interval: 가장 긴 수집 간격(초)
+            window: 변동성을 계산할 최근 기록 기간
+            samples_per_change: 순위 변화 한 번 사이에 수집할 횟수
+            min_samples: 변동성을 믿기 위한 최소 기록 수
+            book_id: 서점별 간격(due_stores/mark_collected)을 계산할 도서 (None이면 기본 도서)
+        """
+        if min_interval > max_interval:
+            raise ValueError("min_interval은 max_interval보다 클 수 없습니다")
+        self.db_path = db_path
+        self.storage = open_storage(db_path)
+        self.default_interval = min(max(default_interval, min_interval), max_interval)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.window = window
+        self.samples_per_change = samples_per_change
+        self.min_samples = min_samples
+        self.book_id = book_id
+        # 기본 도서의 서점별 현재 간격(초)과 다음 수집 시각(time.time 기준)
+        self.intervals: Dict[str, float] = {}
+        self.next_due: Dict[str, float] = {}
+
+    def change_rate(
+        self,
+        store: str,
+        book_id: Optional[int] = None,
+        conn: Optional[sqlite3.Connection] = None,
+    ) -> Optional[float]:
+        """
+        도서의 최근 관측값에서 초당 순위 변화 횟수 (기록이 부족하면 None)
+
+        값이 없는(순위권 밖이거나 실패한) 지표는 관측값이 없으므로 앞뒤 관측 모두 값이 있는
+        지표만 비교합니다. 다른 서점만 수집하며 이어 적은 값은 관측값이 아니라 세지 않습니다.
+
+        Args:
+            book_id: 도서 (None이면 이 스케줄의 도서)
+            conn: 열린 트랜잭션의 연결 (작업 큐 완료 기록처럼 쓰기 트랜잭션 안에서 계산할 때)
+        """
+        if conn is None:
+            try:
+                with self.storage.read() as conn:
+                    return self.change_rate(store, book_id, conn)
+            except sqlite3.Error as e:
+                logging.warning(f"수집 간격 계산용 기록을 읽을 수 없습니다: {e}")
+                return None
+
+        metrics = VOLATILITY_METRICS.get(store, ())
+        if book_id is None:
+            book_id = self.book_id or observations.default_book_id(conn)
+        if book_id is None or not metrics:
+            return None
+        # 기본 키 (book_id, ts, ...) 범위 스캔
+        rows = conn.execute(
+            f"SELECT ts, metric, value FROM observations "
+            f"WHERE book_id = ? AND ts >= ? AND store = ? "
+            f"AND metric IN ({', '.join('?' * len(metrics))}) ORDER BY ts",
+            (book_id, datetime.now() - self.window, store, *metrics),
+        )
+
+        samples = 0
+        changes = 0
+        previous: Dict[str, object] = {}
+        current: Dict[str, object] = {}
+        first = last = None
+        for ts, metric, value in [*rows, (None, None, None)]:
+            if ts != last and current:
+                # 관측 시각 하나의 지표 값을 모두 모았으면 직전 관측과 비교
+                if previous and any(
+                    item != previous[name] for name, item in current.items() if name in previous
+                ):
+                    changes += 1
+                previous = current
+                current = {}
+                samples += 1
+            if ts is None:
+                break
+            current[metric] = value
+            first = first or ts
+            last = ts
+
+        if samples < self.min_samples:
+            return None
+        span = (
+            datetime.fromisoformat(str(last)) - datetime.fromisoformat(str(first))
+        ).total_seconds()
+        if span <= 0:
+            return None
+        return changes / span
+
+    def interval_for(
+        self,
+        store: str,
+        book_id: Optional[int] = None,
+        current: Optional[float] = None,
+        default: Optional[float] = None,
+        conn: Optional[sqlite3.Connection] = None,
+    ) -> float:
+        """
+        최근 변동성으로 정한 다음 수집 간격(초)
+
+        Args:
+            book_id: 도서 (None이면 이 스케줄의 도서, 현재 간격은 서점별 간격)
+            current: 지금 간격 (한 번에 MAX_GROWTH배까지만 늘림, book_id를 주면 호출한 쪽이 관리)
+            default: 기록이 부족할 때 쓸 간격 (None이면 default_interval)
+            conn: change_rate와 같음
+        """
+        rate = self.change_rate(store, book_id, conn)
+        if rate is None:
+            interval = self.default_interval if default is None else default
+        elif rate == 0:
+            interval = self.max_interval
+        else:
+            interval = 1 / (rate * self.samples_per_change)
+
+        if current is None and book_id is None:
+            current = self.intervals.get(store)
+        if current is not None:
+            interval = min(interval, current * MAX_GROWTH)
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def due_stores(self, stores: List[str], now: Optional[float] = None) -> List[str]:
+        """지금 수집할 차례인 서점 (아직 한 번도 수집하지 않은 서점 포함)"""
+        now = time.time() if now is None else now
+        return [store for store in stores if self.next_due.get(store, 0.0) <= now]
+
+    def mark_collected(self, stores: List[str], now: Optional[float] = None):
+        """수집을 마친 서점의 간격을 다시 계산하고 다음 수집 시각 지정"""
+        now = time.time() if now is None else now
+        for store in stores:
+            interval = self.interval_for(store)
+            self.intervals[store] = interval
+            self.next_due[store] = now + interval
+            logging.info(
+                f"⏲️ {store} 다음 수집까지 {interval / 60:.0f}분 "
+                f"({datetime.fromtimestamp(now + interval).strftime('%H:%M')})"
+            )
+
+    def summary(self, stores: List[str]) -> List[str]:
+        """서점별 변화율과 현재 기록 기준 수집 간격"""
+        lines = []
+        for store in stores:
+            rate = self.change_rate(store)
+            rate_text = "기록 부족" if rate is None else f"시간당 변화 {rate * 3600:.2f}회"
+            lines.append(f"{store}: {rate_text} → 간격 {self.interval_for(store) / 60:.0f}분")
+        return lines
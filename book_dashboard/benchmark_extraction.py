@@ -0,0 +1,138 @@
+"""
+순위 추출 패턴 벤치마크
+저장해 둔 상품 페이지 HTML로 기존 방식(호출마다 패턴 목록을 re.search로 순회)과
+미리 컴파일한 ExtractionPlan의 추출 시간을 비교합니다.
+
+사용 예:
+    uv run python benchmark_extraction.py --kyobobook kyobo.html --yes24 yes24.html --aladin aladin.html
+"""
+
+import argparse
+import logging
+import re
+import time
+from typing import Callable, Dict, List
+
+from bs4 import BeautifulSoup
+
+from summary_yozm_ai_agent_info import (
+    ALADIN_COMPUTER_PLAN,
+    ALADIN_PERIOD_PLAN,
+    ALADIN_SALES_PLAN,
+    ALADIN_TEXTBOOK_PLAN,
+    KYOBO_DOMESTIC_PLAN,
+    KYOBO_IT_PLAN,
+    KYOBO_RANK_AREAS,
+    YES24_PAGE_IT_PLAN,
+    YES24_RANK_CLASSES,
+    YES24_SALES_PLAN,
+    ExtractionPlan,
+)
+
+# 서점별로 검사할 추출 계획과 폴백 섹션 선택자
+STORE_PLANS = {
+    "kyobobook": [KYOBO_DOMESTIC_PLAN, KYOBO_IT_PLAN],
+    "yes24": [YES24_SALES_PLAN, YES24_PAGE_IT_PLAN],
+    "aladin": [
+        ALADIN_COMPUTER_PLAN,
+        ALADIN_TEXTBOOK_PLAN,
+        ALADIN_PERIOD_PLAN,
+        ALADIN_SALES_PLAN,
+    ],
+}
+STORE_SECTION_CLASSES = {
+    "kyobobook": KYOBO_RANK_AREAS,
+    "yes24": YES24_RANK_CLASSES,
+    "aladin": [],
+}
+
+
+def legacy_search(plan: ExtractionPlan, text: str):
+    """기존 방식: 패턴 문자열을 하나씩 re.search"""
+    for compiled in plan.patterns:
+        match = re.search(compiled.pattern, text, compiled.flags)
+        if match:
+            value = match.group(1)
+            if plan.accept is None or plan.accept(value):
+                return value
+    return None
+
+
+def plan_search(plan: ExtractionPlan, text: str):
+    """새 방식: 미리 컴파일한 통합 패턴"""
+    return plan.search(text)
+
+
+def collect_texts(store: str, html: str) -> List[str]:
+    """폴백 단계까지 모두 거쳤을 때 검사하게 되는 텍스트 목록"""
+    soup = BeautifulSoup(html, "html.parser")
+    texts = [soup.get_text()]
+    for class_name in STORE_SECTION_CLASSES[store]:
+        section = soup.find("div", class_=class_name)
+        if section:
+            texts.append(section.get_text())
+    texts.extend(dl.get_text() for dl in soup.find_all("dl"))
+    return texts
+
+
+def time_extraction(
+    search: Callable, plans: List[ExtractionPlan], texts: List[str], rounds: int
+) -> float:
+    """추출 한 번당 평균 소요 시간(ms)"""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            for plan in plans:
+                search(plan, text)
+    return (time.perf_counter() - started) / rounds * 1000
+
+
+def run_benchmark(fixtures: Dict[str, str], rounds: int):
+    logging.info("========== ⏱️ 추출 패턴 벤치마크 ==========")
+    for store, path in fixtures.items():
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+
+        texts = collect_texts(store, html)
+        plans = STORE_PLANS[store]
+
+        # 두 방식의 결과가 같은지 먼저 확인
+        for text in texts:
+            for plan in plans:
+                if legacy_search(plan, text) != plan_search(plan, text):
+                    logging.error(f"{store}: 결과 불일치 ({plan.patterns[0].pattern})")
+
+        legacy_ms = time_extraction(legacy_search, plans, texts, rounds)
+        plan_ms = time_extraction(plan_search, plans, texts, rounds)
+        logging.info(
+            f"{store}: 텍스트 {len(texts)}개, 기존 {legacy_ms:.3f}ms → "
+            f"추출 계획 {plan_ms:.3f}ms ({legacy_ms / plan_ms:.2f}배)"
+        )
+    logging.info("========================================")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="순위 추출 패턴 벤치마크")
+    parser.add_argument("--kyobobook", help="교보문고 상품 페이지 HTML 파일")
+    parser.add_argument("--yes24", help="YES24 상품 페이지 HTML 파일")
+    parser.add_argument("--aladin", help="알라딘 상품 페이지 HTML 파일")
+    parser.add_argument("--rounds", type=int, default=200, help="반복 횟수")
+    args = parser.parse_args()
+
+    fixtures = {
+        store: path
+        for store, path in (
+            ("kyobobook", args.kyobobook),
+            ("yes24", args.yes24),
+            ("aladin", args.aladin),
+        )
+        if path
+    }
+    if not fixtures:
+        parser.error("HTML 파일을 하나 이상 지정해주세요")
+
+    run_benchmark(fixtures, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
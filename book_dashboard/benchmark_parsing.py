@@ -0,0 +1,91 @@
+"""
+HTML 파싱 벤치마크
+저장해 둔 상품 페이지 HTML로 전체 트리 파싱(html.parser)과 순위 영역만 파싱하는
+빠른 경로의 페이지당 파싱 시간과 최대 메모리 사용량을 비교합니다.
+
+사용 예:
+    uv run python benchmark_parsing.py --kyobobook kyobo.html --yes24 yes24.html --aladin aladin.html
+"""
+
+import argparse
+import logging
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from summary_yozm_ai_agent_info import (
+    ALADIN_REGIONS,
+    KYOBO_REGIONS,
+    PARTIAL_PARSER,
+    YES24_REGIONS,
+)
+
+STORE_REGIONS = {
+    "kyobobook": KYOBO_REGIONS,
+    "yes24": YES24_REGIONS,
+    "aladin": ALADIN_REGIONS,
+}
+
+
+def measure(parse, rounds: int):
+    """파싱 한 번당 평균 시간(ms)과 최대 메모리(KB)"""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        parse()
+    elapsed_ms = (time.perf_counter() - started) / rounds * 1000
+
+    tracemalloc.start()
+    parse()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed_ms, peak / 1024
+
+
+def run_benchmark(fixtures, rounds: int):
+    logging.info(f"========== ⏱️ 파싱 벤치마크 (빠른 경로: {PARTIAL_PARSER}) ==========")
+    for store, path in fixtures.items():
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+
+        regions = STORE_REGIONS[store]
+        full_ms, full_kb = measure(lambda: BeautifulSoup(html, "html.parser"), rounds)
+        partial_ms, partial_kb = measure(
+            lambda: BeautifulSoup(html, PARTIAL_PARSER, parse_only=regions), rounds
+        )
+
+        logging.info(
+            f"{store} ({len(html) / 1024:.0f}KB): "
+            f"전체 {full_ms:.1f}ms / {full_kb:.0f}KB → "
+            f"부분 {partial_ms:.1f}ms / {partial_kb:.0f}KB "
+            f"(시간 {full_ms / partial_ms:.2f}배, 메모리 {full_kb / partial_kb:.2f}배)"
+        )
+    logging.info("========================================")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML 파싱 벤치마크")
+    parser.add_argument("--kyobobook", help="교보문고 상품 페이지 HTML 파일")
+    parser.add_argument("--yes24", help="YES24 상품 페이지 HTML 파일")
+    parser.add_argument("--aladin", help="알라딘 상품 페이지 HTML 파일")
+    parser.add_argument("--rounds", type=int, default=20, help="반복 횟수")
+    args = parser.parse_args()
+
+    fixtures = {
+        store: path
+        for store, path in (
+            ("kyobobook", args.kyobobook),
+            ("yes24", args.yes24),
+            ("aladin", args.aladin),
+        )
+        if path
+    }
+    if not fixtures:
+        parser.error("HTML 파일을 하나 이상 지정해주세요")
+
+    run_benchmark(fixtures, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
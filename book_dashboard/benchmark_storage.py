@@ -0,0 +1,249 @@
+"""
+SQLite 저장소 벤치마크
+대시보드처럼 차트 조회를 계속 보내는 읽기 프로세스들을 띄워 두고, 모니터처럼 book_rankings에
+행을 저장하며 저장/조회 지연시간 백분위수와 잠금 오류 수를 비교합니다.
+
+    legacy: 호출마다 sqlite3.connect, 롤백 저널 (기존 방식)
+    wal: storage.Storage (WAL, synchronous=NORMAL, mmap, 스레드별 장기 연결)
+    buffered: wal + write_buffer.WriteBuffer (스풀에 기록 후 --flush-rows개씩 executemany로 그룹 커밋)
+
+사용 예:
+    uv run python benchmark_storage.py --rows 20000 --readers 4 --inserts 300
+    uv run python benchmark_storage.py --inserts 2000 --insert-interval 0 --modes wal buffered
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import observations
+from book_ranking_monitor import BookRankingMonitor
+from storage import Storage
+from summary_yozm_ai_agent_info import percentile
+from write_buffer import WriteBuffer
+
+CHART_QUERY = """
+SELECT timestamp, kyobo_domestic_rank, kyobo_it_rank, yes24_sales_index, yes24_it_mobile_rank,
+       aladin_computer_weekly_rank, aladin_textbook_rank, aladin_sales_point
+FROM book_rankings WHERE timestamp >= ? ORDER BY timestamp
+"""
+INSERT_QUERY = """
+INSERT INTO book_rankings (timestamp, scraping_date, kyobo_domestic_rank, kyobo_it_rank,
+    yes24_sales_index, yes24_it_mobile_rank, aladin_computer_weekly_rank, aladin_sales_point, raw_data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+# 실제 수집 결과와 비슷한 크기의 raw_data
+RAW_DATA = json.dumps(
+    {store: {"url": "https://example.com/" + "x" * 80, "timings": list(range(40))}
+     for store in ("kyobobook", "yes24", "aladin")}
+)
+
+
+def row_values(timestamp: datetime, index: int):
+    return (
+        # 스풀(JSON)에도 쓸 수 있도록 sqlite3의 datetime 저장 형식 문자열로
+        timestamp.isoformat(" "),
+        timestamp.isoformat(),
+        index % 500,
+        index % 50,
+        100000 + index,
+        index % 30,
+        index % 40,
+        50000 + index,
+        RAW_DATA,
+    )
+
+
+def seed_database(db_path: str, rows: int, wal: bool):
+    """최근 7일에 걸친 rows개 행으로 DB 준비"""
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+    BookRankingMonitor.create_tables(conn)
+    # buffered 모드의 스풀 저장 위치 기록용 observation_meta
+    observations.create_tables(conn)
+    start = datetime.now() - timedelta(days=7)
+    step = timedelta(days=7) / max(rows, 1)
+    conn.executemany(
+        INSERT_QUERY, [row_values(start + step * index, index) for index in range(rows)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def reader_process(db_path: str, mode: str, hours: int, stop, results):
+    """차트 조회를 stop까지 반복하며 지연시간(초)과 오류 수 보고"""
+    storage = Storage(db_path) if mode != "legacy" else None
+    latencies = []
+    errors = 0
+    while not stop.is_set():
+        since = datetime.now() - timedelta(hours=hours)
+        started = time.perf_counter()
+        try:
+            if storage is not None:
+                with storage.read() as conn:
+                    conn.execute(CHART_QUERY, (since,)).fetchall()
+            else:
+                conn = sqlite3.connect(db_path)
+                try:
+                    conn.execute(CHART_QUERY, (since,)).fetchall()
+                finally:
+                    conn.close()
+        except sqlite3.OperationalError:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    if storage is not None:
+        storage.close()
+    results.put((latencies, errors))
+
+
+def run_writer(db_path: str, mode: str, inserts: int, interval: float, flush_rows: int):
+    """모니터처럼 한 행씩 저장하며 지연시간(초), 오류 수, 전체 걸린 시간(초) 측정"""
+    storage = Storage(db_path) if mode != "legacy" else None
+    buffer = None
+    if mode == "buffered":
+        buffer = WriteBuffer(
+            storage,
+            lambda conn, entries: conn.executemany(
+                INSERT_QUERY, [entry["values"] for entry in entries]
+            ),
+            spool_path=db_path + ".spool",
+            max_rows=flush_rows,
+            flush_seconds=float("inf"),
+        )
+    latencies = []
+    errors = 0
+    started_all = time.perf_counter()
+    for index in range(inserts):
+        values = row_values(datetime.now(), index)
+        started = time.perf_counter()
+        try:
+            if buffer is not None:
+                # 저장 지연시간은 flush_rows번에 한 번 있는 그룹 커밋 포함
+                buffer.add({"values": values})
+            elif storage is not None:
+                with storage.write() as conn:
+                    conn.execute(INSERT_QUERY, values)
+            else:
+                conn = sqlite3.connect(db_path)
+                try:
+                    conn.execute(INSERT_QUERY, values)
+                    conn.commit()
+                finally:
+                    conn.close()
+            latencies.append(time.perf_counter() - started)
+        except sqlite3.OperationalError:
+            errors += 1
+        if interval:
+            time.sleep(interval)
+    if buffer is not None:
+        buffer.close()
+    elapsed = time.perf_counter() - started_all
+    if storage is not None:
+        storage.close()
+    return latencies, errors, elapsed
+
+
+def run_mode(mode: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, f"{mode}.db")
+        seed_database(db_path, args.rows, wal=mode != "legacy")
+
+        context = multiprocessing.get_context("spawn")
+        stop = context.Event()
+        results = context.Queue()
+        readers = [
+            context.Process(
+                target=reader_process, args=(db_path, mode, args.hours, stop, results)
+            )
+            for _ in range(args.readers)
+        ]
+        for reader in readers:
+            reader.start()
+        # 읽기 프로세스가 조회를 시작할 때까지 잠깐 대기
+        time.sleep(1.0)
+
+        write_latencies, write_errors, write_elapsed = run_writer(
+            db_path, mode, args.inserts, args.insert_interval, args.flush_rows
+        )
+        stop.set()
+        read_latencies = []
+        read_errors = 0
+        for _ in readers:
+            latencies, errors = results.get()
+            read_latencies.extend(latencies)
+            read_errors += errors
+        for reader in readers:
+            reader.join()
+
+    return {
+        "write": write_latencies,
+        "write_errors": write_errors,
+        "write_elapsed": write_elapsed,
+        "read": read_latencies,
+        "read_errors": read_errors,
+    }
+
+
+def latency_line(latencies) -> str:
+    if not latencies:
+        return "기록 없음"
+    return (
+        f"p50 {percentile(latencies, 50) * 1000:.1f}ms, "
+        f"p90 {percentile(latencies, 90) * 1000:.1f}ms, "
+        f"p99 {percentile(latencies, 99) * 1000:.1f}ms, "
+        f"max {max(latencies) * 1000:.1f}ms"
+    )
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="SQLite 저장소 동시 읽기/쓰기 벤치마크")
+    parser.add_argument("--rows", type=int, default=20000, help="미리 채울 행 수 (7일치)")
+    parser.add_argument("--readers", type=int, default=4, help="차트 조회 프로세스 수")
+    parser.add_argument("--hours", type=int, default=24, help="차트 조회 기간(시간)")
+    parser.add_argument("--inserts", type=int, default=300, help="저장할 행 수")
+    parser.add_argument(
+        "--insert-interval", type=float, default=0.01, help="저장 사이 간격(초)"
+    )
+    parser.add_argument(
+        "--flush-rows", type=int, default=100, help="buffered 모드에서 한 번에 커밋할 행 수"
+    )
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        default=["legacy", "wal", "buffered"],
+        choices=["legacy", "wal", "buffered"],
+    )
+    args = parser.parse_args()
+
+    logging.info(
+        f"========== 🗃️ 저장소 벤치마크 (행 {args.rows}개, 읽기 프로세스 {args.readers}개, "
+        f"차트 {args.hours}시간) =========="
+    )
+    for mode in args.modes:
+        result = run_mode(mode, args)
+        logging.info(f"[{mode}]")
+        logging.info(
+            f"  저장 {len(result['write'])}건 (잠금 오류 {result['write_errors']}건): "
+            f"{latency_line(result['write'])}"
+        )
+        logging.info(
+            f"  저장 처리량: {len(result['write']) / result['write_elapsed']:.0f}건/초 "
+            f"(전체 {result['write_elapsed']:.2f}초)"
+        )
+        logging.info(
+            f"  조회 {len(result['read'])}건 (잠금 오류 {result['read_errors']}건): "
+            f"{latency_line(result['read'])}"
+        )
+    logging.info("========================================")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+스트리밍 조기 종료 벤치마크
+녹화해 둔 상품 페이지 픽스처를 재생하며 전체 다운로드와 스트리밍 조기 종료의
+페이지당 수신 바이트와 결과까지 걸린 시간을 비교합니다.
+
+사용 예:
+    uv run python benchmark_streaming.py --fixtures fixtures/ --bandwidth 500000
+"""
+
+import argparse
+import logging
+import time
+
+from bestseller_lists import product_id_from_url
+from fixture_store import FixtureStore
+from summary_yozm_ai_agent_info import (
+    PRODUCT_URL_TEMPLATES,
+    BookRankingScraper,
+)
+
+RESULT_FIELDS = {
+    "kyobobook": ("domestic_rank", "it_rank"),
+    "yes24": ("sales_index", "it_mobile_rank"),
+    "aladin": ("computer_weekly_rank", "textbook_rank", "sales_point", "rank_period"),
+}
+
+
+def product_store(url: str):
+    """녹화된 URL이 서점 상품 페이지면 서점 이름"""
+    for store, template in PRODUCT_URL_TEMPLATES.items():
+        host = template.split("/")[2]
+        if host in url and product_id_from_url(store, url):
+            return store
+    return None
+
+
+def run_once(scraper: BookRankingScraper, store: str, url: str):
+    """상품 페이지 하나를 받아 추출하고 (결과, 수신 바이트, 걸린 시간) 반환"""
+    scraper.bytes_received = 0
+    data = scraper.new_store_data(store, url)
+    started = time.perf_counter()
+    html = scraper.fetch_page(url, store)
+    if html:
+        # 구조화 소스(YES24 모듈 등)는 두 방식 모두 전체를 받으므로 상품 페이지만 비교한다
+        data = scraper.parse_store(store, data, html)
+    return data, scraper.bytes_received, time.perf_counter() - started
+
+
+def run_benchmark(fixtures: str, bandwidth: float, latency: float, module_only: bool):
+    options = dict(
+        replay_dir=fixtures,
+        replay_latency=latency,
+        replay_bandwidth=bandwidth,
+        yes24_module_only=module_only,
+    )
+    full = BookRankingScraper(**options)
+    streaming = BookRankingScraper(streaming=True, **options)
+
+    urls = [
+        (store, url)
+        for url in FixtureStore(fixtures).urls()
+        if (store := product_store(url)) is not None
+    ]
+    if not urls:
+        logging.error(f"상품 페이지 픽스처가 없습니다: {fixtures}")
+        return
+
+    logging.info(
+        f"========== ⏱️ 스트리밍 벤치마크 ({len(urls)}페이지, "
+        f"{bandwidth / 1024:.0f}KB/s) =========="
+    )
+    totals = [0, 0, 0.0, 0.0]
+    try:
+        for store, url in urls:
+            full_data, full_bytes, full_sec = run_once(full, store, url)
+            stream_data, stream_bytes, stream_sec = run_once(streaming, store, url)
+            totals[0] += full_bytes
+            totals[1] += stream_bytes
+            totals[2] += full_sec
+            totals[3] += stream_sec
+
+            same = all(
+                full_data.get(field) == stream_data.get(field)
+                for field in RESULT_FIELDS[store]
+            )
+            logging.info(
+                f"{store} {url}: {full_bytes / 1024:.0f}KB/{full_sec * 1000:.0f}ms → "
+                f"{stream_bytes / 1024:.0f}KB/{stream_sec * 1000:.0f}ms"
+                f"{'' if same else ' ⚠️ 결과 다름'}"
+            )
+    finally:
+        full.close()
+        streaming.close()
+
+    full_bytes, stream_bytes, full_sec, stream_sec = totals
+    logging.info(
+        f"합계: 수신 {full_bytes / 1024:.0f}KB → {stream_bytes / 1024:.0f}KB "
+        f"({stream_bytes / full_bytes * 100:.0f}%), "
+        f"시간 {full_sec:.2f}초 → {stream_sec:.2f}초"
+    )
+    logging.info("========================================")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스트리밍 조기 종료 벤치마크")
+    parser.add_argument("--fixtures", required=True, help="녹화된 픽스처 디렉토리")
+    parser.add_argument(
+        "--bandwidth",
+        type=float,
+        default=1024 * 1024,
+        help="재생 전송 속도(bytes/s, 0이면 제한 없음)",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="재생 시 응답 지연시간(초)"
+    )
+    parser.add_argument(
+        "--yes24-module-only",
+        action="store_true",
+        help="YES24는 메인 페이지에서 판매지수만 찾기 (모듈 전용 모드)",
+    )
+    args = parser.parse_args()
+
+    run_benchmark(args.fixtures, args.bandwidth, args.latency, args.yes24_module_only)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+카테고리 베스트셀러 목록 수집
+서점별 카테고리 베스트셀러 목록을 주기마다 한 번씩 받아 상품 ID → 순위 색인을 만들고,
+추적 중인 모든 도서의 순위를 이 색인에서 찾습니다.
+추적하는 도서가 늘어도 요청 수는 목록 페이지 수만큼으로 고정됩니다.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+
+class BestsellerList:
+    def __init__(
+        self,
+        name: str,
+        url_template: str,
+        id_pattern: str,
+        rank_field: str,
+        link_class: Optional[str] = None,
+        pages: int = 5,
+        extra_fields: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Args:
+            name: 목록 이름 (로그용)
+            url_template: {page}를 포함한 목록 URL
+            id_pattern: 상품 ID를 그룹 1로 잡는 정규식
+            rank_field: 색인에서 찾은 순위를 넣을 결과 필드
+            link_class: 목록 항목 제목 링크의 class (None이면 본문 전체에서 id_pattern 검색)
+            pages: 가져올 목록 페이지 수
+            extra_fields: 순위와 함께 채울 고정 필드 (예: 순위 기간)
+        """
+        self.name = name
+        self.url_template = url_template
+        self.id_pattern = re.compile(id_pattern, re.IGNORECASE)
+        self.rank_field = rank_field
+        self.link_class = link_class
+        self.pages = pages
+        self.extra_fields = extra_fields or {}
+        self.strainer = SoupStrainer("a", class_=link_class) if link_class else None
+
+    def page_urls(self) -> List[str]:
+        return [self.url_template.format(page=page) for page in range(1, self.pages + 1)]
+
+    def extract_ids(self, body: str) -> List[str]:
+        """목록 페이지 하나에서 상품 ID를 노출 순서대로 추출 (중복 제거)"""
+        if self.strainer is None:
+            found = self.id_pattern.findall(body)
+        else:
+            soup = BeautifulSoup(body, "html.parser", parse_only=self.strainer)
+            found = []
+            for link in soup.find_all("a"):
+                match = self.id_pattern.search(link.get("href", ""))
+                if match:
+                    found.append(match.group(1))
+        return list(dict.fromkeys(found))
+
+    def build_index(self, bodies: Iterable[Optional[str]]) -> Dict[str, int]:
+        """
+        페이지 순서대로 받은 목록 본문으로 상품 ID → 순위 색인 생성
+
+        중간 페이지를 가져오지 못하면 뒤 페이지 순위가 밀리므로 그 앞까지만 색인합니다.
+        """
+        index: Dict[str, int] = {}
+        for body in bodies:
+            if not body:
+                break
+            for product_id in self.extract_ids(body):
+                index.setdefault(product_id, len(index) + 1)
+        return index
+
+
+# 서점별 추적 카테고리 베스트셀러 목록
+BESTSELLER_LISTS = {
+    # 교보문고 목록 화면은 스크립트로 렌더링되므로 목록 API 응답(JSON)에서 ID를 읽는다
+    "kyobobook": BestsellerList(
+        "교보문고 컴퓨터/IT 주간",
+        "https://store.kyobobook.co.kr/api/gw/best/best-seller/online"
+        "?page={page}&per=20&period=002&dsplDvsnCode=001&dsplTrgtDvsnCode=004"
+        "&saleCmdtClstCode=33",
+        r'"saleCmdtid"\s*:\s*"(S\d+)"',
+        "it_rank",
+    ),
+    "yes24": BestsellerList(
+        "YES24 IT 모바일",
+        "https://www.yes24.com/Product/Category/BestSeller"
+        "?categoryNumber=001001003&pageNumber={page}&pageSize=40",
+        r"/product/goods/(\d+)",
+        "it_mobile_rank",
+        link_class="gd_name",
+        pages=3,
+    ),
+    "aladin": BestsellerList(
+        "알라딘 컴퓨터/모바일 주간",
+        "https://www.aladin.co.kr/shop/common/wbest.aspx"
+        "?BestType=Bestseller&BranchType=1&CID=351&page={page}",
+        r"ItemId=(\d+)",
+        "computer_weekly_rank",
+        link_class="bo3",
+        pages=2,
+        extra_fields={"rank_period": "주간"},
+    ),
+}
+
+# 상품 URL에서 상품 ID를 꺼내는 패턴 (PRODUCT_URL_TEMPLATES와 짝)
+PRODUCT_ID_PATTERNS = {
+    "kyobobook": re.compile(r"/detail/(S\d+)"),
+    "yes24": re.compile(r"/goods/(\d+)", re.IGNORECASE),
+    "aladin": re.compile(r"ItemId=(\d+)", re.IGNORECASE),
+}
+
+
+def product_id_from_url(store: str, url: str) -> Optional[str]:
+    """상품 URL에서 상품 ID 추출"""
+    pattern = PRODUCT_ID_PATTERNS.get(store)
+    if pattern is None:
+        return None
+    match = pattern.search(url)
+    return match.group(1) if match else None
@@ -1,17 +1,28 @@
 """
 도서 순위 모니터링 시스템
-30분마다 도서 순위 정보를 수집하고 데이터베이스에 저장
+주기적으로 도서 순위 정보를 수집하고 데이터베이스에 저장
+(기본: 서점별 순위 변동성에 따라 10분~6시간 간격, --fixed-interval이면 30분마다)
 """
 
+import asyncio
 import json
 import logging
-import sqlite3
+import random
+import signal
 import time
 from datetime import datetime, timedelta
 
-import schedule
-
-from summary_yozm_ai_agent_info import BookRankingScraper
+import observations
+import raw_payloads
+import rollups
+from adaptive_schedule import AdaptiveSchedule
+from bestseller_lists import product_id_from_url
+from observations import NUMERIC_TEXT_COLUMNS, RANKING_COLUMNS
+from resilience import RetryPolicy
+from storage import open_storage
+from summary_yozm_ai_agent_info import AsyncBookRankingScraper, BookRankingScraper
+from work_queue import WorkQueue
+from write_buffer import DEFAULT_FLUSH_SECONDS, DEFAULT_MAX_ROWS, WriteBuffer
 
 # 로거 설정
 logging.basicConfig(
@@ -21,17 +32,306 @@ logging.basicConfig(
 # 현재 스크래퍼 임포트
 
 
+
+def ranking_columns(results, stores=None):
+    """
+    수집 결과를 book_rankings 컬럼 값으로 변환
+
+    Args:
+        results: scrape_all 결과
+        stores: 변환할 서점 (None이면 전체)
+    """
+    values = {}
+    for store, columns in RANKING_COLUMNS.items():
+        if stores is not None and store not in stores:
+            continue
+        data = results.get(store) or {}
+        for field, column in columns.items():
+            value = data.get(field)
+            if column in NUMERIC_TEXT_COLUMNS and value and isinstance(value, str):
+                try:
+                    value = int(value.replace(",", ""))
+                except ValueError:
+                    value = None
+            values[column] = value
+    return values
+
+
+# book_rankings에 저장하는 순위 컬럼 (수집하지 않은 서점은 직전 값을 이어 적으므로 항상 전체)
+ALL_RANKING_COLUMNS = [
+    column for columns in RANKING_COLUMNS.values() for column in columns.values()
+]
+
+
+class ScheduledJob:
+    def __init__(
+        self,
+        name,
+        run,
+        interval=None,
+        next_run=None,
+        jitter=0.0,
+        max_instances=1,
+    ):
+        """
+        스케줄러 작업
+
+        Args:
+            name: 로그용 이름
+            run: 예정 시각(time.time 기준)을 받아 실행할 코루틴 함수
+            interval: 고정 간격(초) - 다음 예정 시각은 실행이 언제 끝났든 이전 예정 시각 + interval
+            next_run: interval 대신 쓰는 함수 - 실행이 끝난 뒤 이전 예정 시각을 받아
+                다음 예정 시각을 반환 (실행 결과에 따라 간격이 바뀌는 작업)
+            jitter: 실제 실행 시각에 더할 무작위 지연 최대값(초, 예정 시각 자체는 밀리지 않음)
+            max_instances: 동시에 실행할 수 있는 최대 개수 (가득 차 있으면 이번 차례는 건너뜀)
+        """
+        if (interval is None) == (next_run is None):
+            raise ValueError("interval과 next_run 중 하나만 지정해야 합니다")
+        self.name = name
+        self.run = run
+        self.interval = interval
+        self.next_run = next_run
+        self.jitter = jitter
+        self.max_instances = max_instances
+        self.active = 0
+
+    def next_time(self, scheduled, now):
+        """다음 예정 시각 (고정 간격 작업이 여러 차례 밀렸으면 지난 차례는 건너뜀)"""
+        if self.next_run is not None:
+            return self.next_run(scheduled)
+        missed = max(int((now - scheduled) // self.interval), 0)
+        if missed:
+            logging.warning(f"⏭️ {self.name}: 실행이 길어져 {missed}차례를 건너뜁니다")
+        return scheduled + (missed + 1) * self.interval
+
+
+class AsyncScheduler:
+    """
+    asyncio 기반 작업 스케줄러
+
+    작업마다 예정 시각까지 정확히 잠들었다가 실행하므로 폴링 지연이 없고, 다음 예정 시각을
+    이전 예정 시각 기준으로 정해 실행 시간만큼 일정이 밀리지 않습니다. 이전 실행이 끝나지
+    않은 작업은 max_instances까지만 겹쳐 실행합니다. SIGTERM/SIGINT를 받으면 새 실행을
+    멈추고 진행 중인 실행(DB 저장 포함)이 끝나기를 shutdown_timeout초까지 기다립니다.
+    """
+
+    def __init__(self, shutdown_timeout=25.0):
+        self.jobs = []
+        self.running = set()
+        self.shutdown_timeout = shutdown_timeout
+        self.stopping = None
+
+    def add_job(self, job):
+        self.jobs.append(job)
+
+    def stop(self):
+        """새 실행을 멈추고 종료 시작 (시그널 처리기)"""
+        if self.stopping is not None and not self.stopping.is_set():
+            logging.info("⏹️ 종료 신호 수신 - 진행 중인 수집을 마치고 종료합니다")
+            self.stopping.set()
+
+    async def run(self):
+        """stop()이 불릴 때까지 작업 실행"""
+        loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        signals = []
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+                signals.append(sig)
+            except (NotImplementedError, RuntimeError):
+                # Windows나 메인 스레드가 아닌 루프에서는 시그널 처리기를 달 수 없다
+                pass
+
+        job_loops = [asyncio.create_task(self.run_job(job)) for job in self.jobs]
+        try:
+            await self.stopping.wait()
+        finally:
+            for task in job_loops:
+                task.cancel()
+            await asyncio.gather(*job_loops, return_exceptions=True)
+            await self.drain()
+            for sig in signals:
+                loop.remove_signal_handler(sig)
+
+    async def drain(self):
+        """진행 중인 실행이 끝나기를 기다리고, 제한 시간을 넘기면 취소"""
+        if not self.running:
+            return
+        logging.info(
+            f"진행 중인 작업 {len(self.running)}개 종료 대기 (최대 {self.shutdown_timeout:.0f}초)"
+        )
+        _, pending = await asyncio.wait(self.running, timeout=self.shutdown_timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if pending:
+            logging.warning(f"⏰ 종료 대기 시간 초과로 작업 {len(pending)}개 취소")
+
+    async def run_job(self, job):
+        """작업 하나의 예정 시각 반복 (처음 한 번은 바로 실행)"""
+        scheduled = time.time()
+        while True:
+            delay = scheduled + random.uniform(0, job.jitter) - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            task = None
+            if job.active >= job.max_instances:
+                logging.warning(f"⏭️ {job.name}: 이전 실행이 끝나지 않아 이번 차례를 건너뜁니다")
+            else:
+                task = self.launch(job, scheduled)
+            if job.next_run is not None and task is not None:
+                # 다음 예정 시각이 실행 결과에 달려 있으면 끝날 때까지 기다린다
+                # (종료 중 이 루프가 취소돼도 실행 자체는 drain에서 마무리)
+                await asyncio.shield(task)
+            scheduled = job.next_time(scheduled, time.time())
+
+    def launch(self, job, scheduled):
+        job.active += 1
+        task = asyncio.create_task(self.execute(job, scheduled))
+        self.running.add(task)
+        task.add_done_callback(self.running.discard)
+        return task
+
+    @staticmethod
+    async def execute(job, scheduled):
+        try:
+            await job.run(scheduled)
+        except Exception as e:
+            logging.error(f"❌ {job.name} 실행 실패: {e}", exc_info=True)
+        finally:
+            job.active -= 1
+
+
 class BookRankingMonitor:
-    def __init__(self, db_path=None):
-        """모니터링 시스템 초기화"""
+    def __init__(
+        self,
+        db_path=None,
+        use_async=True,
+        scraper_options=None,
+        use_cache=True,
+        use_bestseller_lists=False,
+        use_stats=True,
+        use_timings=True,
+        use_archive=False,
+        interval_minutes=30,
+        adaptive_schedule=True,
+        min_interval_minutes=10,
+        max_interval_minutes=360,
+        jitter_seconds=30.0,
+        shutdown_timeout=25.0,
+        worker_id=None,
+        lease_seconds=600.0,
+        flush_rows=DEFAULT_MAX_ROWS,
+        flush_seconds=DEFAULT_FLUSH_SECONDS,
+        spool_path=None,
+        spool_fsync=False,
+        retention_days=0,
+    ):
+        """
+        모니터링 시스템 초기화
+
+        Args:
+            db_path: 데이터베이스 파일 경로
+            use_async: 서점별 요청을 동시에 보내는 비동기 스크래퍼 사용 여부
+            scraper_options: 스크래퍼 생성 옵션
+                (host_rate, max_in_flight_per_host, record_dir, replay_dir 등)
+            use_cache: 조건부 요청/추출 결과 캐시 사용 여부
+                (DB와 같은 디렉토리의 page_cache.db, PAGE_CACHE_PATH로 변경 가능)
+            use_bestseller_lists: 상품 페이지 대신 카테고리 베스트셀러 목록에서 순위 수집
+            use_stats: 추출 경로 적중 통계를 기록하고 자주 이기는 단계/패턴부터 시도할지 여부
+                (DB와 같은 디렉토리의 extraction_stats.json, EXTRACTION_STATS_PATH로 변경 가능)
+            use_timings: 수집 주기마다 서점별 단계 시간(연결/TTFB/다운로드/파싱/추출)을 기록할지 여부
+                (DB와 같은 디렉토리의 scrape_timings.jsonl, SCRAPE_TIMINGS_PATH로 변경 가능)
+            use_archive: 받은 상품 페이지 원본을 압축·중복 제거해 보관할지 여부
+                (DB와 같은 디렉토리의 html_archive.db, HTML_ARCHIVE_PATH로 변경 가능)
+            interval_minutes: 스케줄러 수집 간격(분) - 적응형이면 기록이 부족할 때의 기본 간격
+            adaptive_schedule: 서점별 최근 순위 변동성으로 수집 간격을 조정할지 여부
+            min_interval_minutes: 적응형 스케줄의 최소 수집 간격(분)
+            max_interval_minutes: 적응형 스케줄의 최대 수집 간격(분)
+            jitter_seconds: 예정 시각마다 더할 무작위 지연 최대값(초)
+            shutdown_timeout: 종료 신호를 받은 뒤 진행 중인 수집을 기다리는 최대 시간(초)
+            worker_id: 작업 큐 임대 기록에 남길 작업자 ID (None이면 호스트 이름-PID)
+            lease_seconds: 작업 큐 임대 유지 시간(초)
+            flush_rows: 쓰기 버퍼에 이만큼 모이면 바로 저장 (수집 결과/작업 완료 건수)
+            flush_seconds: 쓰기 버퍼 저장 주기(초, 0이면 결과마다 바로 저장)
+            spool_path: 저장 전 결과를 남겨 재시작 때 복구할 스풀 파일 (None이면 메모리에만 보관)
+            spool_fsync: 스풀에 쓸 때마다 fsync (전원이 나가도 결과를 잃지 않음)
+            retention_days: 스케줄러가 하루마다 이보다 오래된 관측값/원본 기록을 시간·일 집계만
+                남기고 정리 (0이면 모두 보관)
+        """
+        import os
+
+        if retention_days and retention_days < rollups.MIN_RETENTION_DAYS:
+            raise ValueError(
+                f"보관 기간은 {rollups.MIN_RETENTION_DAYS}일 이상이어야 합니다: {retention_days}"
+            )
+        self.retention_days = retention_days
+
         if db_path is None:
             # 환경 변수에서 DB 경로 가져오기, 없으면 기본값 사용
-            import os
-
             self.db_path = os.getenv("DB_PATH", "data/book_rankings.db")
         else:
             self.db_path = db_path
-        self.scraper = BookRankingScraper()
+        # 스케줄·작업 큐와 같은 프로세스 안에서 DB 연결을 공유 (WAL, 스레드별 장기 연결)
+        self.storage = open_storage(self.db_path)
+
+        cache_path = None
+        if use_cache:
+            cache_path = os.getenv(
+                "PAGE_CACHE_PATH",
+                os.path.join(os.path.dirname(self.db_path), "page_cache.db"),
+            )
+
+        stats_path = None
+        if use_stats:
+            stats_path = os.getenv(
+                "EXTRACTION_STATS_PATH",
+                os.path.join(os.path.dirname(self.db_path), "extraction_stats.json"),
+            )
+
+        timings_path = None
+        if use_timings:
+            timings_path = os.getenv(
+                "SCRAPE_TIMINGS_PATH",
+                os.path.join(os.path.dirname(self.db_path), "scrape_timings.jsonl"),
+            )
+
+        archive_path = None
+        if use_archive:
+            archive_path = os.getenv(
+                "HTML_ARCHIVE_PATH",
+                os.path.join(os.path.dirname(self.db_path), "html_archive.db"),
+            )
+
+        self.use_async = use_async
+        self.use_bestseller_lists = use_bestseller_lists
+        if use_async:
+            self.scraper = AsyncBookRankingScraper(
+                cache_path=cache_path,
+                stats_path=stats_path,
+                timings_path=timings_path,
+                archive_path=archive_path,
+                **(scraper_options or {}),
+            )
+        else:
+            options = dict(scraper_options or {})
+            # 동기 스크래퍼는 호스트별 속도 제한 옵션을 쓰지 않는다
+            for key in (
+                "host_rate",
+                "host_burst",
+                "max_in_flight_per_host",
+                "parse_workers",
+            ):
+                options.pop(key, None)
+            self.scraper = BookRankingScraper(
+                cache_path=cache_path,
+                stats_path=stats_path,
+                timings_path=timings_path,
+                archive_path=archive_path,
+                **options,
+            )
         self.urls = {
             "kyobobook": "https://product.kyobobook.co.kr/detail/S000217241525",
             "yes24": "https://www.yes24.com/product/goods/150701473",
@@ -39,11 +339,65 @@ class BookRankingMonitor:
         }
         self.init_database()
 
+        self.interval_minutes = interval_minutes
+        self.jitter_seconds = jitter_seconds
+        self.shutdown_timeout = shutdown_timeout
+        self.schedule = None
+        if adaptive_schedule:
+            self.schedule = AdaptiveSchedule(
+                self.db_path,
+                default_interval=interval_minutes * 60,
+                min_interval=min_interval_minutes * 60,
+                max_interval=max_interval_minutes * 60,
+                book_id=self.book_id,
+            )
+        # 상품 목록을 여러 프로세스가 나눠 수집하는 작업 큐 (book_rankings와 같은 DB)
+        # 적응형이면 작업(도서·서점)별 변동성으로 간격 조정
+        self.queue = WorkQueue(
+            self.db_path,
+            worker_id=worker_id,
+            lease_seconds=lease_seconds,
+            schedule=self.schedule,
+        )
+
+        # 수집 결과/작업 완료를 모아 한 트랜잭션에 저장 (지난번에 저장하지 못한 결과는 스풀에서 복구)
+        self.write_buffer = WriteBuffer(
+            self.storage,
+            self.write_entries,
+            spool_path=spool_path,
+            max_rows=flush_rows,
+            flush_seconds=flush_seconds,
+            fsync=spool_fsync,
+        )
+        self.write_buffer.flush()
+
     def init_database(self):
         """데이터베이스 초기화 및 테이블 생성"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.storage.write() as conn:
+            self.create_tables(conn)
+            raw_payloads.create_tables(conn)
+            observations.create_tables(conn)
+            # URL 목록의 상품을 기본 도서로 연결 (작업 큐에 같은 상품을 넣어도 같은 도서로 모임)
+            self.book_id = observations.ensure_book(
+                conn,
+                observations.DEFAULT_BOOK_KEY,
+                products=[
+                    (store, product_id_from_url(store, url))
+                    for store, url in self.urls.items()
+                    if product_id_from_url(store, url)
+                ],
+                # --enqueue에서 도서 이름으로 묶은 상품은 그대로 둠
+                relink=False,
+            )
+        # 아직 관측값으로 옮기지 않은 book_rankings 행 이전 (처음 한 번은 전체, 이후에는 새 행만)
+        migrated = observations.migrate_wide_table(self.storage, self.book_id)
+        if migrated:
+            logging.info(f"book_rankings 기록을 관측값 {migrated}개로 이전했습니다")
+        logging.info(f"데이터베이스 초기화 완료: {self.db_path}")
 
+    @staticmethod
+    def create_tables(cursor):
+        """book_rankings 테이블과 인덱스 생성"""
         # 메인 순위 데이터 테이블
         cursor.execute("""
         CREATE TABLE IF NOT EXISTS book_rankings (
@@ -69,7 +423,9 @@ class BookRankingMonitor:
             aladin_error TEXT,
             
             -- 메타데이터
-            raw_data TEXT,  -- JSON 형태로 원본 데이터 저장
+            raw_data TEXT,  -- JSON 형태 원본 데이터 (raw_payloads 이전 전 기록)
+            raw_hash TEXT,  -- raw_payloads의 원본 데이터 (수집 시각을 뺀 결과)
+            raw_times TEXT,  -- 서점별 수집 시각 (scraping_date 기준 마이크로초)
             created_at DATETIME DEFAULT CURRENT_TIMESTAMP
         )
         """)
@@ -82,155 +438,349 @@ class BookRankingMonitor:
             "CREATE INDEX IF NOT EXISTS idx_created_at ON book_rankings(created_at)"
         )
 
-        conn.commit()
-        conn.close()
-        logging.info(f"데이터베이스 초기화 완료: {self.db_path}")
+    @staticmethod
+    def carried_columns(cursor, stores):
+        """이번에 수집하지 않은 서점의 컬럼 값을 직전 행에서 가져옴 (이전 행이 없으면 빈 값)"""
+        columns = [
+            column for store in stores for column in RANKING_COLUMNS[store].values()
+        ]
+        if not columns:
+            return {}
+        row = cursor.execute(
+            f"SELECT {', '.join(columns)} FROM book_rankings ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        return dict(zip(columns, row or [None] * len(columns)))
 
-    def save_ranking_data(self, results):
-        """순위 데이터를 데이터베이스에 저장"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def save_ranking_data(self, results, stores=None):
+        """
+        순위 데이터를 쓰기 버퍼에 추가 (모이거나 저장 주기가 되면 데이터베이스에 저장)
 
+        Args:
+            results: 수집 결과
+            stores: 이번에 수집한 서점 (None이면 전체) - 나머지 서점은 직전 값을 이어 적고
+                원본 결과의 carried_over에 표시
+        """
         try:
-            # 데이터 추출
             timestamp = datetime.now()
-            scraping_date = results.get("scraping_date", timestamp.isoformat())
-
-            # 교보문고 데이터
-            kyobo = results.get("kyobobook", {})
-            kyobo_domestic_rank = kyobo.get("domestic_rank")
-            kyobo_it_rank = kyobo.get("it_rank")
-            kyobo_error = kyobo.get("error")
-
-            # YES24 데이터
-            yes24 = results.get("yes24", {})
-            yes24_sales_index = yes24.get("sales_index")
-            if yes24_sales_index and isinstance(yes24_sales_index, str):
-                try:
-                    yes24_sales_index = int(yes24_sales_index.replace(",", ""))
-                except:
-                    yes24_sales_index = None
-            yes24_it_mobile_rank = yes24.get("it_mobile_rank")
-            yes24_error = yes24.get("error")
-
-            # 알라딘 데이터
-            aladin = results.get("aladin", {})
-            aladin_computer_weekly_rank = aladin.get("computer_weekly_rank")
-            aladin_textbook_rank = aladin.get("textbook_rank")
-            aladin_sales_point = aladin.get("sales_point")
-            if aladin_sales_point and isinstance(aladin_sales_point, str):
-                try:
-                    aladin_sales_point = int(aladin_sales_point.replace(",", ""))
-                except:
-                    aladin_sales_point = None
-            aladin_rank_period = aladin.get("rank_period")
-            aladin_error = aladin.get("error")
+            flushed = self.write_buffer.add(
+                {
+                    "kind": "ranking",
+                    # sqlite3의 datetime 저장 형식과 같은 문자열
+                    "timestamp": timestamp.isoformat(" "),
+                    "scraping_date": results.get("scraping_date", timestamp.isoformat()),
+                    "results": results,
+                    "stores": stores,
+                }
+            )
+            if flushed:
+                logging.info(
+                    f"✅ 데이터 저장 완료: {timestamp.strftime('%Y-%m-%d %H:%M:%S')}"
+                )
+            else:
+                logging.info(
+                    f"📝 데이터 저장 대기: {timestamp.strftime('%Y-%m-%d %H:%M:%S')} "
+                    f"(버퍼 {len(self.write_buffer.pending)}건)"
+                )
 
-            # 데이터 삽입
-            cursor.execute(
-                """
-            INSERT INTO book_rankings (
-                timestamp, scraping_date,
-                kyobo_domestic_rank, kyobo_it_rank, kyobo_error,
-                yes24_sales_index, yes24_it_mobile_rank, yes24_error,
-                aladin_computer_weekly_rank, aladin_textbook_rank, 
-                aladin_sales_point, aladin_rank_period, aladin_error,
-                raw_data
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+        except Exception as e:
+            logging.error(f"❌ 데이터 저장 실패: {e}", exc_info=True)
+
+    def write_entries(self, cursor, entries):
+        """쓰기 버퍼에 모인 수집 결과와 작업 완료 기록을 한 트랜잭션에서 저장"""
+        rankings = [entry for entry in entries if entry["kind"] == "ranking"]
+        completions = [entry for entry in entries if entry["kind"] == "queue"]
+        if rankings:
+            self.write_rankings(cursor, rankings)
+        if completions:
+            self.queue.record_completions(cursor, completions)
+
+    def write_rankings(self, cursor, entries):
+        """수집 결과 여러 건을 book_rankings와 관측값에 executemany로 저장"""
+        rows = []
+        observation_rows = []
+        previous = None
+        for entry in entries:
+            results = entry["results"]
+            stores = entry["stores"]
+            columns = ranking_columns(results, stores)
+            if stores is not None:
+                carried = [store for store in RANKING_COLUMNS if store not in stores]
+                # 직전 값은 버퍼 안의 앞 결과, 첫 결과는 DB의 마지막 행에서
+                if previous is None:
+                    previous = self.carried_columns(cursor, list(RANKING_COLUMNS))
+                columns.update(
+                    (column, previous[column])
+                    for store in carried
+                    for column in RANKING_COLUMNS[store].values()
+                )
+                results = {**results, "carried_over": carried}
+            previous = columns
+            # 원본 결과는 내용이 같은 이전 수집과 본문을 공유 (raw_payloads)
+            raw_hash, raw_times = raw_payloads.store(cursor, results, entry["scraping_date"])
+            rows.append(
                 (
-                    timestamp,
-                    scraping_date,
-                    kyobo_domestic_rank,
-                    kyobo_it_rank,
-                    kyobo_error,
-                    yes24_sales_index,
-                    yes24_it_mobile_rank,
-                    yes24_error,
-                    aladin_computer_weekly_rank,
-                    aladin_textbook_rank,
-                    aladin_sales_point,
-                    aladin_rank_period,
-                    aladin_error,
-                    json.dumps(results, ensure_ascii=False),
-                ),
+                    entry["timestamp"],
+                    entry["scraping_date"],
+                    *(columns[column] for column in ALL_RANKING_COLUMNS),
+                    raw_hash,
+                    raw_times,
+                )
             )
-
-            conn.commit()
-            logging.info(
-                f"✅ 데이터 저장 완료: {timestamp.strftime('%Y-%m-%d %H:%M:%S')}"
+            # 대시보드 조회용 관측값 (이번에 수집한 서점만 - 이어 적은 값은 관측값이 아님)
+            observation_rows.extend(
+                observations.result_rows(self.book_id, results, entry["timestamp"], stores)
             )
 
-        except Exception as e:
-            logging.error(f"❌ 데이터 저장 실패: {e}", exc_info=True)
-            conn.rollback()
-        finally:
-            conn.close()
+        cursor.executemany(
+            f"""
+        INSERT INTO book_rankings (
+            timestamp, scraping_date, {", ".join(ALL_RANKING_COLUMNS)}, raw_hash, raw_times
+        ) VALUES ({", ".join("?" * (len(ALL_RANKING_COLUMNS) + 4))})
+        """,
+            rows,
+        )
+        observations.record_rows(cursor, observation_rows)
+        row_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+        observations.set_meta(cursor, "wide_migrated_through", row_id)
+
+    def collect_data(self, stores=None):
+        """
+        데이터 수집 및 저장 실행
+
+        Args:
+            stores: 수집할 서점 (None이면 전체)
+        """
+        if self.use_async:
+            asyncio.run(self.closing_client(self.collect_data_async(stores)))
+            return
+        urls = self.store_urls(stores)
 
-    def collect_data(self):
-        """데이터 수집 및 저장 실행"""
         logging.info(
             f"🕐 데이터 수집 시작: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
         )
 
         try:
             # 스크래핑 실행
-            results = self.scraper.scrape_all(self.urls)
+            if self.use_bestseller_lists:
+                results = self.scraper.scrape_all_from_lists(urls)
+            else:
+                results = self.scraper.scrape_all(urls)
 
             # 데이터베이스에 저장
-            self.save_ranking_data(results)
+            self.save_ranking_data(results, stores)
 
             # 요약 출력
             self.scraper.print_summary(results)
+            self.scraper.print_timings()
 
         except Exception as e:
             logging.error(f"❌ 데이터 수집 실패: {e}", exc_info=True)
 
-    def get_recent_data(self, hours=24):
-        """최근 데이터 조회"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    async def collect_data_async(self, stores=None):
+        """데이터 수집 및 저장 실행 (비동기)
 
-        since = datetime.now() - timedelta(hours=hours)
+        스크래핑은 이벤트 루프에서 동시에 진행하고,
+        DB 저장은 별도 스레드에서 실행해 루프를 막지 않는다.
+        """
+        urls = self.store_urls(stores)
+        logging.info(
+            f"🕐 데이터 수집 시작: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        )
 
-        cursor.execute(
-            """
-        SELECT * FROM book_rankings 
-        WHERE timestamp >= ? 
-        ORDER BY timestamp DESC
-        """,
-            (since,),
+        try:
+            # 스크래핑 실행
+            if self.use_bestseller_lists:
+                results = await self.scraper.scrape_all_from_lists_async(urls)
+            else:
+                results = await self.scraper.scrape_all_async(urls)
+
+            # 데이터베이스에 저장 (종료 신호로 취소돼도 시작한 저장은 끝까지 진행)
+            await asyncio.shield(asyncio.to_thread(self.save_ranking_data, results, stores))
+
+            # 요약 출력
+            self.scraper.print_summary(results)
+            self.scraper.print_timings()
+
+        except Exception as e:
+            logging.error(f"❌ 데이터 수집 실패: {e}", exc_info=True)
+
+    async def closing_client(self, coro):
+        """
+        asyncio.run 한 번으로 끝나는 실행(--once, 배치 수집) 후 비동기 클라이언트 정리
+
+        asyncio.run은 매번 새 루프를 만들므로 연결을 루프와 함께 정리합니다.
+        스케줄러/작업자는 프로세스 내내 같은 루프에서 클라이언트를 재사용하고 종료할 때 정리합니다.
+        """
+        try:
+            return await coro
+        finally:
+            await self.scraper.aclose()
+
+    def store_urls(self, stores=None):
+        """수집할 서점의 상품 URL (None이면 전체)"""
+        if stores is None:
+            return self.urls
+        return {store: url for store, url in self.urls.items() if store in stores}
+
+    async def collect_scheduled(self, stores=None):
+        """스케줄러에서 수집 실행 (동기 스크래퍼는 별도 스레드에서 실행)"""
+        if self.use_async:
+            await self.collect_data_async(stores)
+        else:
+            await asyncio.to_thread(self.collect_data, stores)
+
+    async def collect_due(self, scheduled):
+        """
+        적응형 스케줄에서 수집할 차례가 된 서점만 수집하고 다음 간격 계산
+
+        다음 수집 시각은 실행이 끝난 시각이 아니라 이번 예정 시각 기준으로 정합니다.
+        """
+        stores = self.schedule.due_stores(list(self.urls), now=max(scheduled, time.time()))
+        if not stores:
+            return
+        await self.collect_scheduled(stores if len(stores) < len(self.urls) else None)
+        # 변동성은 관측값에서 계산하므로 방금 수집한 결과를 먼저 저장
+        await asyncio.shield(asyncio.to_thread(self.write_buffer.flush))
+        self.schedule.mark_collected(stores, now=scheduled)
+
+    def next_due_time(self, scheduled):
+        """적응형 스케줄에서 가장 먼저 돌아오는 서점의 수집 예정 시각"""
+        # 수집이 실패해 다음 시각이 정해지지 않은 서점은 최소 간격 뒤에 다시 시도
+        retry = scheduled + self.schedule.min_interval
+        return min(self.schedule.next_due.get(store, retry) for store in self.urls)
+
+    def collect_products(self, products):
+        """여러 도서 배치 수집 실행
+
+        Args:
+            products: [(서점, 상품 ID), ...] 목록
+        """
+        if not isinstance(self.scraper, AsyncBookRankingScraper):
+            raise ValueError("배치 모드는 비동기 스크래퍼에서만 지원됩니다")
+        return asyncio.run(self.closing_client(self.collect_products_async(products)))
+
+    async def collect_products_async(self, products):
+        """여러 도서 배치 수집 실행 (비동기)"""
+        logging.info(
+            f"🕐 배치 수집 시작: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        )
+
+        results = await self.scraper.scrape_products_async(
+            products, from_lists=self.use_bestseller_lists
+        )
+        self.scraper.print_batch_report(results["report"])
+        return results
+
+    async def work_queue_batch(self, batch_size):
+        """작업 큐에서 수집할 차례가 된 상품을 임대해 수집하고 결과 기록"""
+        tasks = await asyncio.to_thread(self.queue.lease, batch_size)
+        if not tasks:
+            return
+        logging.info(f"📤 작업 {len(tasks)}개 임대 ({self.queue.worker_id})")
+        started = time.perf_counter()
+        try:
+            results = await self.collect_products_async(
+                [(task["store"], task["product_id"]) for task in tasks]
+            )
+        except BaseException:
+            # 종료 신호 등으로 중단되면 다른 작업자가 만료를 기다리지 않고 바로 가져가도록
+            self.queue.release(tasks)
+            raise
+        # 완료 기록은 쓰기 버퍼에 모아 저장 (저장 전까지 임대는 이 작업자에게 남아 있음)
+        await asyncio.shield(
+            asyncio.to_thread(
+                self.write_buffer.add,
+                self.queue.completion(
+                    tasks, results["products"], time.perf_counter() - started
+                ),
+                len(tasks),
+            )
+        )
+
+    def run_worker(self, batch_size=10, poll_seconds=30.0):
+        """
+        작업 큐 작업자 시작 - 여러 프로세스/컨테이너에서 실행하면 상품 목록을 나눠 수집
+
+        SIGTERM/SIGINT를 받으면 진행 중인 묶음을 마치고(못 마치면 임대를 해제하고) 돌아옵니다.
+        """
+        if not self.use_async:
+            raise ValueError("작업 큐 작업자는 비동기 스크래퍼에서만 지원됩니다")
+        asyncio.run(self.run_worker_async(batch_size, poll_seconds))
+
+    async def run_worker_async(self, batch_size, poll_seconds):
+        logging.info(
+            f"👷 작업 큐 작업자 시작: {self.queue.worker_id} "
+            f"(묶음 {batch_size}개, 임대 {self.queue.lease_seconds:.0f}초)"
+        )
+        scheduler = AsyncScheduler(shutdown_timeout=self.shutdown_timeout)
+        scheduler.add_job(
+            ScheduledJob(
+                "작업 큐 처리",
+                lambda scheduled: self.work_queue_batch(batch_size),
+                next_run=lambda scheduled: self.queue.next_wakeup(poll_seconds),
+                # 여러 작업자가 같은 시각에 깨어나 임대 트랜잭션이 몰리지 않도록
+                jitter=min(self.jitter_seconds, poll_seconds / 2),
+            )
         )
+        self.add_flush_job(scheduler)
+        try:
+            await scheduler.run()
+        finally:
+            # asyncio.run이 끝나면 루프가 닫히므로 연결을 루프와 함께 정리
+            await self.scraper.aclose()
+        await asyncio.to_thread(self.write_buffer.flush)
+
+    def get_recent_data(self, hours=24):
+        """최근 데이터 조회"""
+        with self.storage.read() as conn:
+            cursor = conn.cursor()
+
+            since = datetime.now() - timedelta(hours=hours)
 
-        columns = [description[0] for description in cursor.description]
-        results = []
-        for row in cursor.fetchall():
-            results.append(dict(zip(columns, row)))
+            cursor.execute(
+                """
+            SELECT * FROM book_rankings 
+            WHERE timestamp >= ? 
+            ORDER BY timestamp DESC
+            """,
+                (since,),
+            )
 
-        conn.close()
+            columns = [description[0] for description in cursor.description]
+            results = []
+            for row in cursor.fetchall():
+                record = dict(zip(columns, row))
+                # raw_payloads로 옮긴 원본도 raw_data로 돌려줌
+                raw = raw_payloads.load(
+                    conn,
+                    record.pop("raw_data"),
+                    record.pop("raw_hash"),
+                    record.pop("raw_times"),
+                    record["scraping_date"],
+                )
+                record["raw_data"] = json.dumps(raw, ensure_ascii=False) if raw else None
+                results.append(record)
         return results
 
     def get_stats(self):
         """통계 정보 조회"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.storage.read() as conn:
+            cursor = conn.cursor()
 
-        # 총 레코드 수
-        cursor.execute("SELECT COUNT(*) FROM book_rankings")
-        total_records = cursor.fetchone()[0]
+            # 총 레코드 수
+            cursor.execute("SELECT COUNT(*) FROM book_rankings")
+            total_records = cursor.fetchone()[0]
 
-        # 최신/최오래된 데이터
-        cursor.execute("SELECT MIN(timestamp), MAX(timestamp) FROM book_rankings")
-        oldest, newest = cursor.fetchone()
-
-        # 최근 24시간 데이터 수
-        since_24h = datetime.now() - timedelta(hours=24)
-        cursor.execute(
-            "SELECT COUNT(*) FROM book_rankings WHERE timestamp >= ?", (since_24h,)
-        )
-        recent_24h = cursor.fetchone()[0]
+            # 최신/최오래된 데이터
+            cursor.execute("SELECT MIN(timestamp), MAX(timestamp) FROM book_rankings")
+            oldest, newest = cursor.fetchone()
 
-        conn.close()
+            # 최근 24시간 데이터 수
+            since_24h = datetime.now() - timedelta(hours=24)
+            cursor.execute(
+                "SELECT COUNT(*) FROM book_rankings WHERE timestamp >= ?", (since_24h,)
+            )
+            recent_24h = cursor.fetchone()[0]
 
         return {
             "total_records": total_records,
@@ -240,32 +790,98 @@ class BookRankingMonitor:
         }
 
     def start_scheduler(self):
-        """스케줄러 시작 (30분마다 실행)"""
-        logging.info("📅 스케줄러 시작 - 30분마다 데이터 수집")
+        """
+        스케줄러 시작 (적응형이면 서점별 간격, 아니면 interval_minutes마다 실행)
 
-        # 30분마다 실행 스케줄 등록
-        schedule.every(1).minutes.do(self.collect_data)
+        SIGTERM/SIGINT를 받으면 진행 중인 수집과 저장을 마치고 돌아옵니다.
+        """
+        asyncio.run(self.run_scheduler())
 
-        # 즉시 한 번 실행
-        self.collect_data()
+    async def run_scheduler(self):
+        scheduler = AsyncScheduler(shutdown_timeout=self.shutdown_timeout)
+        if self.schedule is None:
+            logging.info(f"📅 스케줄러 시작 - {self.interval_minutes}분마다 데이터 수집")
+            scheduler.add_job(
+                ScheduledJob(
+                    "데이터 수집",
+                    lambda scheduled: self.collect_scheduled(),
+                    interval=self.interval_minutes * 60,
+                    jitter=self.jitter_seconds,
+                )
+            )
+        else:
+            logging.info(
+                f"📅 적응형 스케줄러 시작 - 서점별 순위 변동성에 따라 "
+                f"{self.schedule.min_interval / 60:.0f}~{self.schedule.max_interval / 60:.0f}분 간격으로 수집"
+            )
+            # 처음에는 모든 서점이 차례, 이후에는 가장 먼저 돌아오는 서점 시각에 깨어남
+            scheduler.add_job(
+                ScheduledJob(
+                    "서점별 데이터 수집",
+                    self.collect_due,
+                    next_run=self.next_due_time,
+                    jitter=self.jitter_seconds,
+                )
+            )
+        self.add_flush_job(scheduler)
+        self.add_retention_job(scheduler)
+        try:
+            await scheduler.run()
+        finally:
+            if self.use_async:
+                await self.scraper.aclose()
+        # 진행 중이던 수집까지 끝난 뒤 버퍼에 남은 결과 저장
+        await asyncio.to_thread(self.write_buffer.flush)
 
-        # 스케줄러 실행
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # 1분마다 체크
+    def add_flush_job(self, scheduler):
+        """쓰기 버퍼를 flush_seconds마다 저장하는 작업 추가"""
+        if self.write_buffer.flush_seconds <= 0:
+            return
+
+        async def flush(scheduled):
+            if self.write_buffer.due():
+                await asyncio.shield(asyncio.to_thread(self.write_buffer.flush))
+
+        scheduler.add_job(
+            ScheduledJob(
+                "쓰기 버퍼 저장", flush, interval=self.write_buffer.flush_seconds
+            )
+        )
+
+    def add_retention_job(self, scheduler):
+        """retention_days보다 오래된 기록을 하루마다 정리하는 작업 추가 (시작할 때 한 번 실행)"""
+        if not self.retention_days:
+            return
+
+        async def prune(scheduled):
+            deleted = await asyncio.shield(
+                asyncio.to_thread(rollups.prune, self.storage, self.retention_days)
+            )
+            if any(deleted.values()):
+                logging.info(
+                    f"🧹 {self.retention_days}일 지난 기록 정리 (집계는 보관): "
+                    + ", ".join(f"{table} {count}행" for table, count in deleted.items())
+                )
+
+        scheduler.add_job(ScheduledJob("보관 기간 정리", prune, interval=24 * 60 * 60))
 
     def run_once(self):
-        """한 번만 실행"""
+        """한 번만 실행 (수집 결과를 바로 저장)"""
         self.collect_data()
+        self.write_buffer.flush()
 
     def close(self):
         """리소스 정리"""
         self.scraper.close()
+        self.write_buffer.close()
+        self.storage.close()
 
 
 def main():
     """메인 함수"""
     import argparse
+    import os
+    import socket
 
     parser = argparse.ArgumentParser(description="도서 순위 모니터링 시스템")
     parser.add_argument(
@@ -275,10 +891,246 @@ def main():
         "--db", default="data/book_rankings.db", help="데이터베이스 파일 경로"
     )
     parser.add_argument("--stats", action="store_true", help="통계 정보 출력")
+    parser.add_argument(
+        "--sync", action="store_true", help="서점을 순차적으로 스크래핑 (비동기 비활성화)"
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="조건부 요청/추출 결과 캐시 사용 안 함 (매번 전체 다운로드 및 파싱)",
+    )
+    parser.add_argument(
+        "--no-extraction-stats",
+        action="store_true",
+        help="추출 경로 통계를 쓰지 않고 항상 정의된 단계/패턴 순서로 추출",
+    )
+    # 이전 이름 (적응형 수집 간격과 헷갈리므로 도움말에서 숨김, 고정 간격은 --fixed-interval)
+    parser.add_argument(
+        "--no-adaptive", dest="no_extraction_stats", action="store_true", help=argparse.SUPPRESS
+    )
+    parser.add_argument(
+        "--no-timings",
+        action="store_true",
+        help="수집 주기별 단계 시간 기록(scrape_timings.jsonl) 사용 안 함",
+    )
+    parser.add_argument(
+        "--archive",
+        action="store_true",
+        help="받은 상품 페이지 원본을 html_archive.db에 보관 (reextract_archive.py로 재추출)",
+    )
+    parser.add_argument(
+        "--products",
+        help='배치 모드: [["yes24", "150701473"], ...] 형식의 (서점, 상품 ID) JSON 파일',
+    )
+    parser.add_argument(
+        "--host-concurrency", type=int, default=2, help="호스트별 동시 요청 수"
+    )
+    parser.add_argument(
+        "--host-rate", type=float, default=1.0, help="호스트별 초당 요청 수"
+    )
+
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        help="배치 모드 파싱 프로세스 수 (0이면 이벤트 루프에서 직접 파싱, -1이면 CPU 코어 수)",
+    )
+    parser.add_argument("--record", help="받은 응답을 모두 녹화할 픽스처 디렉토리")
+    parser.add_argument(
+        "--replay", help="네트워크 대신 녹화된 응답을 재생할 픽스처 디렉토리"
+    )
+    parser.add_argument(
+        "--replay-latency", type=float, default=0.0, help="재생 시 응답 지연시간(초)"
+    )
+    parser.add_argument(
+        "--replay-jitter", type=float, default=0.0, help="재생 지연시간 무작위 최대값(초)"
+    )
+    parser.add_argument(
+        "--bestseller-lists",
+        action="store_true",
+        help="상품 페이지 대신 서점별 카테고리 베스트셀러 목록에서 순위 수집 (IT 순위만)",
+    )
+    parser.add_argument(
+        "--yes24-module-only",
+        action="store_true",
+        help="YES24 IT 모바일 순위를 베스트셀러 모듈에서만 읽고 메인 페이지에서는 판매지수만 추출",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="상품 페이지를 스트리밍으로 받으며 순위 정보를 찾는 즉시 다운로드 중단",
+    )
+    parser.add_argument(
+        "--replay-bandwidth",
+        type=float,
+        default=0.0,
+        help="재생 시 본문 전송 속도(bytes/s, 0이면 제한 없음)",
+    )
+    parser.add_argument(
+        "--max-retries", type=int, default=2, help="일시적 오류(5xx, 타임아웃) 재시도 횟수"
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=120.0,
+        help="수집 주기 하나에 쓸 최대 시간(초, 0이면 제한 없음) - 넘긴 서점은 부분 결과로 기록",
+    )
+    parser.add_argument(
+        "--connect-timeout", type=float, default=5.0, help="요청 연결 타임아웃(초)"
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="HTTP/2로 요청해 같은 서점의 상품/모듈 요청이 연결 하나를 공유 (h2 패키지 필요)",
+    )
+    parser.add_argument(
+        "--max-connections", type=int, default=20, help="연결 풀 전체 최대 연결 수"
+    )
+    parser.add_argument(
+        "--max-keepalive", type=int, default=10, help="재사용을 위해 열어 둘 최대 유휴 연결 수"
+    )
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=30,
+        help="수집 간격(분) - 적응형 스케줄에서는 기록이 부족할 때의 기본 간격",
+    )
+    parser.add_argument(
+        "--fixed-interval",
+        action="store_true",
+        help="순위 변동성과 상관없이 모든 서점을 --interval마다 수집",
+    )
+    parser.add_argument(
+        "--min-interval", type=int, default=10, help="적응형 스케줄의 최소 수집 간격(분)"
+    )
+    parser.add_argument(
+        "--max-interval", type=int, default=360, help="적응형 스케줄의 최대 수집 간격(분)"
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=30.0,
+        help="수집 예정 시각마다 더할 무작위 지연 최대값(초) - 매번 같은 시각에 몰리지 않도록",
+    )
+    parser.add_argument(
+        "--shutdown-timeout",
+        type=float,
+        default=25.0,
+        help="SIGTERM을 받은 뒤 진행 중인 수집/저장을 기다리는 최대 시간(초)",
+    )
+    parser.add_argument(
+        "--enqueue",
+        help='작업 큐에 [["yes24", "150701473"], ...] 형식의 (서점, 상품 ID) JSON 파일의 상품 추가 '
+        "(수집 간격은 --interval)",
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="작업 큐 작업자로 실행 - 여러 프로세스/컨테이너가 상품 목록을 나눠 수집",
+    )
+    parser.add_argument("--worker-id", help="작업자 ID (기본값: 호스트 이름-PID)")
+    parser.add_argument(
+        "--batch-size", type=int, default=10, help="작업자가 한 번에 임대할 작업 수"
+    )
+    parser.add_argument(
+        "--lease",
+        type=float,
+        default=600.0,
+        help="작업 임대 유지 시간(초) - 작업자가 죽으면 이 시간 뒤 다른 작업자가 이어받음",
+    )
+    parser.add_argument(
+        "--poll",
+        type=float,
+        default=30.0,
+        help="작업자가 새로 추가된 작업을 확인하는 최대 간격(초)",
+    )
+    parser.add_argument(
+        "--circuit-cooldown",
+        type=float,
+        default=300.0,
+        help="연속 실패한 서점 요청을 건너뛰는 시간(초)",
+    )
+    parser.add_argument(
+        "--flush-rows",
+        type=int,
+        default=DEFAULT_MAX_ROWS,
+        help="쓰기 버퍼에 수집 결과/완료 작업이 이만큼 모이면 한 트랜잭션으로 저장",
+    )
+    parser.add_argument(
+        "--flush-interval",
+        type=float,
+        default=DEFAULT_FLUSH_SECONDS,
+        help="쓰기 버퍼 저장 주기(초, 0이면 결과마다 바로 저장)",
+    )
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=int(os.getenv("RETENTION_DAYS", "0")),
+        help="스케줄러가 이보다 오래된 관측값/원본 기록을 시간·일 집계만 남기고 정리 "
+        "(0이면 모두 보관, 환경 변수 RETENTION_DAYS)",
+    )
+    parser.add_argument(
+        "--spool-fsync",
+        action="store_true",
+        help="저장 전 결과를 남기는 스풀 파일에 쓸 때마다 fsync (전원이 나가도 결과 보존)",
+    )
 
     args = parser.parse_args()
 
-    monitor = BookRankingMonitor(db_path=args.db)
+    # 계속 실행되는 스케줄러/작업자만 스풀 사용 (--stats 등이 실행 중인 모니터의 스풀을 건드리지 않도록,
+    # --once는 끝날 때 버퍼를 바로 저장하므로 스풀 없이 실행 중인 스케줄러와 함께 쓸 수 있음)
+    # 작업자는 작업자 ID(기본: 호스트 이름 - 컨테이너마다 다르고 재시작해도 같음)별로 따로 씀
+    spool_path = None
+    if not (args.stats or args.enqueue or args.products or args.once):
+        spool_name = "write_spool.jsonl"
+        if args.worker:
+            spool_name = f"write_spool-{args.worker_id or socket.gethostname()}.jsonl"
+        spool_path = os.getenv(
+            "WRITE_SPOOL_PATH", os.path.join(os.path.dirname(args.db), spool_name)
+        )
+
+    monitor = BookRankingMonitor(
+        db_path=args.db,
+        use_async=not args.sync,
+        use_cache=not args.no_cache,
+        use_bestseller_lists=args.bestseller_lists,
+        use_stats=not args.no_extraction_stats,
+        use_timings=not args.no_timings,
+        use_archive=args.archive,
+        interval_minutes=args.interval,
+        adaptive_schedule=not args.fixed_interval,
+        min_interval_minutes=args.min_interval,
+        max_interval_minutes=args.max_interval,
+        jitter_seconds=args.jitter,
+        shutdown_timeout=args.shutdown_timeout,
+        worker_id=args.worker_id,
+        lease_seconds=args.lease,
+        flush_rows=args.flush_rows,
+        flush_seconds=args.flush_interval,
+        spool_path=spool_path,
+        spool_fsync=args.spool_fsync,
+        retention_days=args.retention_days,
+        scraper_options={
+            "host_rate": args.host_rate,
+            "max_in_flight_per_host": args.host_concurrency,
+            "parse_workers": None if args.parse_workers < 0 else args.parse_workers,
+            "record_dir": args.record,
+            "replay_dir": args.replay,
+            "replay_latency": args.replay_latency,
+            "replay_jitter": args.replay_jitter,
+            "replay_bandwidth": args.replay_bandwidth,
+            "streaming": args.streaming,
+            "retry_policy": RetryPolicy(max_retries=args.max_retries),
+            "circuit_cooldown": args.circuit_cooldown,
+            "cycle_deadline": args.deadline or None,
+            "connect_timeout": args.connect_timeout,
+            "http2": args.http2,
+            "max_connections": args.max_connections,
+            "max_keepalive_connections": args.max_keepalive,
+            "yes24_module_only": args.yes24_module_only,
+        },
+    )
 
     try:
         if args.stats:
@@ -288,6 +1140,63 @@ def main():
             logging.info(f"  최오래된 데이터: {stats['oldest_data']}")
             logging.info(f"  최신 데이터: {stats['newest_data']}")
             logging.info(f"  최근 24시간 레코드: {stats['recent_24h']}")
+            with monitor.storage.read() as conn:
+                raw = raw_payloads.stats(conn)
+            logging.info(
+                f"🗜️ 원본 수집 결과: {raw['rows']}행 → 고유 본문 {raw['payloads']}개 "
+                f"(압축 전 {raw['raw_bytes'] / 1024:.1f}KB → 저장 {raw['stored_bytes'] / 1024:.1f}KB)"
+                + (
+                    f", raw_data로 남은 행 {raw['legacy_rows']}개 "
+                    f"({raw['legacy_bytes'] / 1024:.1f}KB, migrate_raw_payloads.py로 이전)"
+                    if raw["legacy_rows"]
+                    else ""
+                )
+            )
+            with monitor.storage.read() as conn:
+                rollup = rollups.stats(conn)
+            logging.info(
+                f"📈 관측값 집계: 시간 {rollup['hour']}행, 일 {rollup['day']}행"
+                + (
+                    f" ({rollup['pruned_before']} 이전은 집계만 보관)"
+                    if rollup["pruned_before"]
+                    else ""
+                )
+            )
+            if monitor.scraper.extraction_stats is not None:
+                logging.info("🔎 필드별 주된 추출 경로:")
+                for line in monitor.scraper.extraction_stats.summary():
+                    logging.info(f"  {line}")
+            if monitor.schedule is not None:
+                logging.info("⏲️ 서점별 순위 변동성과 수집 간격:")
+                for line in monitor.schedule.summary(list(monitor.urls)):
+                    logging.info(f"  {line}")
+            logging.info("👷 작업 큐와 작업자별 처리량 (최근 1시간):")
+            for line in monitor.queue.summary():
+                logging.info(f"  {line}")
+            if monitor.scraper.html_archive is not None:
+                archive = monitor.scraper.html_archive.stats()
+                logging.info(
+                    f"🗄️ 원본 HTML 보관소: 수집 {archive['captures']}건 "
+                    f"({archive['captured_bytes'] / 1024 / 1024:.1f}MB) → "
+                    f"고유 본문 {archive['blobs']}개, 저장 {archive['stored_bytes'] / 1024 / 1024:.1f}MB"
+                )
+
+        elif args.enqueue:
+            with open(args.enqueue, encoding="utf-8") as f:
+                products = [tuple(item) for item in json.load(f)]
+            added = monitor.queue.enqueue(products, args.interval * 60)
+            logging.info(
+                f"작업 큐에 상품 {added}개 추가 (전체 {len(products)}개, {args.interval}분 간격)"
+            )
+
+        elif args.worker:
+            monitor.run_worker(batch_size=args.batch_size, poll_seconds=args.poll)
+
+        elif args.products:
+            with open(args.products, encoding="utf-8") as f:
+                products = [tuple(item) for item in json.load(f)]
+            results = monitor.collect_products(products)
+            monitor.scraper.save_results(results)
 
         elif args.once:
             monitor.run_once()
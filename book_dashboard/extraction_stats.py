@@ -0,0 +1,157 @@
+"""
+추출 경로 적중 통계
+서점/필드별로 어떤 파싱 단계와 패턴이 값을 냈는지 JSON 파일에 누적하고,
+자주 이기는 단계와 패턴을 먼저 시도하도록 순서를 제안합니다.
+최근 적중 경로가 누적 통계와 달라지면 페이지 레이아웃 변경을 의심해 경고합니다.
+
+추출 경로 표기: "<파싱 단계>/<추출 단계>#<패턴 인덱스>" (예: "partial/page#0", "full/dl#3")
+값을 찾지 못한 필드는 "miss"로 기록합니다.
+"""
+
+import json
+import logging
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+STATS_VERSION = 1
+RECENT_WINDOW = 50  # 필드별로 보관하는 최근 추출 경로 수
+MIN_SAMPLES = 10  # 순서를 바꾸기 전에 필요한 최소 적중 수
+SHIFT_MIN_RECENT = 20  # 경로 변화 판단에 필요한 최근 기록 수
+MISS = "miss"
+
+
+def split_label(label: str):
+    """추출 경로를 (추출 단계, 패턴 인덱스)로 분리 (단계 정보가 없으면 None)"""
+    if "#" not in label:
+        return None
+    path, index = label.rsplit("#", 1)
+    return path.split("/")[-1], int(index)
+
+
+class ExtractionStats:
+    def __init__(self, stats_path: str):
+        """
+        통계 로드
+
+        Args:
+            stats_path: 통계 JSON 파일 경로
+        """
+        self.stats_path = stats_path
+        self.fields: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # 경고를 이미 낸 (서점, 필드) - 경로가 다시 안정되면 해제
+        self.shifted = set()
+
+        path = Path(stats_path)
+        if path.exists():
+            try:
+                with open(path, encoding="utf-8") as f:
+                    saved = json.load(f)
+                if saved.get("version") == STATS_VERSION:
+                    self.fields = saved.get("stores", {})
+            except (OSError, ValueError) as e:
+                logging.warning(f"추출 통계를 읽을 수 없어 새로 시작합니다: {e}")
+
+    def record(self, store: str, labels: Dict[str, Optional[str]]):
+        """
+        결과 하나의 필드별 추출 경로 기록
+
+        Args:
+            store: 서점 이름
+            labels: 필드 → 추출 경로 (값이 없으면 None)
+        """
+        store_stats = self.fields.setdefault(store, {})
+        for field, label in labels.items():
+            label = label or MISS
+            entry = store_stats.setdefault(field, {"total": {}, "recent": []})
+            entry["total"][label] = entry["total"].get(label, 0) + 1
+            entry["recent"].append(label)
+            del entry["recent"][:-RECENT_WINDOW]
+            self.check_shift(store, field, entry)
+
+    def check_shift(self, store: str, field: str, entry: Dict[str, Any]):
+        """최근 주된 추출 경로가 누적 주된 경로와 다르면 경고"""
+        recent = Counter(entry["recent"])
+        total = Counter(entry["total"])
+        if len(entry["recent"]) < SHIFT_MIN_RECENT or sum(total.values()) < 2 * RECENT_WINDOW:
+            return
+
+        usual, usual_count = total.most_common(1)[0]
+        current, current_count = recent.most_common(1)[0]
+        key = (store, field)
+        if current == usual:
+            self.shifted.discard(key)
+            return
+        if key in self.shifted:
+            return
+
+        self.shifted.add(key)
+        logging.warning(
+            f"⚠️ {store} {field} 추출 경로 변화: "
+            f"{usual} (누적 {usual_count / sum(total.values()):.0%}) → "
+            f"{current} (최근 {current_count / len(entry['recent']):.0%}) "
+            f"- 페이지 레이아웃 변경 가능성"
+        )
+
+    def order_hints(self) -> Dict[str, Dict[str, Any]]:
+        """
+        서점/필드별로 먼저 시도할 추출 단계와 단계별 패턴 순서
+
+        최근 기록을 우선으로, 같으면 누적 기록으로 많이 이긴 순서입니다.
+        적중이 MIN_SAMPLES보다 적은 필드는 기본 순서를 그대로 씁니다.
+
+        Returns:
+            {서점: {필드: {"tiers": [...], "patterns": {단계: [인덱스, ...]}}}}
+        """
+        hints: Dict[str, Dict[str, Any]] = {}
+        for store, store_stats in self.fields.items():
+            for field, entry in store_stats.items():
+                tier_wins: Counter = Counter()
+                pattern_wins: Dict[str, Counter] = {}
+                for weight, labels in ((1, entry["total"]), (RECENT_WINDOW, Counter(entry["recent"]))):
+                    for label, count in labels.items():
+                        parsed = split_label(label)
+                        if parsed is None:
+                            continue
+                        tier, index = parsed
+                        tier_wins[tier] += count * weight
+                        pattern_wins.setdefault(tier, Counter())[index] += count * weight
+
+                if sum(entry["total"].values()) - entry["total"].get(MISS, 0) < MIN_SAMPLES:
+                    continue
+                hints.setdefault(store, {})[field] = {
+                    "tiers": [tier for tier, _ in tier_wins.most_common()],
+                    "patterns": {
+                        tier: [index for index, _ in wins.most_common()]
+                        for tier, wins in pattern_wins.items()
+                    },
+                }
+        return hints
+
+    def save(self):
+        """통계 저장 (임시 파일에 쓴 뒤 교체)"""
+        path = Path(self.stats_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": STATS_VERSION, "stores": self.fields},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        os.replace(temp_path, path)
+
+    def summary(self) -> List[str]:
+        """서점/필드별 가장 많이 이긴 추출 경로 요약"""
+        lines = []
+        for store, store_stats in self.fields.items():
+            for field, entry in store_stats.items():
+                total = Counter(entry["total"])
+                label, count = total.most_common(1)[0]
+                lines.append(
+                    f"{store} {field}: {label} {count / sum(total.values()):.0%} "
+                    f"({sum(total.values())}회)"
+                )
+        return lines
@@ -3,16 +3,29 @@ FastAPI 기반 도서 순위 모니터링 대시보드
 """
 
 import logging
-import sqlite3
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-import pandas as pd
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 
+import observations
+import raw_payloads
+from storage import open_storage
+
+# 차트에 그리는 지표 (observations.metric_key 이름)
+CHART_METRICS = (
+    "kyobo_domestic_rank",
+    "kyobo_it_rank",
+    "yes24_sales_index",
+    "yes24_it_mobile_rank",
+    "aladin_computer_weekly_rank",
+    "aladin_textbook_rank",
+    "aladin_sales_point",
+)
+
 # 로거 설정
 logging.basicConfig(
     level=logging.INFO, format="%(asc time)s - %(levelname)s - %(message)s"
@@ -41,9 +54,10 @@ class BookRankingAPI:
         db_dir = Path(self.db_path).parent
         db_dir.mkdir(parents=True, exist_ok=True)
 
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
+        # WAL 모드로 열어 대시보드 조회가 모니터의 저장을 막지 않도록
+        self.storage = open_storage(self.db_path)
+        with self.storage.write() as cursor:
+            cursor.execute("""
         CREATE TABLE IF NOT EXISTS book_rankings (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp DATETIME NOT NULL,
@@ -60,138 +74,67 @@ class BookRankingAPI:
             aladin_rank_period TEXT,
             aladin_error TEXT,
             raw_data TEXT,
+            raw_hash TEXT,
+            raw_times TEXT,
             created_at DATETIME DEFAULT CURRENT_TIMESTAMP
         )
         """)
-        conn.commit()
-        conn.close()
+            raw_payloads.create_tables(cursor)
+            observations.create_tables(cursor)
+        # 모니터보다 먼저 뜬 경우에도 기존 book_rankings 기록을 바로 조회할 수 있도록 이전
+        with self.storage.write() as conn:
+            book_id = observations.ensure_book(conn, observations.DEFAULT_BOOK_KEY)
+        observations.migrate_wide_table(self.storage, book_id)
         logging.info(f"FastAPI: 데이터베이스 초기화 확인 완료: {self.db_path}")
 
-    def get_connection(self):
-        return sqlite3.connect(self.db_path)
-
-    def get_stats(self):
-        """통계 정보"""
-        conn = self.get_connection()
-
-        try:
-            # 총 레코드 수
-            total_records = conn.execute(
-                "SELECT COUNT(*) FROM book_rankings"
-            ).fetchone()[0]
-
-            # 최신/최오래된 데이터
-            result = conn.execute(
-                "SELECT MIN(timestamp), MAX(timestamp) FROM book_rankings"
-            ).fetchone()
-            oldest, newest = result
-
-            # 최근 24시간 데이터 수
-            since_24h = datetime.now() - timedelta(hours=24)
-            recent_24h = conn.execute(
-                "SELECT COUNT(*) FROM book_rankings WHERE timestamp >= ?", (since_24h,)
-            ).fetchone()[0]
-
-            return {
-                "total_records": total_records,
-                "oldest_data": oldest,
-                "newest_data": newest,
-                "recent_24h": recent_24h,
-            }
-        finally:
-            conn.close()
-
-    def get_latest_data(self):
-        """최신 데이터"""
-        conn = self.get_connection()
-
-        try:
-            query = """
-            SELECT 
-                kyobo_domestic_rank, kyobo_it_rank,
-                yes24_sales_index, yes24_it_mobile_rank,
-                aladin_computer_weekly_rank, aladin_textbook_rank, aladin_sales_point,
-                timestamp
-            FROM book_rankings 
-            ORDER BY timestamp DESC 
-            LIMIT 1
-            """
-
-            result = conn.execute(query).fetchone()
-
-            if result:
+    def resolve_book(self, conn, book_id):
+        """조회할 도서 ID (지정하지 않으면 모니터의 기본 도서)"""
+        return book_id if book_id is not None else observations.default_book_id(conn)
+
+    def get_stats(self, book_id=None):
+        """통계 정보 (도서의 관측 시각 수)"""
+        with self.storage.read() as conn:
+            book_id = self.resolve_book(conn, book_id)
+            if book_id is None:
                 return {
-                    "kyobo_domestic_rank": result[0],
-                    "kyobo_it_rank": result[1],
-                    "yes24_sales_index": result[2],
-                    "yes24_it_mobile_rank": result[3],
-                    "aladin_computer_weekly_rank": result[4],
-                    "aladin_textbook_rank": result[5],
-                    "aladin_sales_point": result[6],
-                    "timestamp": result[7],
+                    "total_records": 0,
+                    "oldest_data": None,
+                    "newest_data": None,
+                    "recent_24h": 0,
                 }
-            return None
-        finally:
-            conn.close()
-
-    def get_chart_data(self, hours=24):
-        """차트 데이터"""
-        conn = self.get_connection()
-
-        try:
-            since = datetime.now() - timedelta(hours=hours)
-
-            query = """
-            SELECT 
-                timestamp,
-                kyobo_domestic_rank, kyobo_it_rank,
-                yes24_sales_index, yes24_it_mobile_rank,
-                aladin_computer_weekly_rank, aladin_textbook_rank, aladin_sales_point
-            FROM book_rankings 
-            WHERE timestamp >= ? 
-            ORDER BY timestamp
-            """
-
-            results = conn.execute(query, (since,)).fetchall()
-
-            data = {
-                "timestamps": [],
-                "kyobo_domestic_rank": [],
-                "kyobo_it_rank": [],
-                "yes24_sales_index": [],
-                "yes24_it_mobile_rank": [],
-                "aladin_computer_weekly_rank": [],
-                "aladin_textbook_rank": [],
-                "aladin_sales_point": [],
-            }
-
-            for row in results:
-                if row[0]:  # timestamp가 있는 경우만
-                    timestamp_str = pd.to_datetime(row[0]).strftime("%Y-%m-%d %H:%M")
-                    data["timestamps"].append(timestamp_str)
-                    data["kyobo_domestic_rank"].append(
-                        row[1] if row[1] is not None else None
-                    )
-                    data["kyobo_it_rank"].append(row[2] if row[2] is not None else None)
-                    data["yes24_sales_index"].append(
-                        row[3] if row[3] is not None else None
-                    )
-                    data["yes24_it_mobile_rank"].append(
-                        row[4] if row[4] is not None else None
-                    )
-                    data["aladin_computer_weekly_rank"].append(
-                        row[5] if row[5] is not None else None
-                    )
-                    data["aladin_textbook_rank"].append(
-                        row[6] if row[6] is not None else None
-                    )
-                    data["aladin_sales_point"].append(
-                        row[7] if row[7] is not None else None
-                    )
-
-            return data
-        finally:
-            conn.close()
+            return observations.book_stats(conn, book_id)
+
+    def get_latest_data(self, book_id=None):
+        """최신 데이터 (latest_observations에서 지표별 마지막 값)"""
+        with self.storage.read() as conn:
+            book_id = self.resolve_book(conn, book_id)
+            if book_id is None:
+                return None
+            return observations.latest_values(conn, book_id)
+
+    def get_chart_data(self, hours=24, book_id=None):
+        """차트 데이터 (짧은 기간은 관측값, 긴 기간은 시간/일 집계를 기본 키 범위로 조회)"""
+        with self.storage.read() as conn:
+            book_id = self.resolve_book(conn, book_id)
+            timestamps, values = (
+                observations.range_series(conn, book_id, hours)
+                if book_id is not None
+                else ([], {})
+            )
+
+        data = {
+            "timestamps": [
+                datetime.fromisoformat(str(ts)).strftime("%Y-%m-%d %H:%M") for ts in timestamps
+            ]
+        }
+        for key in CHART_METRICS:
+            data[key] = values.get(key, [None] * len(timestamps))
+        return data
+
+    def get_books(self, limit=100, offset=0):
+        """도서 목록과 도서별 최신 지표"""
+        with self.storage.read() as conn:
+            return observations.list_books(conn, limit, offset)
 
 
 # API 인스턴스
@@ -199,12 +142,12 @@ api = BookRankingAPI()
 
 
 @app.get("/", response_class=HTMLResponse)
-async def dashboard(request: Request):
+async def dashboard(request: Request, book_id: Optional[int] = None):
     """메인 대시보드 페이지"""
     logging.info("메인 대시보드 요청")
     try:
-        stats = api.get_stats()
-        latest = api.get_latest_data()
+        stats = api.get_stats(book_id)
+        latest = api.get_latest_data(book_id)
 
         # HTML 직접 반환 (템플릿 파일 없이)
         html_content = f"""
@@ -364,7 +307,11 @@ async def dashboard(request: Request):
                     <option value="24" selected>최근 24시간</option>
                     <option value="48">최근 48시간</option>
                     <option value="168">최근 7일</option>
+                    <option value="720">최근 30일</option>
+                    <option value="0">전체 기간</option>
                 </select>
+                <label for="book">도서:</label>
+                <select id="book" onchange="location.search = '?book_id=' + this.value"></select>
                 <button onclick="updateCharts()">🔄 새로고침</button>
                 <button onclick="toggleAutoRefresh()" id="autoRefreshBtn">⏸️ 자동새로고침 중지</button>
             </div>
@@ -387,6 +334,21 @@ async def dashboard(request: Request):
                 let rankChart, salesChart;
                 let autoRefreshInterval;
                 let isAutoRefresh = true;
+                const bookId = new URLSearchParams(location.search).get('book_id') || '';
+
+                // 도서 선택 목록 (도서별 최신 지표만 읽는 /api/books)
+                async function loadBooks() {{
+                    const response = await fetch('/api/books?limit=1000');
+                    const books = await response.json();
+                    const select = document.getElementById('book');
+                    for (const book of books) {{
+                        const option = document.createElement('option');
+                        option.value = book.id;
+                        option.textContent = book.title || book.key;
+                        option.selected = String(book.id) === bookId;
+                        select.appendChild(option);
+                    }}
+                }}
 
                 // 차트 초기화
                 function initCharts() {{
@@ -499,7 +461,7 @@ async def dashboard(request: Request):
                     const hours = document.getElementById('timeRange').value;
                     
                     try {{
-                        const response = await fetch(`/api/chart-data?hours=${{hours}}`);
+                        const response = await fetch(`/api/chart-data?hours=${{hours}}${{bookId ? '&book_id=' + bookId : ''}}`);
                         const data = await response.json();
 
                         // 순위 차트 업데이트
@@ -546,6 +508,7 @@ async def dashboard(request: Request):
                 document.addEventListener('DOMContentLoaded', function() {{
                     initCharts();
                     updateCharts();
+                    loadBooks();
                     updateCurrentTime();
                     setInterval(updateCurrentTime, 1000);
                     
@@ -585,11 +548,11 @@ async def dashboard(request: Request):
 
 
 @app.get("/api/stats")
-async def get_stats():
+async def get_stats(book_id: Optional[int] = None):
     """통계 API"""
-    logging.info("API 요청: /api/stats")
+    logging.info(f"API 요청: /api/stats?book_id={book_id}")
     try:
-        stats = api.get_stats()
+        stats = api.get_stats(book_id)
         return stats
     except Exception as e:
         logging.error(f"/api/stats 처리 오류: {e}", exc_info=True)
@@ -597,11 +560,11 @@ async def get_stats():
 
 
 @app.get("/api/latest")
-async def get_latest():
+async def get_latest(book_id: Optional[int] = None):
     """최신 데이터 API"""
-    logging.info("API 요청: /api/latest")
+    logging.info(f"API 요청: /api/latest?book_id={book_id}")
     try:
-        latest = api.get_latest_data()
+        latest = api.get_latest_data(book_id)
         return latest
     except Exception as e:
         logging.error(f"/api/latest 처리 오류: {e}", exc_info=True)
@@ -609,17 +572,28 @@ async def get_latest():
 
 
 @app.get("/api/chart-data")
-async def get_chart_data(hours: Optional[int] = 24):
-    """차트 데이터 API"""
-    logging.info(f"API 요청: /api/chart-data?hours={hours}")
+async def get_chart_data(hours: Optional[int] = 24, book_id: Optional[int] = None):
+    """차트 데이터 API (hours=0이면 전체 기간)"""
+    logging.info(f"API 요청: /api/chart-data?hours={hours}&book_id={book_id}")
     try:
-        data = api.get_chart_data(hours)
+        data = api.get_chart_data(hours, book_id)
         return data
     except Exception as e:
         logging.error(f"/api/chart-data 처리 오류: {e}", exc_info=True)
         return {"error": str(e)}
 
 
+@app.get("/api/books")
+async def get_books(limit: int = 100, offset: int = 0):
+    """도서 목록 API (도서별 최신 지표 포함)"""
+    logging.info(f"API 요청: /api/books?limit={limit}&offset={offset}")
+    try:
+        return api.get_books(min(limit, 1000), offset)
+    except Exception as e:
+        logging.error(f"/api/books 처리 오류: {e}", exc_info=True)
+        return {"error": str(e)}
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,231 @@
+"""
+HTTP 응답 녹화/재생 저장소
+스크래퍼가 받은 응답을 URL과 시각 기준으로 압축 저장(record)하고,
+네트워크 없이 httpx transport로 다시 제공(replay)합니다.
+픽스처는 복사해서 쓰는 파일이므로 URL은 API 키를 가린 형태(redact_url)로 저장하고 찾습니다.
+
+저장 구조:
+    <root>/<host>/<URL 해시>/<녹화 시각>.json.gz
+"""
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import random
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+
+from store_endpoints import redact_url
+
+# 재생 시 본문은 이미 디코딩된 상태이므로 인코딩/길이 헤더는 저장하지 않는다
+SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+TIME_FORMAT = "%Y%m%dT%H%M%S%f"
+REPLAY_CHUNK_SIZE = 16 * 1024  # 재생 본문을 나눠 보내는 크기 (스트리밍 다운로드 재현용)
+
+
+class FixtureStore:
+    def __init__(self, root: str):
+        """
+        저장소 초기화
+
+        Args:
+            root: 픽스처 디렉토리 경로
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def url_dir(self, url: str) -> Path:
+        parsed = httpx.URL(redact_url(url))
+        digest = hashlib.sha256(str(parsed).encode("utf-8")).hexdigest()[:16]
+        return self.root / (parsed.host or "unknown") / digest
+
+    def save(self, request: httpx.Request, response: httpx.Response) -> Path:
+        """응답 하나를 압축 저장 (response는 본문을 읽은 상태여야 함)"""
+        recorded_at = datetime.now()
+        fixture = {
+            "url": redact_url(str(request.url)),
+            "method": request.method,
+            "status_code": response.status_code,
+            "headers": [
+                [name, value]
+                for name, value in response.headers.multi_items()
+                if name.lower() not in SKIPPED_HEADERS
+            ],
+            "recorded_at": recorded_at.isoformat(),
+            "body": base64.b64encode(response.content).decode("ascii"),
+        }
+
+        directory = self.url_dir(str(request.url))
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{recorded_at.strftime(TIME_FORMAT)}.json.gz"
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(fixture, f, ensure_ascii=False)
+        return path
+
+    def load(self, url: str, as_of: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """
+        URL의 픽스처 로드
+
+        Args:
+            url: 요청 URL
+            as_of: 이 시각 이전의 가장 최근 녹화 (None이면 가장 최근 녹화)
+        """
+        directory = self.url_dir(url)
+        if not directory.exists():
+            return None
+
+        paths = sorted(directory.glob("*.json.gz"))
+        if as_of is not None:
+            cutoff = as_of.strftime(TIME_FORMAT)
+            paths = [path for path in paths if path.name.split(".")[0] <= cutoff]
+        if not paths:
+            return None
+
+        with gzip.open(paths[-1], "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    def build_response(self, request: httpx.Request, as_of=None) -> httpx.Response:
+        """저장된 픽스처로 응답 생성 (없으면 404)"""
+        fixture = self.load(str(request.url), as_of)
+        if fixture is None:
+            logging.warning(f"재생할 픽스처가 없습니다: {redact_url(str(request.url))}")
+            return httpx.Response(404, request=request, content=b"")
+
+        return httpx.Response(
+            fixture["status_code"],
+            headers=fixture["headers"],
+            content=base64.b64decode(fixture["body"]),
+            request=request,
+        )
+
+    def urls(self):
+        """녹화된 URL 목록 (URL별 가장 최근 녹화 기준)"""
+        urls = []
+        for directory in sorted(self.root.glob("*/*")):
+            paths = sorted(directory.glob("*.json.gz"))
+            if paths:
+                with gzip.open(paths[-1], "rt", encoding="utf-8") as f:
+                    urls.append(json.load(f)["url"])
+        return urls
+
+
+class ReplayStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """재생 본문을 청크로 나눠 전송 속도에 맞춰 흘려보내는 스트림 (동기/비동기 겸용)"""
+
+    def __init__(self, body: bytes, bandwidth: float = 0.0):
+        self.body = body
+        self.bandwidth = bandwidth
+
+    def _chunks(self):
+        for start in range(0, len(self.body), REPLAY_CHUNK_SIZE):
+            yield self.body[start : start + REPLAY_CHUNK_SIZE]
+
+    def __iter__(self):
+        for chunk in self._chunks():
+            if self.bandwidth > 0:
+                time.sleep(len(chunk) / self.bandwidth)
+            yield chunk
+
+    async def __aiter__(self):
+        for chunk in self._chunks():
+            if self.bandwidth > 0:
+                await asyncio.sleep(len(chunk) / self.bandwidth)
+            yield chunk
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """실제 요청을 보내고 응답을 FixtureStore에 녹화하는 transport"""
+
+    def __init__(self, store: FixtureStore, transport: Optional[httpx.BaseTransport] = None):
+        self.store = store
+        self.transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self.transport.handle_request(request)
+        response.read()
+        self.store.save(request, response)
+        return response
+
+    def close(self):
+        self.transport.close()
+
+
+class AsyncRecordingTransport(httpx.AsyncBaseTransport):
+    """RecordingTransport의 비동기 버전"""
+
+    def __init__(
+        self, store: FixtureStore, transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.store = store
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.transport.handle_async_request(request)
+        await response.aread()
+        self.store.save(request, response)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class ReplayTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    네트워크 없이 FixtureStore의 응답을 돌려주는 transport (동기/비동기 겸용)
+
+    latency와 jitter로 실제 서버 응답 시간을 흉내 낼 수 있습니다.
+    """
+
+    def __init__(
+        self,
+        store: FixtureStore,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        as_of: Optional[datetime] = None,
+        bandwidth: float = 0.0,
+    ):
+        """
+        Args:
+            store: 픽스처 저장소
+            latency: 응답마다 추가할 지연시간(초)
+            jitter: 지연시간에 더할 0~jitter초 사이의 무작위 값
+            as_of: 이 시각 이전의 녹화만 재생 (None이면 가장 최근 녹화)
+            bandwidth: 본문 전송 속도(bytes/s, 0이면 제한 없음)
+        """
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self.as_of = as_of
+        self.bandwidth = bandwidth
+
+    def _delay(self) -> float:
+        return self.latency + random.uniform(0, self.jitter)
+
+    def _build_response(self, request: httpx.Request) -> httpx.Response:
+        """저장된 응답을 청크 스트림으로 감싸 반환 (읽기 전에는 본문이 전송되지 않음)"""
+        response = self.store.build_response(request, self.as_of)
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=ReplayStream(response.content, self.bandwidth),
+            request=request,
+        )
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        delay = self._delay()
+        if delay > 0:
+            time.sleep(delay)
+        return self._build_response(request)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        delay = self._delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self._build_response(request)
@@ -0,0 +1,225 @@
+"""
+수집한 원본 HTML 보관소
+수집 주기마다 받은 상품 페이지를 내용 해시(sha256)로 한 번만 저장하고(zstd 또는 zlib 압축),
+주기/서점별로 어떤 본문을 받았는지만 따로 기록합니다.
+추출 로직이 바뀌었을 때 다시 수집하지 않고 과거 데이터를 재추출할 수 있습니다
+(reextract_archive.py).
+"""
+
+import hashlib
+import importlib.util
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from store_endpoints import redact_url
+
+# zstandard가 설치돼 있으면 zstd, 없으면 zlib으로 압축 (읽을 때는 기록된 codec을 따름)
+ZSTD_AVAILABLE = importlib.util.find_spec("zstandard") is not None
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 6
+# 구조화 소스를 parse_store의 sources로 받기 전에 쓰던 YES24 모듈 역할 이름
+LEGACY_ROLES = {"module_html": "bestseller_module"}
+
+
+def compress(text: str, codec: str) -> bytes:
+    data = text.encode("utf-8")
+    if codec == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, ZLIB_LEVEL)
+
+
+def decompress(data: bytes, codec: str) -> str:
+    if codec == "zstd":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    return zlib.decompress(data).decode("utf-8")
+
+
+class HtmlArchive:
+    def __init__(self, archive_path: str, codec: Optional[str] = None):
+        """
+        보관소 초기화
+
+        Args:
+            archive_path: 보관소 SQLite 파일 경로
+            codec: 새 본문 압축 방식 ("zstd" 또는 "zlib", None이면 zstd 가능 여부로 결정)
+        """
+        self.archive_path = archive_path
+        self.codec = codec or ("zstd" if ZSTD_AVAILABLE else "zlib")
+        if self.codec == "zstd" and not ZSTD_AVAILABLE:
+            raise ValueError("zstd 압축에는 zstandard 패키지가 필요합니다")
+        Path(archive_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(archive_path, check_same_thread=False)
+        self.init_database()
+
+    def init_database(self):
+        """보관소 테이블 생성"""
+        with self._lock:
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,  -- 원본 본문의 sha256
+                codec TEXT NOT NULL,
+                raw_size INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                created_at DATETIME NOT NULL
+            )
+            """)
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS captures (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                cycle_id TEXT NOT NULL,  -- 수집 결과의 scraping_date
+                store TEXT NOT NULL,
+                role TEXT NOT NULL,  -- html / 구조화 소스 이름 (bestseller_module 등)
+                url TEXT NOT NULL,
+                hash TEXT,  -- 가져오지 못했거나 받지 않은(구조화 소스로 충분) 페이지는 NULL
+                complete INTEGER NOT NULL DEFAULT 1,  -- 스트리밍 조기 종료로 잘린 본문이면 0
+                captured_at DATETIME NOT NULL
+            )
+            """)
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_captures_cycle ON captures(cycle_id)"
+            )
+            self.conn.commit()
+
+    @staticmethod
+    def body_hash(body: str) -> str:
+        return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+    def _put_blob(self, body: str) -> str:
+        """본문 저장 (같은 내용이 이미 있으면 압축도 하지 않고 해시만 반환)"""
+        body_hash = self.body_hash(body)
+        exists = self.conn.execute(
+            "SELECT 1 FROM blobs WHERE hash = ?", (body_hash,)
+        ).fetchone()
+        if not exists:
+            self.conn.execute(
+                "INSERT INTO blobs (hash, codec, raw_size, data, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    body_hash,
+                    self.codec,
+                    len(body.encode("utf-8")),
+                    compress(body, self.codec),
+                    datetime.now().isoformat(),
+                ),
+            )
+        return body_hash
+
+    def record_capture(
+        self,
+        cycle_id: str,
+        store: str,
+        url: str,
+        pages: Dict[str, Any],
+        complete: bool = True,
+    ):
+        """
+        수집 주기 하나에서 서점 페이지 묶음 기록
+
+        Args:
+            cycle_id: 수집 결과의 scraping_date
+            store: 서점 이름
+            url: 상품 페이지 URL
+            pages: parse_store에 넘긴 페이지 ({"html", "sources"})
+            complete: 본문을 끝까지 받았는지 (스트리밍 조기 종료면 False)
+        """
+        now = datetime.now().isoformat()
+        entries = [("html", url, pages.get("html"), complete)]
+        for name, source in (pages.get("sources") or {}).items():
+            entries.append((name, redact_url(source["url"]), source.get("body"), True))
+
+        with self._lock:
+            for role, page_url, body, page_complete in entries:
+                body_hash = self._put_blob(body) if body else None
+                self.conn.execute(
+                    "INSERT INTO captures "
+                    "(cycle_id, store, role, url, hash, complete, captured_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (cycle_id, store, role, page_url, body_hash, int(page_complete), now),
+                )
+            self.conn.commit()
+
+    def cycles(self, since: Optional[str] = None, until: Optional[str] = None) -> List[str]:
+        """보관된 수집 주기 목록 (scraping_date 오름차순)"""
+        query = "SELECT DISTINCT cycle_id FROM captures WHERE 1 = 1"
+        params: List[str] = []
+        if since:
+            query += " AND cycle_id >= ?"
+            params.append(since)
+        if until:
+            query += " AND cycle_id < ?"
+            params.append(until)
+        with self._lock:
+            rows = self.conn.execute(query + " ORDER BY cycle_id", params).fetchall()
+        return [row[0] for row in rows]
+
+    def packed_captures(self, cycle_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        수집 주기 하나의 서점별 압축 본문 (압축은 풀지 않음 - 워커에서 unpack_pages로 풂)
+
+        Returns:
+            {서점: {"url": ..., "complete": ..., "pages": {역할: (url, codec, data 또는 None)}}}
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                """
+                SELECT c.store, c.role, c.url, c.complete, b.codec, b.data
+                FROM captures c LEFT JOIN blobs b ON b.hash = c.hash
+                WHERE c.cycle_id = ?
+                ORDER BY c.id
+                """,
+                (cycle_id,),
+            ).fetchall()
+
+        captures: Dict[str, Dict[str, Any]] = {}
+        for store, role, url, complete, codec, data in rows:
+            entry = captures.setdefault(store, {"url": None, "complete": True, "pages": {}})
+            if role == "html":
+                entry["url"] = url
+                entry["complete"] = bool(complete)
+            entry["pages"][role] = (url, codec, data)
+        return captures
+
+    def stats(self) -> Dict[str, Any]:
+        """보관소 크기와 중복 제거 효과"""
+        with self._lock:
+            blobs, raw_size, stored_size = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), "
+                "COALESCE(SUM(LENGTH(data)), 0) FROM blobs"
+            ).fetchone()
+            captures, captured_size = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(b.raw_size), 0) "
+                "FROM captures c LEFT JOIN blobs b ON b.hash = c.hash"
+            ).fetchone()
+        return {
+            "blobs": blobs,
+            "captures": captures,
+            "captured_bytes": captured_size,
+            "unique_bytes": raw_size,
+            "stored_bytes": stored_size,
+        }
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def unpack_pages(packed: Dict[str, Any]) -> Dict[str, Any]:
+    """packed_captures의 서점 항목을 parse_store에 넘길 페이지로 복원"""
+    pages: Dict[str, Any] = {"html": None, "sources": {}}
+    for role, (url, codec, data) in packed["pages"].items():
+        body = decompress(data, codec) if data is not None else None
+        if role == "html":
+            pages["html"] = body
+        else:
+            pages["sources"][LEGACY_ROLES.get(role, role)] = {"url": url, "body": body}
+    return pages
+
@@ -0,0 +1,99 @@
+"""
+book_rankings → observations 이전
+넓은 테이블의 서점 지표 컬럼을 (book_id, store, metric, ts, value) 관측값으로 옮깁니다.
+모니터와 대시보드도 시작할 때 아직 옮기지 않은 행을 이전하지만, 기록이 많으면 미리 실행해 둘 수 있습니다.
+배치마다 커밋하고 진행 상황을 observation_meta에 남기므로 중단해도 이어서 실행됩니다.
+
+사용 예:
+    uv run python migrate_observations.py --db data/book_rankings.db
+    uv run python migrate_observations.py --db data/book_rankings.db --verify
+"""
+
+import argparse
+import logging
+import time
+
+import observations
+import raw_payloads
+from storage import open_storage
+
+
+def verify(storage, book_id: int) -> bool:
+    """이전한 book_rankings 행의 지표 값 개수와 관측값 개수 비교 (이어 적은 서점 값은 제외)"""
+    columns = [
+        (store, metric, observations.RANKING_COLUMNS[store][metric])
+        for store, metrics in observations.STORE_METRICS.items()
+        for metric in metrics
+        if metric in observations.RANKING_COLUMNS.get(store, {})
+    ]
+    expected = {(store, metric): 0 for store, metric, _ in columns}
+    with storage.read() as conn:
+        through = int(observations.get_meta(conn, "wide_migrated_through") or 0)
+        for row in conn.execute(
+            f"SELECT timestamp, raw_data, raw_hash, "
+            f"{', '.join(column for _, _, column in columns)} FROM book_rankings WHERE id <= ?",
+            (through,),
+        ):
+            carried = raw_payloads.carried_over(conn, row[1], row[2])
+            for _, _, store, metric, _ in observations.wide_row_observations(
+                book_id, row[0], carried, row[3:], columns
+            ):
+                expected[(store, metric)] += 1
+        actual = dict(
+            ((store, metric), count)
+            for store, metric, count in conn.execute(
+                "SELECT store, metric, COUNT(*) FROM observations WHERE book_id = ? "
+                "GROUP BY store, metric",
+                (book_id,),
+            )
+        )
+
+    ok = True
+    for (store, metric), count in expected.items():
+        found = actual.get((store, metric), 0)
+        # 모니터가 직접 저장한 관측값이 더 있을 수 있으므로 적은 경우만 문제
+        status = "✅" if found >= count else "❌"
+        ok = ok and found >= count
+        logging.info(f"  {status} {store}.{metric}: book_rankings {count}개 → 관측값 {found}개")
+    return ok
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="book_rankings를 정규화된 관측값 테이블로 이전")
+    parser.add_argument("--db", default="data/book_rankings.db", help="데이터베이스 파일 경로")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=observations.MIGRATION_BATCH_SIZE,
+        help="한 트랜잭션에서 옮길 book_rankings 행 수",
+    )
+    parser.add_argument("--verify", action="store_true", help="이전 후 지표별 개수 비교")
+    args = parser.parse_args()
+
+    storage = open_storage(args.db)
+    try:
+        with storage.write() as conn:
+            raw_payloads.create_tables(conn)
+            observations.create_tables(conn)
+            book_id = observations.ensure_book(conn, observations.DEFAULT_BOOK_KEY)
+
+        started = time.perf_counter()
+        count = observations.migrate_wide_table(storage, book_id, args.batch_size)
+        with storage.read() as conn:
+            through = observations.get_meta(conn, "wide_migrated_through")
+        logging.info(
+            f"관측값 {count}개 이전 ({time.perf_counter() - started:.1f}초, "
+            f"book_rankings id {through}까지 완료)"
+        )
+
+        if args.verify:
+            logging.info("🔎 지표별 개수 비교:")
+            if not verify(storage, book_id):
+                logging.error("관측값이 book_rankings보다 적은 지표가 있습니다")
+    finally:
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
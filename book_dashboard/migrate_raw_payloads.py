@@ -0,0 +1,155 @@
+"""
+book_rankings.raw_data → raw_payloads 이전
+행마다 JSON으로 저장하던 원본 수집 결과를 내용 해시로 중복 제거해 압축 저장하고,
+행에는 해시와 서점별 수집 시각만 남깁니다. 배치마다 커밋하므로 중단해도 이어서 실행됩니다.
+이전 전후의 DB 크기와 조회 시간을 비교해 출력합니다 (--vacuum이면 줄어든 공간을 파일에서 회수).
+
+사용 예:
+    uv run python migrate_raw_payloads.py --db data/book_rankings.db
+    uv run python migrate_raw_payloads.py --db data/book_rankings.db --vacuum
+"""
+
+import argparse
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+
+import observations
+import raw_payloads
+from book_ranking_monitor import BookRankingMonitor
+from storage import open_storage
+
+QUERY_REPEAT = 5
+
+
+def scan_rankings(conn, since):
+    """순위 컬럼 전체 스캔 (행이 작을수록 읽는 페이지가 줄어듦)"""
+    conn.execute(
+        "SELECT COUNT(*), MIN(kyobo_it_rank), MAX(yes24_sales_index) FROM book_rankings"
+    ).fetchall()
+
+
+def read_recent_rows(conn, since):
+    """최근 7일 행 전체 (get_recent_data처럼 원본 결과까지 JSON으로)"""
+    for row in conn.execute(
+        "SELECT id, scraping_date, raw_data, raw_hash, raw_times FROM book_rankings "
+        "WHERE timestamp >= ?",
+        (since,),
+    ):
+        raw_payloads.load(conn, row[2], row[3], row[4], row[1])
+
+
+QUERIES = {
+    "순위 컬럼 전체 스캔": scan_rankings,
+    "최근 7일 원본 결과 읽기": read_recent_rows,
+}
+
+
+def database_size(conn) -> int:
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    return page_count * page_size
+
+
+def measure(storage) -> dict:
+    """DB 크기와 조회별 평균 시간(초, 원본 본문 캐시 포함)"""
+    since = datetime.now() - timedelta(days=7)
+    timings = {}
+    with storage.read() as conn:
+        size = database_size(conn)
+        for name, query in QUERIES.items():
+            started = time.perf_counter()
+            for _ in range(QUERY_REPEAT):
+                query(conn, since)
+            timings[name] = (time.perf_counter() - started) / QUERY_REPEAT
+    return {"size": size, "timings": timings}
+
+
+def migrate(storage, batch_size: int, codec: str) -> tuple:
+    """raw_data가 남은 행을 배치마다 옮김 (옮긴 행 수, 그대로 둔 행 수)"""
+    migrated = kept = 0
+    after_id = 0
+    while True:
+        with storage.write() as conn:
+            rows = conn.execute(
+                "SELECT id, scraping_date, raw_data FROM book_rankings "
+                "WHERE id > ? AND raw_data IS NOT NULL ORDER BY id LIMIT ?",
+                (after_id, batch_size),
+            ).fetchall()
+            if not rows:
+                return migrated, kept
+            for row_id, scraping_date, raw_data in rows:
+                if raw_payloads.migrate_row(conn, row_id, scraping_date, raw_data, codec):
+                    migrated += 1
+                else:
+                    kept += 1
+        after_id = rows[-1][0]
+        logging.info(f"  book_rankings id {after_id}까지 처리 (이전 {migrated}행)")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="book_rankings.raw_data를 중복 제거·압축 저장소로 이전")
+    parser.add_argument("--db", default="data/book_rankings.db", help="데이터베이스 파일 경로")
+    parser.add_argument(
+        "--batch-size", type=int, default=2000, help="한 트랜잭션에서 옮길 book_rankings 행 수"
+    )
+    parser.add_argument(
+        "--codec",
+        choices=["zstd", "zlib"],
+        default=raw_payloads.DEFAULT_CODEC,
+        help="압축 방식 (기본값: zstandard가 있으면 zstd)",
+    )
+    parser.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="이전 후 VACUUM으로 파일 크기 줄이기 (DB를 쓰는 다른 프로세스를 멈춘 뒤 실행)",
+    )
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        parser.error(f"데이터베이스 파일이 없습니다: {args.db}")
+
+    storage = open_storage(args.db)
+    try:
+        with storage.write() as conn:
+            BookRankingMonitor.create_tables(conn)
+            raw_payloads.create_tables(conn)
+            observations.create_tables(conn)
+
+        before = measure(storage)
+        started = time.perf_counter()
+        migrated, kept = migrate(storage, args.batch_size, args.codec)
+        elapsed = time.perf_counter() - started
+        if args.vacuum:
+            logging.info("VACUUM 실행 중...")
+            storage.checkpoint("TRUNCATE")
+            storage.connection().execute("VACUUM")
+        after = measure(storage)
+        with storage.read() as conn:
+            stats = raw_payloads.stats(conn)
+    finally:
+        storage.close()
+
+    logging.info("========== 🗜️ raw_data 이전 결과 ==========")
+    logging.info(
+        f"이전 {migrated}행 ({elapsed:.1f}초)"
+        + (f", 형식이 달라 raw_data로 둔 행 {kept}개" if kept else "")
+    )
+    logging.info(
+        f"본문 {stats['payloads']}개가 {stats['rows']}행에서 참조 "
+        f"(압축 전 {stats['raw_bytes'] / 1024:.1f}KB → 저장 {stats['stored_bytes'] / 1024:.1f}KB)"
+    )
+    logging.info(
+        f"DB 크기: {before['size'] / 1024 / 1024:.2f}MB → {after['size'] / 1024 / 1024:.2f}MB"
+        + ("" if args.vacuum else " (--vacuum 전에는 빈 페이지가 파일에 남음)")
+    )
+    for name in QUERIES:
+        logging.info(
+            f"{name}: {before['timings'][name] * 1000:.2f}ms → {after['timings'][name] * 1000:.2f}ms"
+        )
+    logging.info("========================================")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,520 @@
+"""
+정규화된 순위 관측값 저장소
+서점 지표마다 컬럼을 두는 book_rankings(넓은 테이블) 대신 (book_id, store, metric, ts, value)
+한 행에 관측값 하나를 저장합니다. 새 지표는 STORE_METRICS에 이름만 추가하면 되고(ALTER 불필요),
+도서 수와 상관없이 같은 테이블에 쌓입니다.
+
+테이블:
+    books: 도서 (key로 식별, 서점별 상품 ID는 book_products)
+    observations: 관측값 - 기본 키 (book_id, ts, store, metric)로 도서 하나의 기간 조회가 범위 스캔
+    latest_observations: 도서·서점·지표별 마지막 값 - 도서 목록/최신 현황을 전체 스캔 없이 조회
+    observation_meta: book_rankings 이전 진행 상황 등
+    observations_hourly/observations_daily: 시간/일 단위 집계 (rollups.py)
+
+book_rankings는 수집 주기 원본 기록(raw_payloads)과 기존 도구(재추출, 적응형 스케줄)를 위해 계속 쓰고,
+조회(대시보드)는 observations를 사용합니다.
+"""
+
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import raw_payloads
+import rollups
+
+# 서점 결과 필드 → book_rankings 컬럼 (넓은 테이블은 이 컬럼에서 더 늘리지 않음)
+RANKING_COLUMNS = {
+    "kyobobook": {
+        "domestic_rank": "kyobo_domestic_rank",
+        "it_rank": "kyobo_it_rank",
+        "error": "kyobo_error",
+    },
+    "yes24": {
+        "sales_index": "yes24_sales_index",
+        "it_mobile_rank": "yes24_it_mobile_rank",
+        "error": "yes24_error",
+    },
+    "aladin": {
+        "computer_weekly_rank": "aladin_computer_weekly_rank",
+        "textbook_rank": "aladin_textbook_rank",
+        "sales_point": "aladin_sales_point",
+        "rank_period": "aladin_rank_period",
+        "error": "aladin_error",
+    },
+}
+# 콤마가 섞인 문자열로 추출될 수 있는 정수 컬럼
+NUMERIC_TEXT_COLUMNS = {"yes24_sales_index", "aladin_sales_point"}
+
+# 서점별로 관측값으로 저장할 결과 필드 (새 지표는 여기에만 추가)
+STORE_METRICS = {
+    "kyobobook": ("domestic_rank", "it_rank"),
+    "yes24": ("sales_index", "it_mobile_rank"),
+    "aladin": ("computer_weekly_rank", "textbook_rank", "sales_point", "rank_period"),
+}
+# 모니터가 URL 목록으로 수집하는 기본 도서
+DEFAULT_BOOK_KEY = "default"
+# book_rankings를 한 트랜잭션에서 옮기는 행 수
+MIGRATION_BATCH_SIZE = 2000
+
+
+def metric_key(store: str, metric: str) -> str:
+    """대시보드 응답에 쓰는 지표 이름 (기존 넓은 테이블 컬럼명과 같음)"""
+    column = RANKING_COLUMNS.get(store, {}).get(metric)
+    return column or f"{store}_{metric}"
+
+
+def metric_value(value: Any) -> Any:
+    """관측값으로 저장할 값 ("1,234" 같은 숫자 문자열은 정수로)"""
+    if isinstance(value, str):
+        digits = value.replace(",", "").strip()
+        if digits.lstrip("-").isdigit():
+            return int(digits)
+        return value or None
+    return value
+
+
+def create_tables(conn: sqlite3.Connection):
+    """관측값 테이블과 인덱스 생성"""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS books (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        key TEXT NOT NULL UNIQUE,
+        title TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS book_products (
+        store TEXT NOT NULL,
+        product_id TEXT NOT NULL,
+        book_id INTEGER NOT NULL REFERENCES books(id),
+        PRIMARY KEY (store, product_id)
+    )
+    """)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_book_products_book ON book_products(book_id)"
+    )
+    # 도서 하나의 기간 조회가 기본 키 범위 스캔이 되도록 book_id, ts 순서로 클러스터링
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS observations (
+        book_id INTEGER NOT NULL,
+        ts DATETIME NOT NULL,
+        store TEXT NOT NULL,
+        metric TEXT NOT NULL,
+        value NUMERIC,
+        PRIMARY KEY (book_id, ts, store, metric)
+    ) WITHOUT ROWID
+    """)
+    # 여러 도서를 지표 하나로 비교하는 조회 (서점·지표별 시간 범위)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_observations_metric "
+        "ON observations(store, metric, ts, book_id)"
+    )
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS latest_observations (
+        book_id INTEGER NOT NULL,
+        store TEXT NOT NULL,
+        metric TEXT NOT NULL,
+        ts DATETIME NOT NULL,
+        value NUMERIC,
+        PRIMARY KEY (book_id, store, metric)
+    ) WITHOUT ROWID
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS observation_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )
+    """)
+    rollups.create_tables(conn)
+
+
+def ensure_book(
+    conn: sqlite3.Connection,
+    key: str,
+    title: Optional[str] = None,
+    products: Iterable[Tuple[str, str]] = (),
+    relink: bool = True,
+) -> int:
+    """
+    key에 해당하는 도서 ID (없으면 생성), 서점별 상품 ID 연결
+
+    Args:
+        relink: 다른 도서에 연결된 상품도 이 도서로 옮길지 여부 (False면 연결 안 된 상품만)
+    """
+    row = conn.execute("SELECT id FROM books WHERE key = ?", (key,)).fetchone()
+    if row:
+        book_id = row[0]
+        if title is not None:
+            conn.execute("UPDATE books SET title = ? WHERE id = ?", (title, book_id))
+    else:
+        book_id = conn.execute(
+            "INSERT INTO books (key, title) VALUES (?, ?)", (key, title)
+        ).lastrowid
+    conn.executemany(
+        "INSERT INTO book_products (store, product_id, book_id) VALUES (?, ?, ?) "
+        + (
+            "ON CONFLICT (store, product_id) DO UPDATE SET book_id = excluded.book_id"
+            if relink
+            else "ON CONFLICT (store, product_id) DO NOTHING"
+        ),
+        [(store, str(product_id), book_id) for store, product_id in products],
+    )
+    return book_id
+
+
+def book_for_product(conn: sqlite3.Connection, store: str, product_id: str) -> int:
+    """서점 상품의 도서 ID (연결된 도서가 없으면 상품 하나짜리 도서 생성)"""
+    row = conn.execute(
+        "SELECT book_id FROM book_products WHERE store = ? AND product_id = ?",
+        (store, str(product_id)),
+    ).fetchone()
+    if row:
+        return row[0]
+    return ensure_book(conn, f"{store}:{product_id}", products=[(store, product_id)])
+
+
+def store_rows(
+    book_id: int,
+    store: str,
+    data: Dict[str, Any],
+    ts: Any,
+    metrics: Optional[Iterable[str]] = None,
+) -> List[Tuple[Any, ...]]:
+    """
+    서점 결과 하나의 지표를 관측값 행으로 변환
+
+    값이 없는 지표(순위권 밖, 추출 실패)는 건너뜁니다.
+    """
+    rows = []
+    for metric in metrics or STORE_METRICS.get(store, ()):
+        value = metric_value(data.get(metric))
+        if value is not None:
+            rows.append((book_id, ts, store, metric, value))
+    return rows
+
+
+def result_rows(
+    book_id: int,
+    results: Dict[str, Any],
+    ts: Any,
+    stores: Optional[Iterable[str]] = None,
+) -> List[Tuple[Any, ...]]:
+    """scrape_all 결과의 서점별 관측값 행 (stores가 있으면 그 서점만, 오류가 난 서점도 얻은 값은 포함)"""
+    rows = []
+    for store in stores if stores is not None else STORE_METRICS:
+        data = results.get(store)
+        if isinstance(data, dict):
+            rows.extend(store_rows(book_id, store, data, ts))
+    return rows
+
+
+def record_rows(conn: sqlite3.Connection, rows: List[Tuple[Any, ...]]) -> int:
+    """
+    관측값 행 저장과 최신 값, 시간/일 집계 갱신 (열린 쓰기 트랜잭션 안에서 호출)
+
+    여러 도서/수집 주기의 행을 모아 한 번에 넘기면 문장 두 개로 저장하고,
+    집계는 행들이 걸친 구간만 다시 계산합니다.
+
+    Returns:
+        저장한 관측값 수
+    """
+    if not rows:
+        return 0
+    conn.executemany(
+        "INSERT OR REPLACE INTO observations (book_id, ts, store, metric, value) "
+        "VALUES (?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.executemany(
+        """
+    INSERT INTO latest_observations (book_id, ts, store, metric, value) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (book_id, store, metric) DO UPDATE SET ts = excluded.ts, value = excluded.value
+    WHERE excluded.ts >= latest_observations.ts
+    """,
+        rows,
+    )
+    rollups.refresh(conn, rows)
+    return len(rows)
+
+
+def record_store(
+    conn: sqlite3.Connection,
+    book_id: int,
+    store: str,
+    data: Dict[str, Any],
+    ts: Any,
+    metrics: Optional[Iterable[str]] = None,
+) -> int:
+    """서점 결과 하나의 지표를 관측값으로 저장 (열린 쓰기 트랜잭션 안에서 호출)"""
+    return record_rows(conn, store_rows(book_id, store, data, ts, metrics))
+
+
+def record_results(
+    conn: sqlite3.Connection,
+    book_id: int,
+    results: Dict[str, Any],
+    ts: Any,
+    stores: Optional[Iterable[str]] = None,
+) -> int:
+    """scrape_all 결과의 서점별 지표 저장 (stores가 있으면 그 서점만, 오류가 난 서점도 얻은 값은 저장)"""
+    return record_rows(conn, result_rows(book_id, results, ts, stores))
+
+
+def get_meta(conn: sqlite3.Connection, key: str) -> Optional[str]:
+    row = conn.execute("SELECT value FROM observation_meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def set_meta(conn: sqlite3.Connection, key: str, value: Any):
+    conn.execute(
+        "INSERT INTO observation_meta (key, value) VALUES (?, ?) "
+        "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+        (key, str(value)),
+    )
+
+
+def wide_row_observations(
+    book_id: int,
+    timestamp: Any,
+    carried: set,
+    values: Tuple[Any, ...],
+    columns: List[Tuple[str, str, str]],
+) -> List[Tuple[Any, ...]]:
+    """
+    book_rankings 행 하나를 관측값 행으로 변환
+
+    Args:
+        carried: 직전 값을 이어 적은 서점 (raw_payloads.carried_over)
+        values: 컬럼 값들
+        columns: values에 대응하는 (서점, 지표, 컬럼명)
+    """
+    observations = []
+    for (store, metric, _), value in zip(columns, values):
+        # 다른 서점만 수집하며 직전 값을 이어 적은 컬럼은 관측값이 아님
+        if store in carried:
+            continue
+        value = metric_value(value)
+        if value is not None:
+            observations.append((book_id, timestamp, store, metric, value))
+    return observations
+
+
+def migrate_wide_rows(
+    conn: sqlite3.Connection,
+    book_id: int,
+    after_id: int = 0,
+    row_ids: Optional[List[int]] = None,
+    limit: int = MIGRATION_BATCH_SIZE,
+) -> Tuple[int, int]:
+    """
+    book_rankings 행을 관측값으로 옮김 (열린 쓰기 트랜잭션 안에서 호출, 같은 행을 다시 옮겨도 덮어씀)
+
+    Args:
+        book_id: 넓은 테이블 행이 속한 도서
+        after_id: 이 id 다음 행부터 limit개
+        row_ids: 지정하면 이 행들만 (재추출로 값이 바뀐 행)
+
+    Returns:
+        (옮긴 행 중 마지막 id, 저장한 관측값 수) - 옮길 행이 없으면 (after_id, 0)
+    """
+    columns = [
+        (store, metric, RANKING_COLUMNS[store][metric])
+        for store, metrics in STORE_METRICS.items()
+        for metric in metrics
+        if metric in RANKING_COLUMNS.get(store, {})
+    ]
+    select = (
+        f"SELECT id, timestamp, raw_data, raw_hash, "
+        f"{', '.join(column for _, _, column in columns)} FROM book_rankings"
+    )
+    if row_ids is not None:
+        rows = conn.execute(
+            f"{select} WHERE id IN ({', '.join('?' * len(row_ids))}) ORDER BY id", row_ids
+        ).fetchall()
+    else:
+        rows = conn.execute(
+            f"{select} WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit)
+        ).fetchall()
+    if not rows:
+        return after_id, 0
+
+    observations = []
+    for row in rows:
+        carried = raw_payloads.carried_over(conn, row[2], row[3])
+        observations.extend(wide_row_observations(book_id, row[1], carried, row[4:], columns))
+    if row_ids is not None:
+        # 재추출로 값이 비게 된 지표가 남지 않도록 그 시각의 넓은 테이블 지표를 지우고 다시 저장
+        conn.executemany(
+            "DELETE FROM observations WHERE book_id = ? AND ts = ? AND store = ? AND metric = ?",
+            [(book_id, row[1], store, metric) for row in rows for store, metric, _ in columns],
+        )
+        # 지표가 모두 비게 된 시각의 집계도 다시 계산
+        rollups.refresh(conn, [(book_id, row[1]) for row in rows])
+    record_rows(conn, observations)
+    return rows[-1][0], len(observations)
+
+
+def migrate_wide_table(storage, book_id: int, batch_size: int = MIGRATION_BATCH_SIZE) -> int:
+    """
+    아직 옮기지 않은 book_rankings 행을 모두 관측값으로 옮김 (배치마다 커밋, 중단 후 이어서 실행 가능)
+
+    Returns:
+        저장한 관측값 수
+    """
+    total = 0
+    while True:
+        with storage.write() as conn:
+            after_id = int(get_meta(conn, "wide_migrated_through") or 0)
+            last_id, count = migrate_wide_rows(conn, book_id, after_id, limit=batch_size)
+            if last_id == after_id:
+                return total
+            set_meta(conn, "wide_migrated_through", last_id)
+        total += count
+
+
+def default_book_id(conn: sqlite3.Connection) -> Optional[int]:
+    row = conn.execute("SELECT id FROM books WHERE key = ?", (DEFAULT_BOOK_KEY,)).fetchone()
+    if row:
+        return row[0]
+    row = conn.execute("SELECT MIN(id) FROM books").fetchone()
+    return row[0]
+
+
+def list_books(
+    conn: sqlite3.Connection, limit: int = 100, offset: int = 0
+) -> List[Dict[str, Any]]:
+    """도서 목록과 도서별 최신 지표 (latest_observations만 읽음)"""
+    books = conn.execute(
+        "SELECT id, key, title FROM books ORDER BY id LIMIT ? OFFSET ?", (limit, offset)
+    ).fetchall()
+    if not books:
+        return []
+    ids = [book[0] for book in books]
+    latest: Dict[int, Dict[str, Any]] = {book_id: {} for book_id in ids}
+    updated: Dict[int, str] = {}
+    for book_id, store, metric, ts, value in conn.execute(
+        f"SELECT book_id, store, metric, ts, value FROM latest_observations "
+        f"WHERE book_id IN ({', '.join('?' * len(ids))})",
+        ids,
+    ):
+        latest[book_id][metric_key(store, metric)] = value
+        updated[book_id] = max(updated.get(book_id, ts), ts)
+    return [
+        {
+            "id": book_id,
+            "key": key,
+            "title": title,
+            "latest": latest[book_id],
+            "updated_at": updated.get(book_id),
+        }
+        for book_id, key, title in books
+    ]
+
+
+def latest_values(conn: sqlite3.Connection, book_id: int) -> Optional[Dict[str, Any]]:
+    """도서의 지표별 마지막 값과 가장 최근 관측 시각"""
+    rows = conn.execute(
+        "SELECT store, metric, ts, value FROM latest_observations WHERE book_id = ?",
+        (book_id,),
+    ).fetchall()
+    if not rows:
+        return None
+    latest = {metric_key(store, metric): value for store, metric, _, value in rows}
+    latest["timestamp"] = max(ts for _, _, ts, _ in rows)
+    return latest
+
+
+def metric_keys(metrics: Optional[Iterable[Tuple[str, str]]] = None) -> Dict[Tuple[str, str], str]:
+    """{(서점, 지표): 지표 이름} (metrics가 None이면 STORE_METRICS 전체)"""
+    wanted = list(metrics) if metrics is not None else [
+        (store, metric) for store, names in STORE_METRICS.items() for metric in names
+    ]
+    return {pair: metric_key(*pair) for pair in wanted}
+
+
+def series(
+    conn: sqlite3.Connection,
+    book_id: int,
+    since: Optional[datetime] = None,
+    metrics: Optional[Iterable[Tuple[str, str]]] = None,
+) -> Tuple[List[Any], Dict[str, List[Any]]]:
+    """
+    도서의 지표별 시계열 (관측 시각별로 모음, 그 시각에 없는 지표는 None)
+
+    Args:
+        since: 이 시각 이후만 (None이면 전체)
+        metrics: (서점, 지표) 목록 (None이면 STORE_METRICS 전체)
+
+    Returns:
+        (시각 목록, {지표 이름: 값 목록})
+    """
+    keys = metric_keys(metrics)
+    # 기본 키 (book_id, ts, ...) 범위 스캔 - 이미 시각 순서
+    rows = conn.execute(
+        "SELECT ts, store, metric, value FROM observations "
+        "WHERE book_id = ? AND ts >= ? ORDER BY ts",
+        (book_id, since or ""),
+    )
+    timestamps: List[Any] = []
+    values: Dict[str, List[Any]] = {key: [] for key in keys.values()}
+    for ts, store, metric, value in rows:
+        key = keys.get((store, metric))
+        if key is None:
+            continue
+        if not timestamps or timestamps[-1] != ts:
+            timestamps.append(ts)
+            for column in values.values():
+                column.append(None)
+        values[key][-1] = value
+    return timestamps, values
+
+
+def range_series(
+    conn: sqlite3.Connection,
+    book_id: int,
+    hours: Optional[float] = None,
+    metrics: Optional[Iterable[Tuple[str, str]]] = None,
+) -> Tuple[List[Any], Dict[str, List[Any]]]:
+    """
+    최근 hours시간 시계열 - series와 같은 형태
+
+    rollups.RAW_SERIES_HOURS 이하는 관측값, 그보다 길면 시간 집계, 한 달보다 길거나
+    hours가 없으면(전체 기간) 일 집계를 읽습니다. 관측값을 정리한 기간이 걸리면 시간 집계를 읽습니다.
+    """
+    since = datetime.now() - timedelta(hours=hours) if hours else None
+    granularity = rollups.granularity_for(hours)
+    if granularity is None and str(since) < rollups.pruned_before(conn):
+        granularity = "hour"
+    if granularity is None:
+        return series(conn, book_id, since, metrics)
+    return rollups.series(conn, book_id, granularity, since, metric_keys(metrics))
+
+
+def book_stats(conn: sqlite3.Connection, book_id: int, hours: int = 24) -> Dict[str, Any]:
+    """
+    도서의 관측 시각 수, 처음/마지막 관측 시각, 최근 hours시간 관측 시각 수
+
+    보관 기간이 지나 지운 관측 시각도 observations_pruned로 셉니다
+    (최근 hours시간은 보관 기간(3일 이상) 안이므로 남은 관측값만 셈).
+    """
+    total, oldest, newest = conn.execute(
+        "SELECT COUNT(DISTINCT ts), MIN(ts), MAX(ts) FROM observations WHERE book_id = ?",
+        (book_id,),
+    ).fetchone()
+    pruned = conn.execute(
+        "SELECT records, oldest FROM observations_pruned WHERE book_id = ?", (book_id,)
+    ).fetchone()
+    if pruned:
+        total += pruned[0]
+        oldest = pruned[1]
+    recent = conn.execute(
+        "SELECT COUNT(DISTINCT ts) FROM observations WHERE book_id = ? AND ts >= ?",
+        (book_id, datetime.now() - timedelta(hours=hours)),
+    ).fetchone()[0]
+    return {
+        "total_records": total,
+        "oldest_data": oldest,
+        "newest_data": newest,
+        "recent_24h": recent,
+    }
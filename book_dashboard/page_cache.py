@@ -0,0 +1,189 @@
+"""
+페이지 조건부 요청 캐시
+URL별 ETag / Last-Modified / 본문 해시와 마지막 추출 결과를 SQLite에 보관해
+변경되지 않은 페이지는 다시 내려받거나 파싱하지 않도록 합니다.
+캐시 파일에 API 키가 남지 않도록 URL은 키를 가린 형태(redact_url)로 저장합니다.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from store_endpoints import redact_url
+
+# 추출 로직이 바뀌면 올려서 이전 추출 결과 재사용을 막는다
+EXTRACTION_VERSION = 1
+
+
+class PageCache:
+    def __init__(self, cache_path: str):
+        """
+        캐시 초기화
+
+        Args:
+            cache_path: 캐시 SQLite 파일 경로
+        """
+        self.cache_path = cache_path
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        # 비동기 스크래퍼의 to_thread 저장 등 여러 스레드에서 접근할 수 있다
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self.init_database()
+
+    def init_database(self):
+        """캐시 테이블 생성"""
+        with self._lock:
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS page_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT NOT NULL,
+                body BLOB NOT NULL,  -- zlib 압축된 본문 (304 응답 시 재사용)
+                fetched_at DATETIME NOT NULL
+            )
+            """)
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS result_cache (
+                url TEXT PRIMARY KEY,
+                content_key TEXT NOT NULL,
+                result TEXT NOT NULL,
+                updated_at DATETIME NOT NULL
+            )
+            """)
+            # 키를 가리기 전에 저장된 API URL 행은 지운다 (다음 수집에서 가린 URL로 다시 저장됨)
+            for table in ("page_cache", "result_cache"):
+                urls = [
+                    url
+                    for (url,) in self.conn.execute(f"SELECT url FROM {table}")
+                    if redact_url(url) != url
+                ]
+                self.conn.executemany(
+                    f"DELETE FROM {table} WHERE url = ?", [(url,) for url in urls]
+                )
+            self.conn.commit()
+
+    @staticmethod
+    def body_hash(body: str) -> str:
+        return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def content_key(pages: Iterable[Optional[str]]) -> str:
+        """추출 결과를 결정하는 페이지 묶음의 해시 (추출 로직 버전 포함)"""
+        digest = hashlib.sha256(f"v{EXTRACTION_VERSION}".encode())
+        for page in pages:
+            digest.update(b"\0")
+            digest.update((page or "").encode("utf-8"))
+        return digest.hexdigest()
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """이전 응답 기준의 If-None-Match / If-Modified-Since 헤더"""
+        url = redact_url(url)
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified FROM page_cache WHERE url = ?", (url,)
+            ).fetchone()
+
+        headers = {}
+        if row:
+            etag, last_modified = row
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def get_body(self, url: str) -> Optional[str]:
+        """304 응답 시 사용할 이전 본문"""
+        url = redact_url(url)
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT body FROM page_cache WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put_page(self, url: str, body: str, headers) -> bool:
+        """
+        200 응답 본문과 검증 헤더 저장
+
+        Returns:
+            본문이 이전과 같으면 True
+        """
+        url = redact_url(url)
+        body_hash = self.body_hash(body)
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT body_hash FROM page_cache WHERE url = ?", (url,)
+            ).fetchone()
+            unchanged = row is not None and row[0] == body_hash
+
+            if unchanged:
+                # 본문은 그대로 두고 검증 헤더와 시각만 갱신
+                self.conn.execute(
+                    """
+                UPDATE page_cache SET etag = ?, last_modified = ?, fetched_at = ?
+                WHERE url = ?
+                """,
+                    (
+                        headers.get("ETag"),
+                        headers.get("Last-Modified"),
+                        datetime.now(),
+                        url,
+                    ),
+                )
+            else:
+                self.conn.execute(
+                    """
+                INSERT OR REPLACE INTO page_cache (
+                    url, etag, last_modified, body_hash, body, fetched_at
+                ) VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                    (
+                        url,
+                        headers.get("ETag"),
+                        headers.get("Last-Modified"),
+                        body_hash,
+                        zlib.compress(body.encode("utf-8")),
+                        datetime.now(),
+                    ),
+                )
+            self.conn.commit()
+        return unchanged
+
+    def get_result(self, url: str, content_key: str) -> Optional[Dict[str, Any]]:
+        """같은 내용으로 추출한 이전 결과"""
+        url = redact_url(url)
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT content_key, result FROM result_cache WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None or row[0] != content_key:
+            return None
+        return json.loads(row[1])
+
+    def put_result(self, url: str, content_key: str, result: Dict[str, Any]):
+        """추출 결과 저장"""
+        url = redact_url(url)
+        with self._lock:
+            self.conn.execute(
+                """
+            INSERT OR REPLACE INTO result_cache (url, content_key, result, updated_at)
+            VALUES (?, ?, ?, ?)
+            """,
+                (url, content_key, json.dumps(result, ensure_ascii=False), datetime.now()),
+            )
+            self.conn.commit()
+
+    def close(self):
+        """리소스 정리"""
+        with self._lock:
+            self.conn.close()
+        logging.debug(f"페이지 캐시 닫힘: {self.cache_path}")
@@ -0,0 +1,236 @@
+"""
+book_rankings 원본 수집 결과 저장소
+행마다 json.dumps(results)를 raw_data에 그대로 넣지 않고, 수집 시각을 뺀 결과를 내용 해시(sha256)로
+raw_payloads 테이블에 한 번만 압축(zstd 또는 zlib)해 저장합니다. 행에는 해시(raw_hash)와
+서점별 수집 시각(raw_times, scraping_date 기준 마이크로초 차이)만 남습니다.
+
+순위·오류·추출 경로가 이전 수집과 같으면 같은 해시가 되어 본문을 다시 저장하지 않습니다.
+raw_data가 남아 있는 행(이전 전 기록)도 load로 같은 형태로 읽을 수 있습니다
+(migrate_raw_payloads.py로 기존 행 이전).
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from html_archive import ZSTD_AVAILABLE, compress, decompress
+
+# 새 본문 압축 방식 (읽을 때는 행에 기록된 codec을 따름)
+DEFAULT_CODEC = "zstd" if ZSTD_AVAILABLE else "zlib"
+# 압축을 푼 결과 캐시 (해시가 같으면 내용도 같으므로 연결과 상관없이 공유)
+# 기간 조회에서 같은 본문을 여러 행이 참조하므로 일주일치 고유 본문이 들어갈 정도로
+CACHE_SIZE = 4096
+
+_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def create_tables(conn: sqlite3.Connection):
+    """raw_payloads 테이블과 book_rankings의 참조 컬럼 생성 (열린 쓰기 트랜잭션 안에서 호출)"""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS raw_payloads (
+        hash TEXT PRIMARY KEY,  -- 정규화한 결과 JSON의 sha256
+        codec TEXT NOT NULL,
+        raw_size INTEGER NOT NULL,
+        data BLOB NOT NULL,
+        created_at DATETIME NOT NULL
+    )
+    """)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(book_rankings)")}
+    if not columns:
+        return
+    if "raw_hash" not in columns:
+        conn.execute("ALTER TABLE book_rankings ADD COLUMN raw_hash TEXT")
+    if "raw_times" not in columns:
+        conn.execute("ALTER TABLE book_rankings ADD COLUMN raw_times TEXT")
+
+
+def time_offset(value: Any, base: str) -> Any:
+    """서점 수집 시각을 scraping_date 기준 마이크로초 차이로 (형식이 다르면 원래 값 그대로)"""
+    try:
+        delta = datetime.fromisoformat(value) - datetime.fromisoformat(base)
+    except (TypeError, ValueError):
+        return value
+    return delta.days * 86_400_000_000 + delta.seconds * 1_000_000 + delta.microseconds
+
+
+def offset_time(value: Any, base: str) -> Any:
+    """time_offset의 반대"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return (datetime.fromisoformat(base) + timedelta(microseconds=value)).isoformat()
+    return value
+
+
+def split(results: Dict[str, Any], scraping_date: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    수집 결과를 (저장할 본문, 서점별 수집 시각)으로 나눔
+
+    scraping_date는 book_rankings 컬럼에 있고 서점별 timestamp는 매번 달라지므로 본문에서 뺍니다.
+    """
+    payload = {}
+    times = {}
+    for key, value in results.items():
+        if key == "scraping_date":
+            continue
+        if isinstance(value, dict) and "timestamp" in value:
+            times[key] = time_offset(value["timestamp"], scraping_date)
+            value = {field: item for field, item in value.items() if field != "timestamp"}
+        payload[key] = value
+    return payload, times
+
+
+def join(payload: Dict[str, Any], times: Dict[str, Any], scraping_date: str) -> Dict[str, Any]:
+    """split의 반대 - 원래 수집 결과 형태로"""
+    results = {"scraping_date": scraping_date}
+    for key, value in payload.items():
+        if key in times and isinstance(value, dict):
+            value = {**value, "timestamp": offset_time(times[key], scraping_date)}
+        results[key] = value
+    return results
+
+
+def put(conn: sqlite3.Connection, payload: Dict[str, Any], codec: str = DEFAULT_CODEC) -> str:
+    """본문 저장 후 해시 반환 (같은 내용이 이미 있으면 압축도 하지 않음)"""
+    text = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    payload_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    exists = conn.execute(
+        "SELECT 1 FROM raw_payloads WHERE hash = ?", (payload_hash,)
+    ).fetchone()
+    if not exists:
+        conn.execute(
+            "INSERT INTO raw_payloads (hash, codec, raw_size, data, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                payload_hash,
+                codec,
+                len(text.encode("utf-8")),
+                compress(text, codec),
+                datetime.now().isoformat(),
+            ),
+        )
+    return payload_hash
+
+
+def store(
+    conn: sqlite3.Connection,
+    results: Dict[str, Any],
+    scraping_date: str,
+    codec: str = DEFAULT_CODEC,
+) -> Tuple[str, str]:
+    """
+    수집 결과 저장 (열린 쓰기 트랜잭션 안에서 호출)
+
+    Returns:
+        book_rankings에 넣을 (raw_hash, raw_times)
+    """
+    payload, times = split(results, scraping_date)
+    return put(conn, payload, codec), json.dumps(times, separators=(",", ":"))
+
+
+def payload(conn: sqlite3.Connection, payload_hash: str) -> Dict[str, Any]:
+    """해시로 본문 읽기 (여러 행이 같은 본문을 참조하므로 최근 본문은 캐시에서)"""
+    with _cache_lock:
+        cached = _cache.get(payload_hash)
+        if cached is not None:
+            _cache.move_to_end(payload_hash)
+            return cached
+    row = conn.execute(
+        "SELECT codec, data FROM raw_payloads WHERE hash = ?", (payload_hash,)
+    ).fetchone()
+    if row is None:
+        raise KeyError(f"raw_payloads에 없는 본문입니다: {payload_hash}")
+    value = json.loads(decompress(row[1], row[0]))
+    with _cache_lock:
+        _cache[payload_hash] = value
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return value
+
+
+def load(
+    conn: sqlite3.Connection,
+    raw_data: Optional[str],
+    raw_hash: Optional[str],
+    raw_times: Optional[str],
+    scraping_date: str,
+) -> Optional[Dict[str, Any]]:
+    """book_rankings 행의 원본 수집 결과 (이전 전 행은 raw_data, 없으면 None)"""
+    if raw_hash:
+        return join(payload(conn, raw_hash), json.loads(raw_times or "{}"), scraping_date)
+    if raw_data:
+        try:
+            return json.loads(raw_data)
+        except ValueError:
+            return None
+    return None
+
+
+def carried_over(
+    conn: sqlite3.Connection, raw_data: Optional[str], raw_hash: Optional[str]
+) -> set:
+    """다른 서점만 수집하며 직전 값을 이어 적은 서점 (수집 시각은 필요 없어 본문만 읽음)"""
+    try:
+        if raw_hash:
+            raw = payload(conn, raw_hash)
+        elif raw_data:
+            raw = json.loads(raw_data)
+        else:
+            return set()
+        return set(raw.get("carried_over") or [])
+    except (ValueError, AttributeError):
+        return set()
+
+
+def migrate_row(
+    conn: sqlite3.Connection,
+    row_id: int,
+    scraping_date: str,
+    raw_data: str,
+    codec: str = DEFAULT_CODEC,
+) -> bool:
+    """
+    raw_data 행 하나를 raw_payloads로 옮김 (열린 쓰기 트랜잭션 안에서 호출)
+
+    나눴다 합친 결과가 원래 JSON과 다르면(scraping_date가 컬럼과 다른 오래된 형식 등) 그대로 둡니다.
+
+    Returns:
+        옮겼으면 True
+    """
+    try:
+        results = json.loads(raw_data)
+    except ValueError:
+        return False
+    if not isinstance(results, dict):
+        return False
+    body, times = split(results, scraping_date)
+    if join(body, times, scraping_date) != results:
+        return False
+    conn.execute(
+        "UPDATE book_rankings SET raw_data = NULL, raw_hash = ?, raw_times = ? WHERE id = ?",
+        (put(conn, body, codec), json.dumps(times, separators=(",", ":")), row_id),
+    )
+    return True
+
+
+def stats(conn: sqlite3.Connection) -> Dict[str, int]:
+    """본문 수와 압축 전/후 크기, 본문을 참조하는 행 수, 아직 raw_data로 남은 행 수"""
+    payloads, raw_bytes, stored_bytes = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(LENGTH(data)), 0) "
+        "FROM raw_payloads"
+    ).fetchone()
+    rows, legacy_rows, legacy_bytes = conn.execute(
+        "SELECT COUNT(raw_hash), COUNT(raw_data), COALESCE(SUM(LENGTH(raw_data)), 0) "
+        "FROM book_rankings"
+    ).fetchone()
+    return {
+        "payloads": payloads,
+        "raw_bytes": raw_bytes,
+        "stored_bytes": stored_bytes,
+        "rows": rows,
+        "legacy_rows": legacy_rows,
+        "legacy_bytes": legacy_bytes,
+    }
@@ -0,0 +1,244 @@
+"""
+원본 HTML 보관소 재추출
+html_archive.db에 보관된 상품 페이지에 현재 추출 로직을 프로세스 풀로 다시 적용하고,
+결과가 달라진 book_rankings 행을 고칩니다. 다시 수집하지 않고 과거 데이터를 바로잡을 때 사용합니다.
+
+사용 예:
+    uv run python reextract_archive.py --db data/book_rankings.db --dry-run
+    uv run python reextract_archive.py --since 2025-01-01 --workers 4
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import observations
+import raw_payloads
+import summary_yozm_ai_agent_info
+from book_ranking_monitor import RANKING_COLUMNS, ranking_columns
+from html_archive import HtmlArchive, unpack_pages
+from storage import open_storage
+from summary_yozm_ai_agent_info import init_parse_worker, parse_in_worker
+
+# 한 번에 읽어 워커에 넘기는 book_rankings 행 수 (메모리에 올리는 압축 본문 양 제한)
+ROW_BATCH_SIZE = 200
+
+
+def reextract_in_worker(store: str, packed: Dict[str, Any]) -> Dict[str, Any]:
+    """워커 프로세스에서 보관 본문 압축을 풀고 현재 로직으로 추출"""
+    pages = unpack_pages(packed)
+    data = summary_yozm_ai_agent_info._worker_parser.new_store_data(store, packed["url"])
+    if not pages["html"] and not any(source["body"] for source in pages["sources"].values()):
+        data["error"] = "보관된 본문이 없습니다"
+        return data
+    result, _ = parse_in_worker(store, data, pages)
+    return result
+
+
+def load_rows(conn: sqlite3.Connection, cycles: List[str]) -> List[Tuple[Any, ...]]:
+    """보관된 주기에 해당하는 book_rankings 행 (id, scraping_date, 원본 결과, 컬럼들...)"""
+    columns = [column for store in RANKING_COLUMNS.values() for column in store.values()]
+    rows = []
+    for start in range(0, len(cycles), ROW_BATCH_SIZE):
+        chunk = cycles[start : start + ROW_BATCH_SIZE]
+        rows.extend(
+            conn.execute(
+                f"SELECT id, scraping_date, raw_data, raw_hash, raw_times, {', '.join(columns)} "
+                f"FROM book_rankings WHERE scraping_date IN ({', '.join('?' * len(chunk))}) "
+                f"ORDER BY id",
+                chunk,
+            ).fetchall()
+        )
+    return [
+        (row[0], row[1], raw_payloads.load(conn, row[2], row[3], row[4], row[1]), *row[5:])
+        for row in rows
+    ]
+
+
+def updated_raw_data(
+    raw: Optional[Dict[str, Any]],
+    store_results: Dict[str, Dict[str, Any]],
+    reextracted_at: str,
+) -> Dict[str, Any]:
+    """원본 결과의 서점 결과를 재추출 결과로 교체"""
+    raw = dict(raw or {})
+    for store, result in store_results.items():
+        previous = raw.get(store) or {}
+        # 수집 시각과 배치 모드 식별자는 원래 값을 유지
+        kept = {
+            key: previous[key]
+            for key in ("timestamp", "store", "product_id")
+            if key in previous
+        }
+        raw[store] = {**result, **kept}
+    raw["reextracted_at"] = reextracted_at
+    return raw
+
+
+def run_backfill(
+    db_path: str,
+    archive_path: str,
+    workers: int,
+    since: str = None,
+    until: str = None,
+    dry_run: bool = False,
+    yes24_module_only: bool = False,
+):
+    started = time.perf_counter()
+    archive = HtmlArchive(archive_path)
+    storage = open_storage(db_path)
+    reextracted_at = datetime.now().isoformat()
+
+    try:
+        with storage.write() as conn:
+            raw_payloads.create_tables(conn)
+            observations.create_tables(conn)
+            book_id = observations.ensure_book(conn, observations.DEFAULT_BOOK_KEY)
+        with storage.read() as conn:
+            rows = load_rows(conn, archive.cycles(since, until))
+        logging.info(f"재추출 대상: book_rankings {len(rows)}행")
+        column_names = [
+            column for store in RANKING_COLUMNS.values() for column in store.values()
+        ]
+        changed_columns: Counter = Counter()
+        changed_rows = 0
+        parsed = 0
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_parse_worker,
+            initargs=(False, True, yes24_module_only, {}),
+        ) as pool:
+            for start in range(0, len(rows), ROW_BATCH_SIZE):
+                batch = rows[start : start + ROW_BATCH_SIZE]
+                jobs = []
+                for row in batch:
+                    for store, packed in archive.packed_captures(row[1]).items():
+                        if store in RANKING_COLUMNS:
+                            jobs.append((row, store, packed))
+                results = pool.map(
+                    reextract_in_worker,
+                    [store for _, store, _ in jobs],
+                    [packed for _, _, packed in jobs],
+                    chunksize=8,
+                )
+
+                by_row: Dict[int, Dict[str, Dict[str, Any]]] = {}
+                for (row, store, _), result in zip(jobs, results):
+                    parsed += 1
+                    # 재추출이 실패한 서점은 기존 값을 그대로 둔다
+                    if not result.get("error"):
+                        by_row.setdefault(row[0], {})[store] = result
+
+                updates = []
+                for row in batch:
+                    store_results = by_row.get(row[0])
+                    if not store_results:
+                        continue
+                    old = dict(zip(column_names, row[3:]))
+                    new = ranking_columns(store_results, stores=store_results)
+                    diff = {
+                        column: value for column, value in new.items() if old[column] != value
+                    }
+                    if not diff:
+                        continue
+                    changed_rows += 1
+                    changed_columns.update(diff.keys())
+                    if dry_run:
+                        changes = ", ".join(
+                            f"{column} {old[column]} → {value}"
+                            for column, value in diff.items()
+                        )
+                        logging.info(f"  {row[1]}: {changes}")
+                        continue
+                    updates.append(
+                        (
+                            *diff.values(),
+                            (updated_raw_data(row[2], store_results, reextracted_at), row[1]),
+                            row[0],
+                            list(diff),
+                        )
+                    )
+
+                # 배치마다 짧게 커밋해 모니터의 저장이 오래 기다리지 않도록
+                with storage.write() as conn:
+                    for *values, (raw, scraping_date), row_id, columns in updates:
+                        raw_hash, raw_times = raw_payloads.store(conn, raw, scraping_date)
+                        conn.execute(
+                            f"UPDATE book_rankings SET "
+                            f"{', '.join(f'{column} = ?' for column in columns)}, "
+                            f"raw_data = NULL, raw_hash = ?, raw_times = ? WHERE id = ?",
+                            (*values, raw_hash, raw_times, row_id),
+                        )
+                    # 대시보드가 읽는 관측값도 고친 값으로 교체
+                    if updates:
+                        observations.migrate_wide_rows(
+                            conn,
+                            book_id,
+                            row_ids=[update[-2] for update in updates],
+                        )
+    finally:
+        storage.close()
+        archive.close()
+
+    elapsed = time.perf_counter() - started
+    logging.info("========== 🔁 재추출 결과 ==========")
+    logging.info(
+        f"행 {len(rows)}개, 서점 페이지 {parsed}개 재추출, {elapsed:.1f}초 "
+        f"({parsed / elapsed if elapsed > 0 else 0:.1f} pages/s)"
+    )
+    logging.info(
+        f"{'변경될' if dry_run else '변경된'} 행 {changed_rows}개"
+        + (f": {dict(changed_columns)}" if changed_columns else "")
+    )
+    logging.info("========================================")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="원본 HTML 보관소 재추출 및 book_rankings 보정")
+    parser.add_argument("--db", default="data/book_rankings.db", help="데이터베이스 파일 경로")
+    parser.add_argument(
+        "--archive",
+        help="원본 HTML 보관소 경로 (기본값: DB와 같은 디렉토리의 html_archive.db)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count(), help="재추출 프로세스 수"
+    )
+    parser.add_argument("--since", help="이 시각 이후 수집분만 (scraping_date, 예: 2025-01-01)")
+    parser.add_argument("--until", help="이 시각 이전 수집분만 (scraping_date)")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="DB를 고치지 않고 바뀔 값만 출력"
+    )
+    parser.add_argument(
+        "--yes24-module-only",
+        action="store_true",
+        help="YES24 IT 모바일 순위를 베스트셀러 모듈에서만 읽기 (수집 때와 같은 모드로 지정)",
+    )
+    args = parser.parse_args()
+
+    archive_path = args.archive or os.path.join(
+        os.path.dirname(args.db), "html_archive.db"
+    )
+    if not os.path.exists(archive_path):
+        logging.error(f"원본 HTML 보관소가 없습니다: {archive_path}")
+        return
+
+    run_backfill(
+        args.db,
+        archive_path,
+        args.workers,
+        since=args.since,
+        until=args.until,
+        dry_run=args.dry_run,
+        yes24_module_only=args.yes24_module_only,
+    )
+
+
+if __name__ == "__main__":
+    main()
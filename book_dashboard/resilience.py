@@ -0,0 +1,152 @@
+"""
+요청 재시도 정책, 서점별 회로 차단기, 수집 주기 마감 시각
+일시적인 오류는 지수 백오프로 재시도하고, 계속 실패하는 호스트는
+일정 시간 동안 요청을 건너뛰어 수집 주기 전체가 묶이지 않도록 합니다.
+요청 타임아웃은 주기 마감까지 남은 시간으로 줄여 주기 길이를 제한합니다.
+"""
+
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+# 재시도할 HTTP 상태 코드 (요청 과다, 서버 오류)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        jitter: float = 0.5,
+    ):
+        """
+        Args:
+            max_retries: 첫 요청 이후 최대 재시도 횟수
+            backoff_base: 첫 재시도 대기시간(초), 재시도마다 두 배
+            backoff_max: 대기시간 상한(초)
+            jitter: 대기시간에 더할 무작위 비율 (0.5면 최대 50%)
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        """일시적인 오류인지 (연결/타임아웃 오류, 429, 5xx)"""
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in RETRYABLE_STATUS_CODES
+        return isinstance(error, httpx.TransportError)
+
+    def delay(self, attempt: int, error: Exception = None) -> float:
+        """attempt번째 재시도 전 대기시간 (Retry-After 헤더가 있으면 우선)"""
+        delay = min(self.backoff_max, self.backoff_base * (2**attempt))
+        if isinstance(error, httpx.HTTPStatusError):
+            retry_after = error.response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                delay = min(self.backoff_max, max(delay, float(retry_after)))
+        return delay + random.uniform(0, delay * self.jitter)
+
+
+class CircuitBreaker:
+    """
+    호스트 하나에 대한 회로 차단기
+
+    closed: 정상 요청
+    open: 연속 실패가 failure_threshold에 도달해 cooldown 동안 요청 차단
+    half_open: cooldown이 지나 시험 요청 하나만 허용 (성공하면 closed, 실패하면 다시 open)
+        시험 요청이 끝나기 전의 다른 요청은 차단합니다. 시험 요청이 결과를 남기지 못하고
+        끝나면(주기 마감 등) cooldown이 지난 뒤 다음 요청을 새 시험 요청으로 허용합니다.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 300.0):
+        """
+        Args:
+            failure_threshold: 회로를 여는 연속 실패 횟수
+            cooldown: 회로가 열린 뒤 시험 요청까지 기다리는 시간(초)
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        # half_open에서 시험 요청을 보낸 시각 (None이면 진행 중인 시험 요청 없음)
+        self.probe_started: Optional[float] = None
+        # 비동기 수집은 한 루프에서, 동기 수집은 여러 스레드에서 같은 차단기를 씀
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if now - self.opened_at < self.cooldown:
+                    return False
+                self.state = self.HALF_OPEN
+            elif self.probe_started is not None and now - self.probe_started < self.cooldown:
+                # 시험 요청이 진행 중
+                return False
+            self.probe_started = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.probe_started = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """결과에 기록할 현재 상태"""
+        retry_in = None
+        if self.state == self.OPEN:
+            retry_in = max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+        return {"state": self.state, "failures": self.failures, "retry_in_sec": retry_in}
+
+
+class Deadline:
+    """
+    수집 주기(또는 주기 안의 서점 하나)의 마감 시각
+
+    요청마다 남은 시간으로 httpx 타임아웃을 줄입니다. httpx의 read 타임아웃은
+    소켓 읽기 한 번에 대한 값이므로 아주 느리게 흘러오는 본문은 마감을 조금 넘길 수 있습니다.
+    """
+
+    def __init__(self, budget: float, parent: Optional["Deadline"] = None):
+        """
+        Args:
+            budget: 지금부터 쓸 수 있는 시간(초)
+            parent: 상위 마감 (주기 마감보다 늦어지지 않도록 함)
+        """
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+        if parent is not None:
+            self.expires_at = min(self.expires_at, parent.expires_at)
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, connect: float, read: float) -> httpx.Timeout:
+        """기본 연결/읽기 타임아웃을 남은 시간으로 줄인 요청 타임아웃"""
+        remaining = self.remaining()
+        return httpx.Timeout(min(read, remaining), connect=min(connect, remaining))
@@ -0,0 +1,139 @@
+"""
+관측값 시간/일 집계 계산과 보관 기간 정리
+모니터는 관측값을 저장할 때마다 해당 구간의 집계를 갱신하므로, 이 스크립트는 집계가 생기기 전의
+기존 기록을 한 번 계산(--backfill)하거나 모니터 없이 오래된 원본 기록을 정리(--retention-days)할 때 씁니다.
+기간 조회를 관측값으로 읽을 때와 집계로 읽을 때의 시간을 비교해 출력합니다.
+
+사용 예:
+    uv run python rollup_observations.py --db data/book_rankings.db --backfill
+    uv run python rollup_observations.py --db data/book_rankings.db --retention-days 90 --vacuum
+"""
+
+import argparse
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+
+import observations
+import raw_payloads
+import rollups
+from book_ranking_monitor import BookRankingMonitor
+from storage import open_storage
+
+QUERY_REPEAT = 5
+# 비교할 기간 조회 (시간, 0이면 전체)
+RANGES = {"최근 7일": 168, "최근 30일": 720, "전체 기간": 0}
+
+
+def database_size(conn) -> int:
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    return page_count * page_size
+
+
+def measure(storage, book_id) -> dict:
+    """기간별로 관측값/집계에서 읽은 평균 시간(초)과 점 수"""
+    timings = {}
+    with storage.read() as conn:
+        for name, hours in RANGES.items():
+            since = datetime.now() - timedelta(hours=hours) if hours else None
+            for source, read in (
+                ("관측값", lambda: observations.series(conn, book_id, since)),
+                ("집계", lambda: observations.range_series(conn, book_id, hours)),
+            ):
+                started = time.perf_counter()
+                for _ in range(QUERY_REPEAT):
+                    timestamps, _ = read()
+                timings[name, source] = (
+                    (time.perf_counter() - started) / QUERY_REPEAT,
+                    len(timestamps),
+                )
+    return timings
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="관측값 시간/일 집계 계산과 오래된 원본 기록 정리")
+    parser.add_argument("--db", default="data/book_rankings.db", help="데이터베이스 파일 경로")
+    parser.add_argument(
+        "--backfill", action="store_true", help="기존 관측값 전체의 집계를 다시 계산"
+    )
+    parser.add_argument(
+        "--batch-days", type=int, default=7, help="--backfill이 한 트랜잭션에서 계산할 기간(일)"
+    )
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=0,
+        help=f"이보다 오래된 관측값/원본 기록을 집계만 남기고 삭제 "
+        f"({rollups.MIN_RETENTION_DAYS}일 이상, 0이면 정리하지 않음)",
+    )
+    parser.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="정리 후 VACUUM으로 파일 크기 줄이기 (DB를 쓰는 다른 프로세스를 멈춘 뒤 실행)",
+    )
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        parser.error(f"데이터베이스 파일이 없습니다: {args.db}")
+    if not args.backfill and not args.retention_days:
+        parser.error("--backfill 또는 --retention-days를 지정해야 합니다")
+    if args.retention_days and args.retention_days < rollups.MIN_RETENTION_DAYS:
+        parser.error(f"--retention-days는 {rollups.MIN_RETENTION_DAYS}일 이상이어야 합니다")
+
+    storage = open_storage(args.db)
+    try:
+        with storage.write() as conn:
+            BookRankingMonitor.create_tables(conn)
+            raw_payloads.create_tables(conn)
+            observations.create_tables(conn)
+            size_before = database_size(conn)
+            book_id = observations.default_book_id(conn)
+
+        if args.backfill:
+            started = time.perf_counter()
+            days = rollups.backfill(storage, args.batch_days)
+            logging.info(f"📈 {days}일 기간 집계 계산 ({time.perf_counter() - started:.1f}초)")
+        if args.retention_days:
+            started = time.perf_counter()
+            deleted = rollups.prune(storage, args.retention_days)
+            logging.info(
+                f"🧹 {args.retention_days}일 지난 기록 삭제 ({time.perf_counter() - started:.1f}초): "
+                + ", ".join(f"{table} {count}행" for table, count in deleted.items())
+            )
+        if args.vacuum:
+            logging.info("VACUUM 실행 중...")
+            storage.checkpoint("TRUNCATE")
+            storage.connection().execute("VACUUM")
+
+        with storage.read() as conn:
+            size_after = database_size(conn)
+            stats = rollups.stats(conn)
+        timings = measure(storage, book_id) if book_id is not None else {}
+    finally:
+        storage.close()
+
+    logging.info("========== 📈 관측값 집계 ==========")
+    logging.info(
+        f"시간 집계 {stats['hour']}행, 일 집계 {stats['day']}행"
+        + (f" ({stats['pruned_before']} 이전은 집계만 보관)" if stats["pruned_before"] else "")
+    )
+    logging.info(
+        f"DB 크기: {size_before / 1024 / 1024:.2f}MB → {size_after / 1024 / 1024:.2f}MB"
+        + ("" if args.vacuum or not args.retention_days else " (--vacuum 전에는 빈 페이지가 파일에 남음)")
+    )
+    for name in RANGES:
+        if (name, "관측값") not in timings:
+            continue
+        raw_time, raw_points = timings[name, "관측값"]
+        rollup_time, rollup_points = timings[name, "집계"]
+        logging.info(
+            f"{name}: 관측값 {raw_points}점 {raw_time * 1000:.2f}ms → "
+            f"조회 {rollup_points}점 {rollup_time * 1000:.2f}ms"
+        )
+    logging.info("==================================")
+
+
+if __name__ == "__main__":
+    main()
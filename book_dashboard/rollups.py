@@ -0,0 +1,366 @@
+"""
+관측값 시간/일 단위 집계와 보관 기간 정리
+observations를 도서·서점·지표별로 한 시간, 하루 단위로 묶어 개수/최소/최대/합계/마지막 값을 저장합니다.
+며칠 이상의 기간 조회는 관측값 대신 집계를 읽어 시각 수만큼이 아니라 시간/일 수만큼만 읽습니다.
+
+갱신:
+    관측값을 저장할 때(observations.record_rows) 그 관측값이 속한 시간·일 구간만 다시 계산합니다.
+    구간 안의 관측값을 다시 모으므로 같은 관측값을 다시 저장(재추출, 스풀 복구)해도 두 번 세지 않습니다.
+    시간 집계는 관측값에서, 일 집계는 시간 집계에서 계산합니다.
+
+보관 기간:
+    prune은 retention_days보다 오래된 날을 하루씩 집계한 뒤 관측값, book_rankings 행,
+    더 참조하지 않는 raw_payloads 본문, 작업 큐 결과 기록을 지웁니다. 집계는 지우지 않습니다.
+    지운 날(rollups_pruned_before 이전)의 시간 집계는 관측값이 없으므로 다시 계산하지 않습니다.
+    도서별로 지운 관측 시각 수와 가장 이른 관측 시각은 observations_pruned에 더해 두어
+    통계(observations.book_stats)가 보관 기간 밖의 기록까지 셉니다.
+"""
+
+import logging
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# 집계 단위별 테이블과 구간 길이
+GRANULARITIES = {
+    "hour": ("observations_hourly", timedelta(hours=1)),
+    "day": ("observations_daily", timedelta(days=1)),
+}
+# 이 시간 이하의 기간 조회는 관측값을 그대로, 그보다 길면 시간 집계, HOURLY_SERIES_DAYS보다 길면 일 집계
+RAW_SERIES_HOURS = 48
+HOURLY_SERIES_DAYS = 31
+PRUNED_META_KEY = "rollups_pruned_before"
+# 적응형 스케줄(최근 72시간 변동성)과 관측값 조회(RAW_SERIES_HOURS)가 읽는 기간보다 짧게 지우지 않음
+MIN_RETENTION_DAYS = 3
+# 한 문장에서 IN으로 묶는 도서 수
+BOOK_CHUNK = 500
+BUCKET_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 관측 시각 문자열(공백 또는 T 구분)에서 시간 구간 시작
+HOUR_BUCKET_SQL = "replace(substr({column}, 1, 13), 'T', ' ') || ':00:00'"
+DAY_BUCKET_SQL = "substr({column}, 1, 10) || ' 00:00:00'"
+
+
+def create_tables(conn: sqlite3.Connection):
+    """집계 테이블 생성 (열린 쓰기 트랜잭션 안에서 호출)"""
+    for table, _ in GRANULARITIES.values():
+        conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            book_id INTEGER NOT NULL,
+            bucket TEXT NOT NULL,  -- 구간 시작 시각 (YYYY-MM-DD HH:00:00)
+            store TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            n INTEGER NOT NULL,  -- 관측값 수
+            min_value NUMERIC,
+            max_value NUMERIC,
+            sum_value NUMERIC,  -- 숫자 관측값 합계 (rank_period 같은 문자열 지표는 NULL)
+            last_ts DATETIME NOT NULL,
+            last_value NUMERIC,
+            PRIMARY KEY (book_id, bucket, store, metric)
+        ) WITHOUT ROWID
+        """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS observations_pruned (
+        book_id INTEGER PRIMARY KEY,
+        records INTEGER NOT NULL,  -- 보관 기간이 지나 지운 관측 시각 수
+        oldest DATETIME NOT NULL  -- 지운 관측 시각 중 가장 이른 시각
+    )
+    """)
+
+
+def hour_bucket(ts: Any) -> str:
+    text = str(ts)
+    return text[:13].replace("T", " ") + ":00:00"
+
+
+def day_bucket(ts: Any) -> str:
+    return str(ts)[:10] + " 00:00:00"
+
+
+def next_bucket(bucket: str, granularity: str) -> str:
+    return (
+        datetime.strptime(bucket, BUCKET_FORMAT) + GRANULARITIES[granularity][1]
+    ).strftime(BUCKET_FORMAT)
+
+
+def pruned_before(conn: sqlite3.Connection) -> str:
+    """관측값을 지운 경계 (이 시각 이전 구간은 집계만 남아 있음)"""
+    row = conn.execute(
+        "SELECT value FROM observation_meta WHERE key = ?", (PRUNED_META_KEY,)
+    ).fetchone()
+    return row[0] if row else ""
+
+
+def rebuild(
+    conn: sqlite3.Connection,
+    book_ids: List[int],
+    start: str,
+    end: str,
+):
+    """
+    도서들의 [start, end) 구간 시간/일 집계를 다시 계산 (열린 쓰기 트랜잭션 안에서 호출)
+
+    start/end는 일 경계로 넓혀 일 집계가 하루 전체의 시간 집계로 계산되게 합니다.
+    관측값을 이미 지운 구간의 시간 집계는 그대로 두고 일 집계만 다시 모읍니다.
+    """
+    day_start = day_bucket(start)
+    day_end = day_bucket(end)
+    if day_end < end:
+        day_end = next_bucket(day_end, "day")
+    hour_start = max(start, pruned_before(conn))
+    hourly, _ = GRANULARITIES["hour"]
+    daily, _ = GRANULARITIES["day"]
+
+    for offset in range(0, len(book_ids), BOOK_CHUNK):
+        chunk = book_ids[offset : offset + BOOK_CHUNK]
+        books = ", ".join("?" * len(chunk))
+        if hour_start < end:
+            conn.execute(
+                f"DELETE FROM {hourly} WHERE book_id IN ({books}) AND bucket >= ? AND bucket < ?",
+                (*chunk, hour_bucket(hour_start), end),
+            )
+            bucket = HOUR_BUCKET_SQL.format(column="ts")
+            conn.execute(
+                f"""
+            INSERT INTO {hourly}
+                (book_id, bucket, store, metric, n, min_value, max_value, sum_value, last_ts, last_value)
+            SELECT book_id, bucket, store, metric, COUNT(*), MIN(value), MAX(value),
+                   SUM(CASE WHEN typeof(value) IN ('integer', 'real') THEN value END),
+                   MAX(ts), MAX(CASE WHEN recent = 1 THEN value END)
+            FROM (
+                SELECT book_id, {bucket} AS bucket, store, metric, ts, value,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY book_id, {bucket}, store, metric ORDER BY ts DESC
+                       ) AS recent
+                FROM observations
+                WHERE book_id IN ({books}) AND ts >= ? AND ts < ?
+            )
+            GROUP BY book_id, bucket, store, metric
+            """,
+                (*chunk, hour_bucket(hour_start), end),
+            )
+
+        conn.execute(
+            f"DELETE FROM {daily} WHERE book_id IN ({books}) AND bucket >= ? AND bucket < ?",
+            (*chunk, day_start, day_end),
+        )
+        bucket = DAY_BUCKET_SQL.format(column="bucket")
+        conn.execute(
+            f"""
+        INSERT INTO {daily}
+            (book_id, bucket, store, metric, n, min_value, max_value, sum_value, last_ts, last_value)
+        SELECT book_id, day, store, metric, SUM(n), MIN(min_value), MAX(max_value),
+               SUM(sum_value), MAX(last_ts), MAX(CASE WHEN recent = 1 THEN last_value END)
+        FROM (
+            SELECT book_id, {bucket} AS day, store, metric, n, min_value, max_value, sum_value,
+                   last_ts, last_value,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY book_id, {bucket}, store, metric ORDER BY last_ts DESC
+                   ) AS recent
+            FROM {hourly}
+            WHERE book_id IN ({books}) AND bucket >= ? AND bucket < ?
+        )
+        GROUP BY book_id, day, store, metric
+        """,
+            (*chunk, day_start, day_end),
+        )
+
+
+def refresh(conn: sqlite3.Connection, rows: Iterable[Tuple[Any, ...]]):
+    """
+    새로 저장한 관측값 행 (book_id, ts, ...)이 속한 구간의 집계 갱신
+
+    도서마다 가장 이른/늦은 관측 시각의 시간 구간을 다시 계산하고, 구간이 같은 도서는 함께 계산합니다.
+    """
+    ranges: Dict[int, List[str]] = {}
+    for row in rows:
+        bucket = hour_bucket(row[1])
+        current = ranges.get(row[0])
+        if current is None:
+            ranges[row[0]] = [bucket, bucket]
+        else:
+            current[0] = min(current[0], bucket)
+            current[1] = max(current[1], bucket)
+    by_range: Dict[Tuple[str, str], List[int]] = {}
+    for book_id, (first, last) in ranges.items():
+        by_range.setdefault((first, next_bucket(last, "hour")), []).append(book_id)
+    for (start, end), book_ids in by_range.items():
+        rebuild(conn, book_ids, start, end)
+
+
+def series(
+    conn: sqlite3.Connection,
+    book_id: int,
+    granularity: str,
+    since: Any = None,
+    keys: Optional[Dict[Tuple[str, str], str]] = None,
+) -> Tuple[List[Any], Dict[str, List[Any]]]:
+    """
+    집계 시계열 - observations.series와 같은 형태 (구간 시작 시각, {지표 이름: 값 목록})
+
+    숫자 지표는 구간 평균, 문자열 지표는 구간의 마지막 값입니다.
+
+    Args:
+        keys: {(서점, 지표): 지표 이름}
+    """
+    table, _ = GRANULARITIES[granularity]
+    start = ""
+    if since:
+        start = hour_bucket(since) if granularity == "hour" else day_bucket(since)
+    rows = conn.execute(
+        f"SELECT bucket, store, metric, n, sum_value, last_value FROM {table} "
+        f"WHERE book_id = ? AND bucket >= ? ORDER BY bucket",
+        (book_id, start),
+    )
+    timestamps: List[Any] = []
+    values: Dict[str, List[Any]] = {key: [] for key in (keys or {}).values()}
+    for bucket, store, metric, n, total, last in rows:
+        key = (keys or {}).get((store, metric))
+        if key is None:
+            continue
+        if not timestamps or timestamps[-1] != bucket:
+            timestamps.append(bucket)
+            for column in values.values():
+                column.append(None)
+        values[key][-1] = round(total / n, 2) if total is not None and n else last
+    return timestamps, values
+
+
+def granularity_for(hours: Optional[float]) -> Optional[str]:
+    """기간 조회에 쓸 집계 단위 (None이면 관측값 그대로, hours가 없으면 전체 기간이므로 일 집계)"""
+    if not hours:
+        return "day"
+    if hours <= RAW_SERIES_HOURS:
+        return None
+    if hours <= HOURLY_SERIES_DAYS * 24:
+        return "hour"
+    return "day"
+
+
+def backfill(storage, days_per_batch: int = 7) -> int:
+    """
+    기존 관측값 전체의 집계를 다시 계산 (days_per_batch일씩 커밋, 여러 번 실행해도 같은 결과)
+
+    Returns:
+        계산한 기간(일)
+    """
+    with storage.read() as conn:
+        first, last = conn.execute("SELECT MIN(ts), MAX(ts) FROM observations").fetchone()
+        book_ids = [row[0] for row in conn.execute("SELECT id FROM books ORDER BY id")]
+    if first is None or not book_ids:
+        return 0
+    start = day_bucket(first)
+    end = next_bucket(day_bucket(last), "day")
+    days = 0
+    while start < end:
+        batch_end = min(
+            (datetime.strptime(start, BUCKET_FORMAT) + timedelta(days=days_per_batch)).strftime(
+                BUCKET_FORMAT
+            ),
+            end,
+        )
+        with storage.write() as conn:
+            rebuild(conn, book_ids, start, batch_end)
+        days += (
+            datetime.strptime(batch_end, BUCKET_FORMAT) - datetime.strptime(start, BUCKET_FORMAT)
+        ).days
+        logging.info(f"  집계 계산: {start[:10]} ~ {batch_end[:10]}")
+        start = batch_end
+    return days
+
+
+def prune(storage, retention_days: int, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    retention_days보다 오래된 원본 기록을 하루씩 집계한 뒤 삭제
+
+    book_rankings 행은 관측값으로 옮긴 행(wide_migrated_through 이하)만 지웁니다.
+
+    Returns:
+        테이블별 삭제한 행 수
+    """
+    if retention_days < MIN_RETENTION_DAYS:
+        raise ValueError(f"보관 기간은 {MIN_RETENTION_DAYS}일 이상이어야 합니다: {retention_days}")
+    now = now or datetime.now()
+    cutoff = day_bucket(now - timedelta(days=retention_days))
+    deleted = {"observations": 0, "book_rankings": 0, "raw_payloads": 0, "scrape_task_results": 0}
+
+    with storage.read() as conn:
+        first = conn.execute("SELECT MIN(ts) FROM observations").fetchone()[0]
+        book_ids = [row[0] for row in conn.execute("SELECT id FROM books ORDER BY id")]
+    day = day_bucket(first) if first is not None else cutoff
+    # 관측값은 하루씩 집계를 확정하고 지워 트랜잭션을 짧게
+    while day < cutoff:
+        day_end = next_bucket(day, "day")
+        with storage.write() as conn:
+            if book_ids:
+                rebuild(conn, book_ids, day, day_end)
+            for offset in range(0, len(book_ids), BOOK_CHUNK):
+                chunk = book_ids[offset : offset + BOOK_CHUNK]
+                books = ", ".join("?" * len(chunk))
+                conn.execute(
+                    f"""
+                INSERT INTO observations_pruned (book_id, records, oldest)
+                SELECT book_id, COUNT(DISTINCT ts), MIN(ts) FROM observations
+                WHERE book_id IN ({books}) AND ts >= ? AND ts < ?
+                GROUP BY book_id
+                ON CONFLICT (book_id) DO UPDATE SET
+                    records = records + excluded.records,
+                    oldest = MIN(oldest, excluded.oldest)
+                """,
+                    (*chunk, day, day_end),
+                )
+                deleted["observations"] += conn.execute(
+                    f"DELETE FROM observations WHERE book_id IN ({books}) AND ts >= ? AND ts < ?",
+                    (*chunk, day, day_end),
+                ).rowcount
+            conn.execute(
+                "INSERT INTO observation_meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (PRUNED_META_KEY, day_end),
+            )
+        day = day_end
+
+    with storage.write() as conn:
+        migrated = conn.execute(
+            "SELECT value FROM observation_meta WHERE key = 'wide_migrated_through'"
+        ).fetchone()
+        hashes = {
+            row[0]
+            for row in conn.execute(
+                "SELECT DISTINCT raw_hash FROM book_rankings "
+                "WHERE timestamp < ? AND id <= ? AND raw_hash IS NOT NULL",
+                (cutoff, int(migrated[0]) if migrated else 0),
+            )
+        }
+        deleted["book_rankings"] = conn.execute(
+            "DELETE FROM book_rankings WHERE timestamp < ? AND id <= ?",
+            (cutoff, int(migrated[0]) if migrated else 0),
+        ).rowcount
+        if hashes:
+            # 같은 본문을 남은 행이 참조할 수 있으므로 남은 행의 해시를 한 번 훑어 제외
+            hashes -= {
+                row[0]
+                for row in conn.execute(
+                    "SELECT DISTINCT raw_hash FROM book_rankings WHERE raw_hash IS NOT NULL"
+                )
+            }
+            deleted["raw_payloads"] = conn.executemany(
+                "DELETE FROM raw_payloads WHERE hash = ?", [(value,) for value in hashes]
+            ).rowcount
+        # 작업 큐를 한 번도 쓰지 않은 DB에는 테이블이 없음
+        if conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'scrape_task_results'"
+        ).fetchone():
+            deleted["scrape_task_results"] = conn.execute(
+                "DELETE FROM scrape_task_results WHERE finished_at < ?", (cutoff,)
+            ).rowcount
+    return deleted
+
+
+def stats(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """집계 행 수와 관측값을 지운 경계"""
+    counts = {
+        granularity: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for granularity, (table, _) in GRANULARITIES.items()
+    }
+    return {**counts, "pruned_before": pruned_before(conn) or None}
@@ -0,0 +1,324 @@
+"""
+수집 주기 단계별 시간 측정
+서점별로 요청의 연결/첫 바이트까지 대기(TTFB)/본문 다운로드 시간과 수신 바이트,
+HTML 파싱 시간, 추출 단계(tier)별 시간을 누적하고
+수집 주기마다 한 줄짜리 JSON 레코드로 남깁니다.
+
+기록 예 (scrape_timings.jsonl 한 줄):
+    {"started_at": "...", "mode": "async", "elapsed_ms": 812.4,
+     "stores": {"yes24": {"requests": 2, "bytes": 183422, "connect_ms": 41.2,
+                          "ttfb_ms": 220.5, "download_ms": 96.1, "parse_ms": 35.0,
+                          "extract_ms": 4.2, "tiers": {"page": {"calls": 2, "ms": 3.1}},
+                          "sources": {"page": {"requests": 1, "bytes": 180112},
+                                      "bestseller_module": {"requests": 1, "bytes": 3310}}}}}
+"""
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+# 호스트 접미사 → 서점 (목록 API처럼 상품 페이지와 다른 호스트도 같은 서점으로 집계)
+STORE_HOST_SUFFIXES = {
+    "kyobobook.co.kr": "kyobobook",
+    "yes24.com": "yes24",
+    "aladin.co.kr": "aladin",
+}
+OTHER_STORE = "other"
+
+# 단계별 누적 시간 필드 (초 단위로 모아 두고 기록할 때 ms로 변환)
+PHASES = ("connect", "ttfb", "download", "parse", "extract", "stream_check")
+
+
+def store_for_url(url: str) -> str:
+    """URL 호스트가 속한 서점 이름 (알 수 없으면 "other")"""
+    host = urlparse(url).netloc
+    for suffix, store in STORE_HOST_SUFFIXES.items():
+        if host == suffix or host.endswith("." + suffix):
+            return store
+    return OTHER_STORE
+
+
+class RequestTiming:
+    """
+    요청 하나의 연결/TTFB/다운로드 시간 측정
+
+    연결 시간은 httpx trace 확장의 connect_tcp/start_tls 이벤트로 잽니다.
+    httpcore는 DNS 조회를 connect_tcp 안에서 하므로 연결 시간에 DNS가 포함되며,
+    재사용된 연결이나 녹화 재생처럼 연결을 만들지 않은 요청은 0입니다.
+    """
+
+    CONNECT_EVENTS = ("connection.connect_tcp", "connection.start_tls")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.headers_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.connect = 0.0
+        self.new_connection = False
+        self.tls_handshake = False
+        self.http_version: Optional[str] = None
+        self.over_network = False
+        self._event_started: Dict[str, float] = {}
+
+    def trace(self, event: str, info: Dict[str, Any]):
+        """동기 클라이언트용 trace 콜백"""
+        name, _, state = event.rpartition(".")
+        if name not in self.CONNECT_EVENTS:
+            return
+        now = time.perf_counter()
+        if state == "started":
+            self._event_started[name] = now
+        elif name in self._event_started:
+            self.connect += now - self._event_started.pop(name)
+            if name == "connection.start_tls":
+                self.tls_handshake = True
+            else:
+                self.new_connection = True
+
+    async def atrace(self, event: str, info: Dict[str, Any]):
+        """비동기 클라이언트용 trace 콜백"""
+        self.trace(event, info)
+
+    def extensions(self, asynchronous: bool = False) -> Dict[str, Any]:
+        """요청에 붙일 httpx extensions"""
+        return {"trace": self.atrace if asynchronous else self.trace}
+
+    def mark_headers(self):
+        """응답 헤더 수신 시점 기록"""
+        self.headers_at = time.perf_counter()
+
+    def mark_finished(self, response=None):
+        """
+        본문 수신 종료 시점 기록 (조기 종료 포함)
+
+        응답을 넘기면 HTTP 버전과 실제 네트워크 연결을 거쳤는지(녹화 재생이 아닌지)도 기록합니다.
+        """
+        self.finished_at = time.perf_counter()
+        if response is not None:
+            self.http_version = response.http_version
+            self.over_network = "network_stream" in response.extensions
+
+    def phases(self) -> Dict[str, float]:
+        """{"connect": 초, "ttfb": 초, "download": 초} (TTFB는 연결 시간 제외)"""
+        finished = self.finished_at or time.perf_counter()
+        headers = self.headers_at or finished
+        return {
+            "connect": self.connect,
+            "ttfb": max(headers - self.started - self.connect, 0.0),
+            "download": finished - headers,
+        }
+
+
+class PhaseTimer:
+    """
+    서점별 단계 시간/바이트 누적기
+
+    YES24 메인 페이지와 모듈을 스레드로 동시에 받으므로 갱신은 잠금 안에서 합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stores: Dict[str, Dict[str, Any]] = {}
+
+    def _store(self, store: str) -> Dict[str, Any]:
+        if store not in self.stores:
+            self.stores[store] = {
+                "requests": 0,
+                "network_requests": 0,
+                "new_connections": 0,
+                "tls_handshakes": 0,
+                "http2_requests": 0,
+                "bytes": 0,
+                **{phase: 0.0 for phase in PHASES},
+                "tiers": {},
+                "sources": {},
+            }
+        return self.stores[store]
+
+    def add(self, store: str, phase: str, seconds: float):
+        with self._lock:
+            self._store(store)[phase] += seconds
+
+    def add_request(
+        self,
+        store: str,
+        timing: RequestTiming,
+        num_bytes: int,
+        source: Optional[str] = None,
+    ):
+        """
+        요청 하나의 네트워크 단계 시간과 수신 바이트 누적
+
+        source(page, bestseller_module, ttb_api 등)를 넘기면 소스별 요청 수/바이트도 누적합니다.
+        """
+        phases = timing.phases()
+        with self._lock:
+            entry = self._store(store)
+            entry["requests"] += 1
+            entry["network_requests"] += int(timing.over_network)
+            entry["new_connections"] += int(timing.new_connection)
+            entry["tls_handshakes"] += int(timing.tls_handshake)
+            entry["http2_requests"] += int(timing.http_version == "HTTP/2")
+            entry["bytes"] += num_bytes
+            for phase, seconds in phases.items():
+                entry[phase] += seconds
+            if source:
+                counts = entry["sources"].setdefault(source, {"requests": 0, "bytes": 0})
+                counts["requests"] += 1
+                counts["bytes"] += num_bytes
+
+    def add_tier(self, store: str, tier: str, seconds: float):
+        """
+        추출 단계 하나의 시간 누적 (텍스트 수집 + 패턴 검색)
+
+        스트리밍 중 확인(stream_check)에서 실행한 추출도 포함되므로
+        단계별 합이 extract보다 클 수 있습니다.
+        """
+        with self._lock:
+            tiers = self._store(store)["tiers"]
+            entry = tiers.setdefault(tier, {"calls": 0, "seconds": 0.0})
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+
+    @contextmanager
+    def measure(self, store: str, phase: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(store, phase, time.perf_counter() - started)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """누적값 복사본 (프로세스 풀 워커에서 돌려보낼 때 사용)"""
+        with self._lock:
+            return json.loads(json.dumps(self.stores))
+
+    def merge(self, stores: Dict[str, Dict[str, Any]]):
+        """다른 누적기(워커)의 snapshot 합치기"""
+        with self._lock:
+            for store, other in stores.items():
+                entry = self._store(store)
+                for key, value in other.items():
+                    if key not in ("tiers", "sources"):
+                        entry[key] += value
+                for tier, stats in other["tiers"].items():
+                    mine = entry["tiers"].setdefault(tier, {"calls": 0, "seconds": 0.0})
+                    mine["calls"] += stats["calls"]
+                    mine["seconds"] += stats["seconds"]
+                for source, counts in other.get("sources", {}).items():
+                    mine = entry["sources"].setdefault(source, {"requests": 0, "bytes": 0})
+                    mine["requests"] += counts["requests"]
+                    mine["bytes"] += counts["bytes"]
+
+    def reset(self):
+        with self._lock:
+            self.stores = {}
+
+    def record(self) -> Dict[str, Dict[str, Any]]:
+        """기록용 서점별 집계 (시간은 ms)"""
+        records = {}
+        for store, entry in self.snapshot().items():
+            record = {
+                "requests": entry["requests"],
+                "new_connections": entry["new_connections"],
+                # 연결을 새로 만들지 않은 네트워크 요청 (keep-alive 재사용 또는 HTTP/2 다중화)
+                "reused_connections": max(
+                    entry["network_requests"] - entry["new_connections"], 0
+                ),
+                "tls_handshakes": entry["tls_handshakes"],
+                "http2_requests": entry["http2_requests"],
+                "bytes": entry["bytes"],
+            }
+            for phase in PHASES:
+                record[f"{phase}_ms"] = round(entry[phase] * 1000, 2)
+            record["tiers"] = {
+                tier: {"calls": stats["calls"], "ms": round(stats["seconds"] * 1000, 2)}
+                for tier, stats in entry["tiers"].items()
+            }
+            record["sources"] = entry["sources"]
+            records[store] = record
+        return records
+
+
+def connection_totals(stores: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """서점별 기록을 합친 연결 재사용/핸드셰이크 집계"""
+    totals = {
+        key: sum(stats[key] for stats in stores.values())
+        for key in (
+            "requests",
+            "new_connections",
+            "reused_connections",
+            "tls_handshakes",
+            "http2_requests",
+        )
+    }
+    network_requests = totals["reused_connections"] + totals["new_connections"]
+    # 녹화 재생처럼 네트워크 연결이 없던 주기는 None
+    totals["reuse_ratio"] = (
+        round(totals["reused_connections"] / network_requests, 3)
+        if network_requests
+        else None
+    )
+    return totals
+
+
+def cycle_record(
+    timer: PhaseTimer, mode: str, started_at: datetime, elapsed: float, **extra
+) -> Dict[str, Any]:
+    """수집 주기 하나의 타이밍 레코드"""
+    stores = timer.record()
+    return {
+        "started_at": started_at.isoformat(),
+        "mode": mode,
+        "elapsed_ms": round(elapsed * 1000, 2),
+        **extra,
+        "connections": connection_totals(stores),
+        "stores": stores,
+    }
+
+
+def append_cycle_record(path: str, record: Dict[str, Any]):
+    """타이밍 레코드를 JSONL 파일에 한 줄 추가"""
+    try:
+        file_path = Path(path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError as e:
+        logging.warning(f"타이밍 기록 저장 실패: {e}")
+
+
+def summary_lines(record: Dict[str, Any]):
+    """로그용 서점별 한 줄 요약"""
+    lines = []
+    connections = record.get("connections")
+    if connections and connections["reuse_ratio"] is not None:
+        lines.append(
+            f"연결: 요청 {connections['reused_connections'] + connections['new_connections']}건 중 재사용 {connections['reused_connections']}건 "
+            f"({connections['reuse_ratio']:.0%}), 새 연결 {connections['new_connections']}개, "
+            f"TLS 핸드셰이크 {connections['tls_handshakes']}회, HTTP/2 {connections['http2_requests']}건"
+        )
+    for store, stats in record["stores"].items():
+        tiers = ", ".join(
+            f"{tier} {tier_stats['ms']:.1f}ms" for tier, tier_stats in stats["tiers"].items()
+        )
+        sources = ", ".join(
+            f"{source} {counts['requests']}건 {counts['bytes'] / 1024:.0f}KB"
+            for source, counts in stats.get("sources", {}).items()
+        )
+        lines.append(
+            f"{store}: 요청 {stats['requests']}건 {stats['bytes'] / 1024:.0f}KB, "
+            f"새 연결 {stats['new_connections']}개, 연결 {stats['connect_ms']:.0f}ms, TTFB {stats['ttfb_ms']:.0f}ms, "
+            f"다운로드 {stats['download_ms']:.0f}ms, 파싱 {stats['parse_ms']:.1f}ms, "
+            f"추출 {stats['extract_ms']:.1f}ms"
+            + (f", 스트리밍 확인 {stats['stream_check_ms']:.1f}ms" if stats["stream_check_ms"] else "")
+            + (f" ({tiers})" if tiers else "")
+            + (f" [소스: {sources}]" if sources else "")
+        )
+    return lines
@@ -0,0 +1,152 @@
+"""
+book_rankings.db 공유 저장소 계층
+모니터, 작업 큐, 적응형 스케줄, 대시보드가 같은 SQLite 파일을 쓰므로 연결 설정을 한곳에 모읍니다.
+호출마다 sqlite3.connect를 하지 않고 스레드별로 연결 하나를 열어 두고 재사용합니다.
+
+연결 설정:
+    journal_mode=WAL: 읽기와 쓰기가 서로 막지 않음 (대시보드 조회 중에도 모니터가 저장)
+    synchronous=NORMAL: WAL에서는 커밋마다 fsync하지 않아도 DB가 깨지지 않음
+        (전원이 나가면 마지막 몇 트랜잭션만 잃을 수 있음)
+    mmap_size, cache_size: 조회할 때 페이지를 메모리 매핑/캐시에서 읽음
+    busy_timeout: 다른 프로세스가 쓰기 잠금을 잡고 있으면 에러 대신 기다림
+
+WAL은 -wal/-shm 파일을 공유 메모리로 쓰므로 모든 프로세스가 같은 호스트에서 DB 파일에
+접근해야 합니다 (네트워크 파일 시스템 불가, Docker 바인드 마운트는 가능).
+"""
+
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+SYNCHRONOUS = "NORMAL"
+MMAP_SIZE = 256 * 1024 * 1024  # bytes
+CACHE_SIZE_KB = 16 * 1024
+BUSY_TIMEOUT_MS = 30 * 1000
+
+_storages: Dict[str, "Storage"] = {}
+_storages_lock = threading.Lock()
+
+
+def open_storage(db_path: str) -> "Storage":
+    """프로세스 안에서 DB 파일별로 하나만 만들어 공유하는 저장소"""
+    key = str(Path(db_path).resolve())
+    with _storages_lock:
+        storage = _storages.get(key)
+        if storage is None or storage.closed:
+            storage = _storages[key] = Storage(db_path)
+        return storage
+
+
+class Storage:
+    def __init__(
+        self,
+        db_path: str,
+        synchronous: str = SYNCHRONOUS,
+        mmap_size: int = MMAP_SIZE,
+        cache_size_kb: int = CACHE_SIZE_KB,
+        busy_timeout_ms: int = BUSY_TIMEOUT_MS,
+        wal: bool = True,
+    ):
+        """
+        Args:
+            db_path: SQLite 파일 경로
+            synchronous: PRAGMA synchronous 값
+            mmap_size: PRAGMA mmap_size (bytes, 0이면 사용 안 함)
+            cache_size_kb: 연결별 페이지 캐시 크기(KB)
+            busy_timeout_ms: 잠금 대기 시간(ms)
+            wal: WAL 모드 사용 여부 (False면 기존 롤백 저널 - 벤치마크 비교용)
+        """
+        self.db_path = db_path
+        self.synchronous = synchronous
+        self.mmap_size = mmap_size
+        self.cache_size_kb = cache_size_kb
+        self.busy_timeout_ms = busy_timeout_ms
+        self.wal = wal
+        self.closed = False
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        # 같은 프로세스 안의 쓰기는 여기서 줄 세우고, 다른 프로세스와는 busy_timeout으로 기다림
+        self._write_lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        if wal:
+            # journal_mode는 DB 파일에 기록되므로 한 번만 바꾸면 다른 프로세스에도 적용됨
+            mode = self.connection().execute("PRAGMA journal_mode=WAL").fetchone()[0]
+            if mode.lower() != "wal":
+                logging.warning(f"WAL 모드를 켤 수 없습니다 ({db_path}: {mode})")
+
+    def open_connection(self) -> sqlite3.Connection:
+        # 트랜잭션은 read()/write()에서 직접 시작 (그 밖의 문장은 바로 커밋)
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        conn.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA mmap_size={self.mmap_size}")
+        conn.execute(f"PRAGMA cache_size={-self.cache_size_kb}")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """현재 스레드의 연결 (처음 쓸 때 열고 계속 재사용)"""
+        if self.closed:
+            raise RuntimeError(f"닫힌 저장소입니다: {self.db_path}")
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self.open_connection()
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """
+        읽기 트랜잭션 - 안의 조회는 모두 같은 시점의 데이터를 봄
+
+        WAL에서는 쓰기 중에도 막히지 않고 마지막 커밋 시점을 읽습니다.
+        """
+        conn = self.connection()
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.execute("COMMIT")
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """쓰기 트랜잭션 (BEGIN IMMEDIATE로 시작해 중간에 잠금을 올리다 실패하지 않음)"""
+        with self._write_lock:
+            conn = self.connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def checkpoint(self, mode: str = "PASSIVE"):
+        """WAL 내용을 DB 파일에 반영 (자동 체크포인트 외에 종료 시 정리용)"""
+        if self.wal:
+            self.connection().execute(f"PRAGMA wal_checkpoint({mode})")
+
+    def close(self):
+        """모든 스레드의 연결 닫기"""
+        if self.closed:
+            return
+        if self.wal:
+            try:
+                self.checkpoint()
+            except sqlite3.Error as e:
+                logging.warning(f"WAL 체크포인트 실패: {e}")
+        self.closed = True
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
@@ -0,0 +1,136 @@
+"""
+서점별 구조화 소스 (엔드포인트 전략)
+상품 페이지 전체를 받아 텍스트 정규식으로 찾기 전에 순위 조각(fragment), JSON API,
+페이지에 포함된 JSON-LD처럼 작고 구조화된 소스를 먼저 시도합니다.
+구조화 소스로 목표 필드를 모두 채우면 상품 페이지는 받지 않거나(별도 요청 소스)
+전체 트리를 파싱하지 않습니다(페이지 내장 소스).
+
+소스 종류:
+    fragment: 상품 ID로 URL을 만드는 별도 HTML 조각 요청 (YES24 베스트셀러 모듈)
+    api: 상품 ID로 URL을 만드는 별도 JSON API 요청 (알라딘 상품 조회 API - ttbkey 필요)
+    embedded: 상품 페이지 안의 구조화 데이터 (교보문고 JSON-LD) - 요청은 줄지 않고 파싱만 줄어듦
+"""
+
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from bestseller_lists import product_id_from_url
+
+# 로그/보관 기록에 남기지 않을 URL 쿼리 파라미터
+SECRET_PARAMS = re.compile(r"(ttbkey=)[^&]+", re.IGNORECASE)
+
+
+class StoreEndpoint:
+    def __init__(
+        self,
+        name: str,
+        label: str,
+        kind: str,
+        fields: Tuple[str, ...],
+        extractor: str,
+        url_template: Optional[str] = None,
+        env_key: Optional[str] = None,
+    ):
+        """
+        Args:
+            name: 소스 이름 (결과의 source, 단계 시간 집계, 원본 보관 역할에 쓰임)
+            label: 로그용 이름
+            kind: "fragment", "api", "embedded"
+            fields: 이 소스로 채울 수 있는 필드 (상품 페이지를 미리 받을지 판단하는 기준)
+            extractor: (본문, 결과)를 받아 결과를 채우는 파서 메서드 이름
+            url_template: {product_id} (와 {key})를 포함한 URL (embedded는 None)
+            env_key: URL의 {key}에 넣을 값을 읽는 환경변수 (없으면 이 소스를 건너뜀)
+        """
+        self.name = name
+        self.label = label
+        self.kind = kind
+        self.fields = fields
+        self.extractor = extractor
+        self.url_template = url_template
+        self.env_key = env_key
+
+    @property
+    def remote(self) -> bool:
+        """상품 페이지와 별개로 요청하는 소스인지"""
+        return self.url_template is not None
+
+    def url(self, store: str, product_url: str) -> Optional[str]:
+        """상품 URL로 소스 URL 생성 (상품 ID나 API 키가 없으면 None)"""
+        if not self.remote:
+            return None
+        product_id = product_id_from_url(store, product_url)
+        if not product_id:
+            return None
+        params = {"product_id": product_id}
+        if self.env_key:
+            key = os.getenv(self.env_key)
+            if not key:
+                return None
+            params["key"] = key
+        return self.url_template.format(**params)
+
+
+# 서점별 구조화 소스 (시도 순서대로, 상품 페이지 전체 파싱은 항상 마지막 수단)
+STORE_ENDPOINTS: Dict[str, List[StoreEndpoint]] = {
+    "kyobobook": [
+        StoreEndpoint(
+            "json_ld",
+            "JSON-LD",
+            "embedded",
+            ("domestic_rank", "it_rank"),
+            "_extract_kyobobook_json_ld",
+        ),
+    ],
+    "yes24": [
+        StoreEndpoint(
+            "bestseller_module",
+            "베스트셀러 모듈 페이지",
+            "fragment",
+            ("it_mobile_rank",),
+            "_extract_yes24_module",
+            "https://www.yes24.com/Product/addModules/BestSellerRank_Book/{product_id}/"
+            "?categoryNumber=001001003025009&FreePrice=N",
+        ),
+    ],
+    "aladin": [
+        StoreEndpoint(
+            "ttb_api",
+            "알라딘 상품 조회 API",
+            "api",
+            ("sales_point", "computer_weekly_rank", "textbook_rank"),
+            "_extract_aladin_api",
+            "https://www.aladin.co.kr/ttb/api/ItemLookUp.aspx?ttbkey={key}"
+            "&itemIdType=ItemId&ItemId={product_id}&output=js&Version=20131101"
+            "&OptResult=bestSellerRank",
+            env_key="ALADIN_TTB_KEY",
+        ),
+    ],
+}
+
+
+def remote_endpoints(store: str, product_url: str) -> List[Tuple[StoreEndpoint, str]]:
+    """상품 하나에 대해 요청할 수 있는 별도 소스와 URL 목록"""
+    endpoints = []
+    for endpoint in STORE_ENDPOINTS.get(store, []):
+        endpoint_url = endpoint.url(store, product_url)
+        if endpoint_url:
+            endpoints.append((endpoint, endpoint_url))
+    return endpoints
+
+
+def embedded_endpoints(store: str) -> List[StoreEndpoint]:
+    """상품 페이지 본문 안에서 먼저 확인할 구조화 소스"""
+    return [endpoint for endpoint in STORE_ENDPOINTS.get(store, []) if endpoint.kind == "embedded"]
+
+
+def endpoint_by_name(store: str, name: str) -> Optional[StoreEndpoint]:
+    for endpoint in STORE_ENDPOINTS.get(store, []):
+        if endpoint.name == name:
+            return endpoint
+    return None
+
+
+def redact_url(url: str) -> str:
+    """API 키를 가린 URL (로그/원본 보관용)"""
+    return SECRET_PARAMS.sub(r"\1***", url)
@@ -3,189 +3,658 @@
 교보문고, YES24, 알라딘에서 도서 순위 정보를 추출합니다.
 """
 
+import asyncio
+import codecs
+import copy
+import importlib.util
 import json
 import logging
+import os
 import re
+import sqlite3
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 
 import httpx
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
+
+from bestseller_lists import BESTSELLER_LISTS, product_id_from_url
+
+from fixture_store import (
+    AsyncRecordingTransport,
+    FixtureStore,
+    RecordingTransport,
+    ReplayTransport,
+)
+from extraction_stats import ExtractionStats
+from html_archive import HtmlArchive
+from page_cache import PageCache
+from resilience import CircuitBreaker, Deadline, RetryPolicy
+from scrape_timing import (
+    PhaseTimer,
+    RequestTiming,
+    append_cycle_record,
+    cycle_record,
+    store_for_url,
+    summary_lines,
+)
+from store_endpoints import (
+    embedded_endpoints,
+    endpoint_by_name,
+    redact_url,
+    remote_endpoints,
+)
 
 # 로거 설정
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+# 서점 표시 이름
+STORE_NAMES = {"kyobobook": "교보문고", "yes24": "YES24", "aladin": "알라딘"}
 
-class BookRankingScraper:
-    def __init__(self, debug=False):
-        """
-        스크래퍼 초기화
+# 서점별 상품 URL 템플릿 (상품 ID로 URL 생성)
+PRODUCT_URL_TEMPLATES = {
+    "kyobobook": "https://product.kyobobook.co.kr/detail/{product_id}",
+    "yes24": "https://www.yes24.com/product/goods/{product_id}",
+    "aladin": "https://www.aladin.co.kr/shop/wproduct.aspx?ItemId={product_id}",
+}
+
+# httpx는 brotli(또는 brotlicffi)가 설치돼 있어야 br 응답을 풀 수 있으므로 그때만 br을 요청
+BROTLI_AVAILABLE = any(
+    importlib.util.find_spec(name) is not None for name in ("brotli", "brotlicffi")
+)
+ACCEPT_ENCODING = "gzip, deflate, br" if BROTLI_AVAILABLE else "gzip, deflate"
+# HTTP/2는 h2 패키지가 있어야 사용 가능 (uv pip install "httpx[http2,brotli]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# 수집 주기 마감까지 가져오지 못한 서점 결과의 오류 메시지
+DEADLINE_ERROR = "수집 기한 초과로 가져오지 못했습니다"
+
+# 이 길이보다 긴 텍스트는 패턴별 순차 검색이 더 빠르다
+# (긴 텍스트에서는 re의 리터럴 접두어 최적화가 통합 패턴보다 유리함)
+COMBINED_SEARCH_MAX_LENGTH = 500
+
+
+class ExtractionPlan:
+    """
+    필드 하나를 추출하기 위한 우선순위 패턴 목록
 
+    패턴은 모듈 임포트 시 한 번만 컴파일되고, 모든 패턴을 하나의 alternation으로
+    합친 통합 패턴으로 짧은 텍스트를 한 번에 검사합니다. 결과는 기존처럼
+    "목록에서 앞선 패턴이 먼저 이긴다"는 우선순위를 그대로 따릅니다.
+    """
+
+    def __init__(self, patterns, flags=0, accept=None):
+        """
         Args:
-            debug (bool): 디버깅 모드 활성화 여부
+            patterns: 우선순위 순서의 정규식 목록 (각각 캡처 그룹 1개)
+            flags: 모든 패턴에 공통으로 적용할 re 플래그
+            accept: 캡처값 검증 함수 (False면 다음 패턴으로 넘어감)
         """
-        self.debug = debug
-        self.headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "ko-KR,ko;q=0.9,en;q=0.8",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Connection": "keep-alive",
-            "Upgrade-Insecure-Requests": "1",
-        }
-        self.client = httpx.Client(
-            headers=self.headers, follow_redirects=True, timeout=30.0
+        self.patterns = [re.compile(pattern, flags) for pattern in patterns]
+        for compiled in self.patterns:
+            if compiled.groups != 1:
+                raise ValueError(f"패턴은 캡처 그룹이 1개여야 합니다: {compiled.pattern}")
+        # 각 패턴의 캡처 그룹 번호 = 패턴 인덱스 + 1
+        self.combined = re.compile(
+            "|".join(f"(?:{pattern})" for pattern in patterns), flags
         )
-        self.results = {}
+        self.accept = accept
 
-    def fetch_page(self, url: str) -> Optional[str]:
-        """페이지 HTML 가져오기"""
-        try:
-            response = self.client.get(url)
-            response.raise_for_status()
-            # httpx는 자동으로 인코딩을 감지하지만, 필요시 명시적 설정
-            if response.encoding is None:
-                response.encoding = "utf-8"
-            return response.text
-        except httpx.HTTPStatusError as e:
-            logging.error(f"HTTP 오류 ({url}): {e.response.status_code}")
+    def _accepted(self, match) -> Optional[str]:
+        if match is None:
             return None
-        except Exception as e:
-            logging.error(f"페이지 가져오기 실패 ({url}): {e}")
+        value = match.group(match.lastindex)
+        if self.accept is not None and not self.accept(value):
             return None
+        return value
 
-    def scrape_kyobobook(self, url: str) -> Dict[str, Any]:
+    def full_order(self, preferred: Optional[List[int]]) -> Optional[List[int]]:
+        """선호 패턴 인덱스를 앞에 두고 나머지를 원래 우선순위로 붙인 시도 순서"""
+        if not preferred:
+            return None
+        order = [index for index in preferred if 0 <= index < len(self.patterns)]
+        return order + [index for index in range(len(self.patterns)) if index not in order]
+
+    def search(self, text: str) -> Optional[str]:
+        """우선순위가 가장 높은 매치의 캡처값 반환 (없으면 None)"""
+        return self.search_hit(text)[0]
+
+    def search_hit(
+        self, text: str, order: Optional[List[int]] = None
+    ) -> Tuple[Optional[str], Optional[int]]:
         """
-        교보문고에서 주간베스트 순위 추출
-        - 국내 도서 순위
-        - 컴퓨터/IT 순위
+        매치된 캡처값과 패턴 인덱스 반환 (없으면 (None, None))
+
+        Args:
+            text: 검사할 텍스트
+            order: 패턴을 시도할 인덱스 순서 (None이면 정의된 우선순위)
+        """
+        if order is not None:
+            for index in order:
+                value = self._accepted(self.patterns[index].search(text))
+                if value is not None:
+                    return value, index
+            return None, None
+
+        start = 0
+        if len(text) <= COMBINED_SEARCH_MAX_LENGTH:
+            match = self.combined.search(text)
+            if match is None:
+                return None, None
+            hit = match.lastindex - 1
+            # 통합 패턴은 가장 왼쪽 매치를 돌려주므로, 더 높은 우선순위 패턴이
+            # 텍스트 뒤쪽에서 매치되는지만 따로 확인한다
+            for index, compiled in enumerate(self.patterns[:hit]):
+                value = self._accepted(compiled.search(text))
+                if value is not None:
+                    return value, index
+            value = self._accepted(match)
+            if value is not None:
+                return value, hit
+            start = hit + 1
+
+        for index in range(start, len(self.patterns)):
+            value = self._accepted(self.patterns[index].search(text))
+            if value is not None:
+                return value, index
+        return None, None
+
+
+# 교보문고 추출 계획
+KYOBO_DOMESTIC_PLAN = ExtractionPlan(
+    [
+        r"국내도서\s*(\d+)위",
+        r"국내도서\s*주간베스트\s*(\d+)위",
+        r"국내\s*도서\s*(\d+)위",
+        r"종합\s*(\d+)위",
+        r"종합베스트\s*(\d+)위",
+        r"주간베스트\s*국내도서\s*(\d+)위",
+    ]
+)
+KYOBO_IT_PLAN = ExtractionPlan(
+    [
+        r"컴퓨터/IT\s*(\d+)위",
+        r"컴퓨터\s*/\s*IT\s*(\d+)위",
+        r"IT/컴퓨터\s*(\d+)위",
+        r"IT\s*(\d+)위",
+        r"컴퓨터/모바일\s*(\d+)위",
+        r"컴퓨터\s*(\d+)위",
+    ]
+)
+KYOBO_RANK_AREAS = ["prod_rank_area", "prod_rank_wrap", "rankArea", "bestRank"]
+
+# YES24 추출 계획
+YES24_SALES_PLAN = ExtractionPlan(
+    [
+        r"판매지수\s*[:\s]*(\d+(?:,\d+)*)",
+        r"Sales\s*Point\s*[:\s]*(\d+(?:,\d+)*)",
+        r"판매\s*지수\s*(\d+(?:,\d+)*)",
+    ],
+    re.IGNORECASE,
+)
+YES24_INFO_SALES_PLAN = ExtractionPlan([r"판매지수\s*(\d+(?:,\d+)*)"])
+# IT 모바일 순위 패턴 - 모듈 페이지에 특화된 패턴
+# 순위가 숫자인지 확인 (주차는 제외), 100위 이하는 유효한 순위로 간주
+YES24_MODULE_IT_PLAN = ExtractionPlan(
+    [
+        r"IT\s*모바일\s*(\d+)위",
+        r"IT\s*모바일\s*top\d+\s*(\d+)주",  # "IT 모바일 top20 1주" 형식도 고려
+        r"IT/모바일\s*(\d+)위",
+        r"IT\s*/\s*모바일\s*(\d+)",
+    ],
+    accept=lambda rank: rank.isdigit() and int(rank) <= 100,
+)
+YES24_PAGE_IT_PLAN = ExtractionPlan(
+    [
+        r"IT\s*모바일\s*(\d+)위",
+        r"IT/모바일\s*(\d+)위",
+        r"IT\s*/\s*모바일\s*(\d+)",
+        r"컴퓨터/IT\s*(\d+)위",
+        r"컴퓨터\s*/\s*모바일\s*(\d+)위",
+        r"컴퓨터\s*모바일\s*(\d+)위",
+        r"IT\s*(\d+)위",
+        r"IT/컴퓨터\s*(\d+)위",
+    ]
+)
+YES24_RANK_CLASSES = ["gd_best", "rank_row", "cate_best", "rankRow", "gd_nameH"]
+
+# 알라딘 추출 계획
+ALADIN_COMPUTER_PLAN = ExtractionPlan(
+    [
+        r"컴퓨터/모바일\s*주간\s*(\d+)위",
+        r"컴퓨터\s*/\s*모바일\s*.*?(\d+)위",
+        r"IT/컴퓨터.*?주간\s*(\d+)",
+    ]
+)
+ALADIN_TEXTBOOK_PLAN = ExtractionPlan(
+    [
+        r"대학교재/전문서적\s*top\s*100\s*(\d+)",
+        r"대학교재\s*/\s*전문서적.*?(\d+)위",
+        r"전문서적.*?top.*?(\d+)",
+    ],
+    re.IGNORECASE,
+)
+ALADIN_PERIOD_PLAN = ExtractionPlan([r"(\d+)주\s*\|"])
+ALADIN_SALES_PLAN = ExtractionPlan(
+    [
+        r"Sales\s*Point\s*:\s*(\d+(?:,\d+)*)",
+        r"판매지수\s*:\s*(\d+(?:,\d+)*)",
+        r"Sales\s*Point\s*(\d+(?:,\d+)*)",
+    ],
+    re.IGNORECASE,
+)
+ALADIN_SECTION_COMPUTER_PLAN = ExtractionPlan([r"컴퓨터.*?(\d+)위"])
+ALADIN_SECTION_POINT_PLAN = ExtractionPlan(
+    [r"(\d+(?:,\d+)*)\s*point"], re.IGNORECASE
+)
+ALADIN_SECTION_CLASS = re.compile("best|rank")
+
+# 부분 파싱에는 lxml이 설치되어 있으면 사용 (없으면 기본 html.parser)
+PARTIAL_PARSER = "lxml" if builder_registry.lookup("lxml") else "html.parser"
+
+
+class RegionStrainer(SoupStrainer):
+    """
+    추출기가 읽는 영역만 트리로 만드는 SoupStrainer
+
+    지정한 클래스의 div, JSON-LD script, dl 블록만 파싱하고
+    나머지 마크업은 트리 노드를 만들지 않고 건너뜁니다.
+    """
+
+    def __init__(self, classes=(), class_pattern=None):
+        """
+        Args:
+            classes: 파싱할 div 클래스 이름 목록
+            class_pattern: 클래스 이름에 대해 검사할 정규식 (알라딘 best|rank 등)
         """
-        logging.info("교보문고 스크래핑 시작...")
-        kyobo_data = {
+        super().__init__()
+        self.classes = set(classes)
+        self.class_pattern = class_pattern
+
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        attrs = attrs or {}
+        if name == "dl":
+            return True
+        if name == "script":
+            return attrs.get("type") == "application/ld+json"
+        if name != "div":
+            return False
+
+        class_value = attrs.get("class") or ""
+        if isinstance(class_value, list):
+            class_value = " ".join(class_value)
+        class_names = class_value.split()
+        if self.classes.intersection(class_names):
+            return True
+        if self.class_pattern is not None:
+            return any(self.class_pattern.search(c) for c in class_names)
+        return False
+
+    def allow_string_creation(self, string) -> bool:
+        # 영역 밖의 최상위 문자열은 버린다
+        return False
+
+
+# 서점별 부분 파싱 영역과, 부분 파싱 결과를 그대로 쓰기 위해 채워져야 하는 필드
+# (전체 트리가 채우는 필드가 하나라도 비면 전체 트리로 다시 추출 - 스트리밍 목표 필드와 같음,
+#  알라딘 대학교재 순위/순위 기간은 컴퓨터/모바일 순위와 같은 블록이라 그 순위를 찾으면 함께 찾음)
+KYOBO_REGIONS = RegionStrainer(KYOBO_RANK_AREAS)
+KYOBO_REQUIRED_FIELDS = ("domestic_rank", "it_rank")
+YES24_REGIONS = RegionStrainer(["gd_infoBot"] + YES24_RANK_CLASSES)
+YES24_REQUIRED_FIELDS = ("sales_index", "it_mobile_rank")
+# 모듈 전용 모드에서는 메인 페이지에서 판매지수만 찾는다
+YES24_SALES_REGIONS = RegionStrainer(["gd_infoBot"])
+YES24_SALES_REQUIRED_FIELDS = ("sales_index",)
+ALADIN_REGIONS = RegionStrainer(class_pattern=ALADIN_SECTION_CLASS)
+ALADIN_REQUIRED_FIELDS = ("computer_weekly_rank", "sales_point")
+
+# 스트리밍 다운로드: 목표 필드가 모두 채워지면 나머지 본문은 받지 않고 연결을 닫는다
+# (알라딘 대학교재 순위는 없는 상품이 많아 제외 - 컴퓨터/모바일 순위와 같은 블록에 표시됨)
+STREAM_TARGET_FIELDS = {
+    "kyobobook": ("domestic_rank", "it_rank"),
+    "yes24": ("sales_index", "it_mobile_rank"),
+    "aladin": ("computer_weekly_rank", "sales_point"),
+}
+# 새로 받은 본문에 이 키워드가 있을 때만 지금까지 받은 본문으로 추출을 시도한다
+STREAM_TRIGGERS = {
+    "kyobobook": re.compile(r"국내도서|컴퓨터|IT"),
+    "yes24": re.compile(r"판매지수|Sales\s*Point|IT\s*모바일"),
+    "aladin": re.compile(r"Sales\s*Point|컴퓨터/모바일|주간"),
+}
+STREAM_TRIGGER_OVERLAP = 32  # 청크 경계에 걸친 키워드를 놓치지 않기 위한 겹침 글자 수
+STREAM_CHECK_CHARS = 32 * 1024  # 추출 시도 사이 최소 간격 (글자 수)
+
+
+def _kyobo_rank_area_texts(soup: BeautifulSoup):
+    for area_class in KYOBO_RANK_AREAS:
+        rank_section = soup.find("div", class_=area_class)
+        if rank_section:
+            yield rank_section.get_text()
+
+
+def _json_ld_texts(soup: BeautifulSoup):
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string)
+        except Exception:
+            continue
+        # JSON-LD 데이터에서 랭킹 정보 추출 시도
+        if isinstance(data, dict):
+            yield str(data)
+
+
+def _dl_texts(soup: BeautifulSoup):
+    for dl in soup.find_all("dl"):
+        yield dl.get_text()
+
+
+def _yes24_info_texts(soup: BeautifulSoup):
+    info_section = soup.find("div", class_="gd_infoBot")
+    if info_section:
+        yield info_section.get_text()
+
+
+def _yes24_rank_class_texts(soup: BeautifulSoup):
+    for class_name in YES24_RANK_CLASSES:
+        rank_elem = soup.find("div", class_=class_name)
+        if rank_elem:
+            yield rank_elem.get_text()
+
+
+def _aladin_section_texts(soup: BeautifulSoup):
+    bestseller_section = soup.find("div", class_=ALADIN_SECTION_CLASS)
+    if bestseller_section:
+        yield bestseller_section.get_text()
+
+
+# 추출 단계(tier) 이름별로 검사할 텍스트 목록 ("page"는 페이지 전체 텍스트)
+TIER_TEXTS = {
+    "page": lambda soup: iter([soup.get_text()]),
+    "rank_area": _kyobo_rank_area_texts,
+    "json_ld": _json_ld_texts,
+    "dl": _dl_texts,
+    "info_bot": _yes24_info_texts,
+    "rank_class": _yes24_rank_class_texts,
+    "best_section": _aladin_section_texts,
+}
+
+
+def _number(value: str) -> str:
+    return value.replace(",", "")
+
+
+def _weeks(value: str) -> str:
+    return f"{value}주"
+
+
+# 서점별 필드 추출 단계: 필드 → [(단계, 추출 계획, 값 변환), ...] (기본 시도 순서)
+KYOBO_FIELD_TIERS = {
+    field: [
+        ("page", plan, int),
+        ("rank_area", plan, int),
+        ("json_ld", plan, int),
+        ("dl", plan, int),
+    ]
+    for field, plan in (("domestic_rank", KYOBO_DOMESTIC_PLAN), ("it_rank", KYOBO_IT_PLAN))
+}
+YES24_SALES_TIERS = {
+    "sales_index": [
+        ("page", YES24_SALES_PLAN, _number),
+        ("info_bot", YES24_INFO_SALES_PLAN, _number),
+    ],
+}
+YES24_FIELD_TIERS = {
+    **YES24_SALES_TIERS,
+    "it_mobile_rank": [
+        ("page", YES24_PAGE_IT_PLAN, int),
+        ("rank_class", YES24_PAGE_IT_PLAN, int),
+        ("dl", YES24_PAGE_IT_PLAN, int),
+    ],
+}
+ALADIN_FIELD_TIERS = {
+    "computer_weekly_rank": [
+        ("page", ALADIN_COMPUTER_PLAN, int),
+        ("best_section", ALADIN_SECTION_COMPUTER_PLAN, int),
+    ],
+    "textbook_rank": [("page", ALADIN_TEXTBOOK_PLAN, int)],
+    "rank_period": [("page", ALADIN_PERIOD_PLAN, _weeks)],
+    "sales_point": [
+        ("page", ALADIN_SALES_PLAN, _number),
+        ("best_section", ALADIN_SECTION_POINT_PLAN, _number),
+    ],
+}
+
+# 서점별 추출 필드 (통계 기록 대상)
+STORE_FIELDS = {
+    "kyobobook": tuple(KYOBO_FIELD_TIERS),
+    "yes24": tuple(YES24_FIELD_TIERS),
+    "aladin": tuple(ALADIN_FIELD_TIERS),
+}
+
+# 상품 페이지에 포함된 JSON-LD 블록 (트리를 만들지 않고 본문에서 바로 찾음)
+JSON_LD_SCRIPT = re.compile(
+    r"<script[^>]*application/ld\+json[^>]*>(.*?)</script>", re.IGNORECASE | re.DOTALL
+)
+# 서점별로 JSON-LD에서 시도할 (필드, 추출 계획, 값 변환) - 단계 표의 json_ld 단계와 같음
+JSON_LD_PLANS = {
+    store: [
+        (field, plan, convert)
+        for field, tiers in field_tiers.items()
+        for tier, plan, convert in tiers
+        if tier == "json_ld"
+    ]
+    for store, field_tiers in (
+        ("kyobobook", KYOBO_FIELD_TIERS),
+        ("yes24", YES24_FIELD_TIERS),
+        ("aladin", ALADIN_FIELD_TIERS),
+    )
+}
+# 알라딘 상품 조회 API의 bestSellerRank 문자열에서 찾을 순위 (상품 페이지와 같은 패턴)
+ALADIN_API_RANK_PLANS = [
+    ("computer_weekly_rank", ALADIN_COMPUTER_PLAN, int),
+    ("textbook_rank", ALADIN_TEXTBOOK_PLAN, int),
+]
+
+
+class TierTexts:
+    """파싱된 트리 하나에서 단계별 텍스트를 필요한 만큼만 만들고 재사용"""
+
+    def __init__(self, soup: BeautifulSoup):
+        self.soup = soup
+        self.cache: Dict[str, List[str]] = {}
+        self.sources: Dict[str, Any] = {}
+
+    def texts(self, tier: str):
+        cached = self.cache.setdefault(tier, [])
+        if tier not in self.sources:
+            self.sources[tier] = TIER_TEXTS[tier](self.soup)
+        index = 0
+        while True:
+            if index < len(cached):
+                yield cached[index]
+                index += 1
+                continue
+            text = next(self.sources[tier], None)
+            if text is None:
+                return
+            cached.append(text)
+
+
+class BookRankingParser:
+    """
+    상품 페이지 HTML에서 순위 정보를 추출하는 파서
+
+    네트워크 클라이언트를 갖지 않으므로 프로세스 풀 워커에서도 가볍게 만들 수 있습니다.
+    """
+
+    def __init__(self, debug=False, partial_parse=True, yes24_module_only=False):
+        """
+        파서 초기화
+
+        Args:
+            debug (bool): 디버깅 모드 활성화 여부
+            partial_parse (bool): 순위 영역만 먼저 파싱하는 빠른 경로 사용 여부
+            yes24_module_only (bool): YES24 IT 모바일 순위를 베스트셀러 모듈에서만 읽고
+                메인 페이지에서는 판매지수만 추출할지 여부
+        """
+        self.debug = debug
+        self.partial_parse = partial_parse
+        self.yes24_module_only = yes24_module_only
+        # 서점/필드별로 먼저 시도할 단계와 패턴 순서 (ExtractionStats.order_hints)
+        self.extraction_order: Dict[str, Dict[str, Any]] = {}
+        # 서점별 파싱/추출 단계 시간 (수집 주기마다 초기화)
+        self.timer = PhaseTimer()
+
+    @staticmethod
+    def new_kyobobook_data(url: str) -> Dict[str, Any]:
+        """교보문고 결과 기본 구조"""
+        return {
             "url": url,
             "timestamp": datetime.now().isoformat(),
             "domestic_rank": None,
             "it_rank": None,
             "error": None,
+            "extracted_by": {},
         }
 
-        try:
-            html = self.fetch_page(url)
-            if not html:
-                kyobo_data["error"] = "페이지를 가져올 수 없습니다"
-                return kyobo_data
+    @staticmethod
+    def new_yes24_data(url: str) -> Dict[str, Any]:
+        """YES24 결과 기본 구조"""
+        return {
+            "url": url,
+            "timestamp": datetime.now().isoformat(),
+            "sales_index": None,
+            "it_mobile_rank": None,
+            "error": None,
+            "extracted_by": {},
+        }
 
-            soup = BeautifulSoup(html, "html.parser")
-            page_text = soup.get_text()
-
-            # 주간베스트 정보 추출 - 다양한 패턴 시도
-            # 국내도서 순위 찾기
-            domestic_patterns = [
-                r"국내도서\s*(\d+)위",
-                r"국내도서\s*주간베스트\s*(\d+)위",
-                r"국내\s*도서\s*(\d+)위",
-                r"종합\s*(\d+)위",
-                r"종합베스트\s*(\d+)위",
-                r"주간베스트\s*국내도서\s*(\d+)위",
-            ]
+    @staticmethod
+    def new_aladin_data(url: str) -> Dict[str, Any]:
+        """알라딘 결과 기본 구조"""
+        return {
+            "url": url,
+            "timestamp": datetime.now().isoformat(),
+            "computer_weekly_rank": None,
+            "textbook_rank": None,
+            "sales_point": None,
+            "rank_period": None,
+            "error": None,
+            "extracted_by": {},
+        }
 
-            for pattern in domestic_patterns:
-                match = re.search(pattern, page_text)
-                if match:
-                    kyobo_data["domestic_rank"] = int(match.group(1))
-                    break
+    def new_store_data(self, store: str, url: str) -> Dict[str, Any]:
+        """서점 이름으로 결과 기본 구조 생성"""
+        builders = {
+            "kyobobook": self.new_kyobobook_data,
+            "yes24": self.new_yes24_data,
+            "aladin": self.new_aladin_data,
+        }
+        return builders[store](url)
+
+    def parse_with_fallback(
+        self,
+        store: str,
+        html: str,
+        data: Dict[str, Any],
+        extract,
+        regions: RegionStrainer,
+        required_fields,
+    ):
+        """
+        순위 영역만 파싱한 트리로 먼저 추출하고, 필수 필드가 비면 전체 트리로 재추출
 
-            # 컴퓨터/IT 순위 찾기
-            it_patterns = [
-                r"컴퓨터/IT\s*(\d+)위",
-                r"컴퓨터\s*/\s*IT\s*(\d+)위",
-                r"IT/컴퓨터\s*(\d+)위",
-                r"IT\s*(\d+)위",
-                r"컴퓨터/모바일\s*(\d+)위",
-                r"컴퓨터\s*(\d+)위",
-            ]
+        Args:
+            store: 서점 이름 (단계 시간 집계용)
+            html: 상품 페이지 HTML
+            data: 결과 딕셔너리 (extract가 채움)
+            extract: (soup, data)를 받아 data를 채우는 함수
+            regions: 빠른 경로에서 파싱할 영역
+            required_fields: 빠른 경로 결과를 채택하기 위한 필수 필드
+        """
+        if self.partial_parse:
+            initial = copy.deepcopy(data)
+            with self.timer.measure(store, "parse"):
+                soup = BeautifulSoup(html, PARTIAL_PARSER, parse_only=regions)
+            with self.timer.measure(store, "extract"):
+                extract(soup, data)
+            if all(data[field] for field in required_fields):
+                self._mark_stage(data, "partial")
+                return
+            # 부분 파싱으로 찾지 못한 필드가 있으면 처음 상태에서 전체 트리로 다시 추출
+            data.clear()
+            data.update(initial)
+
+        with self.timer.measure(store, "parse"):
+            soup = BeautifulSoup(html, "html.parser")
+        with self.timer.measure(store, "extract"):
+            extract(soup, data)
+        self._mark_stage(data, "full")
+
+    @staticmethod
+    def _mark_stage(data: Dict[str, Any], stage: str):
+        """이번 파싱에서 채운 필드의 추출 경로 앞에 파싱 단계 표시 (partial/full/module)"""
+        extracted_by = data["extracted_by"]
+        for field, label in extracted_by.items():
+            if "/" not in label:
+                extracted_by[field] = f"{stage}/{label}"
+
+    def fill_fields(
+        self,
+        store: str,
+        soup: BeautifulSoup,
+        data: Dict[str, Any],
+        field_tiers: Dict[str, List[Tuple[str, ExtractionPlan, Any]]],
+    ):
+        """
+        비어 있는 필드를 단계별로 채우고 어떤 단계/패턴이 값을 냈는지 기록
 
-            for pattern in it_patterns:
-                match = re.search(pattern, page_text)
-                if match:
-                    kyobo_data["it_rank"] = int(match.group(1))
+        extraction_order에 통계로 정한 순서가 있으면 그 단계와 패턴을 먼저 시도합니다.
+        """
+        texts = TierTexts(soup)
+        hints = self.extraction_order.get(store, {})
+        for field, tiers in field_tiers.items():
+            if data[field]:
+                continue
+            hint = hints.get(field, {})
+            for tier, plan, convert in self.ordered_tiers(tiers, hint.get("tiers")):
+                started = time.perf_counter()
+                order = plan.full_order(hint.get("patterns", {}).get(tier))
+                for text in texts.texts(tier):
+                    value, index = plan.search_hit(text, order)
+                    if value:
+                        data[field] = convert(value)
+                        data["extracted_by"][field] = f"{tier}#{index}"
+                        break
+                self.timer.add_tier(store, tier, time.perf_counter() - started)
+                if data[field]:
                     break
 
-            # prod_rank_area 또는 유사한 클래스에서 찾기
-            if not kyobo_data["domestic_rank"] or not kyobo_data["it_rank"]:
-                rank_areas = [
-                    "prod_rank_area",
-                    "prod_rank_wrap",
-                    "rankArea",
-                    "bestRank",
-                ]
-                for area_class in rank_areas:
-                    rank_section = soup.find("div", class_=area_class)
-                    if rank_section:
-                        section_text = rank_section.get_text()
-
-                        if not kyobo_data["domestic_rank"]:
-                            for pattern in domestic_patterns:
-                                match = re.search(pattern, section_text)
-                                if match:
-                                    kyobo_data["domestic_rank"] = int(match.group(1))
-                                    break
-
-                        if not kyobo_data["it_rank"]:
-                            for pattern in it_patterns:
-                                match = re.search(pattern, section_text)
-                                if match:
-                                    kyobo_data["it_rank"] = int(match.group(1))
-                                    break
-
-            # 메타 데이터나 JSON-LD에서 찾기
-            if not kyobo_data["domestic_rank"] or not kyobo_data["it_rank"]:
-                script_tags = soup.find_all("script", type="application/ld+json")
-                for script in script_tags:
-                    try:
-                        data = json.loads(script.string)
-                        # JSON-LD 데이터에서 랭킹 정보 추출 시도
-                        if isinstance(data, dict):
-                            str_data = str(data)
-                            if not kyobo_data["domestic_rank"]:
-                                for pattern in domestic_patterns:
-                                    match = re.search(pattern, str_data)
-                                    if match:
-                                        kyobo_data["domestic_rank"] = int(
-                                            match.group(1)
-                                        )
-                                        break
-
-                            if not kyobo_data["it_rank"]:
-                                for pattern in it_patterns:
-                                    match = re.search(pattern, str_data)
-                                    if match:
-                                        kyobo_data["it_rank"] = int(match.group(1))
-                                        break
-                    except:
-                        continue
-
-            # dl, dt, dd 태그에서 찾기
-            if not kyobo_data["domestic_rank"] or not kyobo_data["it_rank"]:
-                dl_elements = soup.find_all("dl")
-                for dl in dl_elements:
-                    dl_text = dl.get_text()
-                    if not kyobo_data["domestic_rank"]:
-                        for pattern in domestic_patterns:
-                            match = re.search(pattern, dl_text)
-                            if match:
-                                kyobo_data["domestic_rank"] = int(match.group(1))
-                                break
-
-                    if not kyobo_data["it_rank"]:
-                        for pattern in it_patterns:
-                            match = re.search(pattern, dl_text)
-                            if match:
-                                kyobo_data["it_rank"] = int(match.group(1))
-                                break
+    @staticmethod
+    def ordered_tiers(tiers, preferred: Optional[List[str]]):
+        """선호 단계 순서대로 정렬 (목록에 없는 단계는 기본 순서로 뒤에)"""
+        if not preferred:
+            return tiers
+        rank = {tier: position for position, tier in enumerate(preferred)}
+        return sorted(tiers, key=lambda entry: rank.get(entry[0], len(rank)))
+
+    def parse_kyobobook(self, html: str, kyobo_data: Dict[str, Any]) -> Dict[str, Any]:
+        """교보문고 상품 페이지 HTML에서 순위 정보 추출"""
+        try:
+            self.parse_with_fallback(
+                "kyobobook",
+                html,
+                kyobo_data,
+                self._extract_kyobobook,
+                KYOBO_REGIONS,
+                KYOBO_REQUIRED_FIELDS,
+            )
 
             logging.info(
                 f"교보문고 데이터: 국내도서 {kyobo_data['domestic_rank']}위, IT {kyobo_data['it_rank']}위"
@@ -197,275 +666,974 @@ class BookRankingScraper:
 
         return kyobo_data
 
-    def scrape_yes24(self, url: str) -> Dict[str, Any]:
+    def _extract_kyobobook(self, soup: BeautifulSoup, kyobo_data: Dict[str, Any]):
+        """파싱된 트리에서 교보문고 순위 정보 추출"""
+        # 국내도서 순위, 컴퓨터/IT 순위: 페이지 전체 → 순위 영역 클래스 → JSON-LD → dl 태그
+        self.fill_fields("kyobobook", soup, kyobo_data, KYOBO_FIELD_TIERS)
+
+    def parse_yes24(self, html: str, yes24_data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        YES24에서 판매지수와 IT 모바일 순위 추출
-        메인 상품 페이지와 베스트셀러 모듈 페이지를 모두 확인
+        YES24 상품 페이지 HTML에서 판매지수/순위 추출
+
+        베스트셀러 모듈의 IT 모바일 순위는 parse_store가 구조화 소스로 먼저 채웁니다.
         """
-        logging.info("YES24 스크래핑 시작...")
-        yes24_data = {
-            "url": url,
-            "timestamp": datetime.now().isoformat(),
-            "sales_index": None,
-            "it_mobile_rank": None,
-            "error": None,
-        }
+        try:
+            if self.yes24_module_only:
+                # 메인 페이지에서는 판매지수만 추출 (IT 모바일 순위 보조 탐색 생략)
+                self.parse_with_fallback(
+                    "yes24",
+                    html,
+                    yes24_data,
+                    self._extract_yes24_sales,
+                    YES24_SALES_REGIONS,
+                    YES24_SALES_REQUIRED_FIELDS,
+                )
+            else:
+                # 메인 상품 페이지에서 판매지수 (모듈에서 못 찾았으면 IT 모바일 순위도) 추출
+                self.parse_with_fallback(
+                    "yes24",
+                    html,
+                    yes24_data,
+                    self._extract_yes24_page,
+                    YES24_REGIONS,
+                    YES24_REQUIRED_FIELDS,
+                )
+
+            logging.info(
+                f"YES24 데이터: 판매지수 {yes24_data['sales_index']}, IT모바일 {yes24_data['it_mobile_rank']}위"
+            )
+
+        except Exception as e:
+            yes24_data["error"] = str(e)
+            logging.error(f"YES24 스크래핑 오류: {e}")
+
+        return yes24_data
 
+    def _extract_yes24_module(self, module_html: str, yes24_data: Dict[str, Any]):
+        """베스트셀러 모듈 응답에서 IT 모바일 순위 추출"""
+        with self.timer.measure("yes24", "parse"):
+            module_text = BeautifulSoup(module_html, "html.parser").get_text()
+
+        started = time.perf_counter()
+        rank, index = YES24_MODULE_IT_PLAN.search_hit(module_text)
+        self.timer.add_tier("yes24", "module", time.perf_counter() - started)
+        if rank:
+            yes24_data["it_mobile_rank"] = int(rank)
+            yes24_data["extracted_by"]["it_mobile_rank"] = f"module/module#{index}"
+
+        if self.debug and module_text:
+            logging.debug(f"모듈 페이지 내용 일부: {module_text[:200]}")
+
+    def _extract_kyobobook_json_ld(self, html: str, kyobo_data: Dict[str, Any]):
+        """교보문고 상품 페이지에 포함된 JSON-LD에서 순위 추출 (트리 파싱 없음)"""
+        self.fill_json_ld("kyobobook", html, kyobo_data)
+
+    def _extract_yes24_sales(self, soup: BeautifulSoup, yes24_data: Dict[str, Any]):
+        """파싱된 YES24 상품 페이지 트리에서 판매지수 추출 (페이지 전체 → gd_infoBot)"""
+        self.fill_fields("yes24", soup, yes24_data, YES24_SALES_TIERS)
+
+    def _extract_yes24_page(self, soup: BeautifulSoup, yes24_data: Dict[str, Any]):
+        """파싱된 YES24 상품 페이지 트리에서 판매지수/IT 모바일 순위 추출"""
+        # 모듈에서 IT 모바일 순위를 못 찾았으면 메인 페이지에서도 시도 (보조 수단):
+        # 페이지 전체 → 베스트셀러 랭킹 섹션 클래스 → dl 태그
+        self.fill_fields("yes24", soup, yes24_data, YES24_FIELD_TIERS)
+
+        # 디버깅: 카테고리 정보가 포함된 영역 출력
+        if not yes24_data["it_mobile_rank"] and self.debug:
+            logging.debug(
+                "IT 모바일 순위를 찾을 수 없음. 카테고리 관련 텍스트 검색 중..."
+            )
+            # 'IT', '모바일', '컴퓨터' 키워드가 포함된 요소 찾기
+            keywords = ["IT", "모바일", "컴퓨터"]
+            for keyword in keywords:
+                elements = soup.find_all(text=re.compile(keyword))
+                for elem in elements[:3]:  # 처음 3개만 확인
+                    if elem and "위" in elem:
+                        logging.debug(f"  찾은 텍스트: {elem.strip()[:100]}")
+
+    def parse_aladin(self, html: str, aladin_data: Dict[str, Any]) -> Dict[str, Any]:
+        """알라딘 상품 페이지 HTML에서 순위 정보 추출"""
         try:
-            # 메인 상품 페이지에서 판매지수 추출
-            html = self.fetch_page(url)
-            if not html:
-                yes24_data["error"] = "메인 페이지를 가져올 수 없습니다"
-                return yes24_data
+            self.parse_with_fallback(
+                "aladin",
+                html,
+                aladin_data,
+                self._extract_aladin,
+                ALADIN_REGIONS,
+                ALADIN_REQUIRED_FIELDS,
+            )
 
-            soup = BeautifulSoup(html, "html.parser")
+            logging.info(
+                f"알라딘 데이터: 컴퓨터/모바일 {aladin_data['computer_weekly_rank']}위, "
+                f"대학교재 {aladin_data['textbook_rank']}위, "
+                f"Sales Point {aladin_data['sales_point']}"
+            )
 
-            # 판매지수 찾기
-            sales_patterns = [
-                r"판매지수\s*[:\s]*(\d+(?:,\d+)*)",
-                r"Sales\s*Point\s*[:\s]*(\d+(?:,\d+)*)",
-                r"판매\s*지수\s*(\d+(?:,\d+)*)",
-            ]
+        except Exception as e:
+            aladin_data["error"] = str(e)
+            logging.error(f"알라딘 스크래핑 오류: {e}")
+
+        return aladin_data
 
-            # 전체 페이지에서 판매지수 검색
-            page_text = soup.get_text()
-            for pattern in sales_patterns:
-                match = re.search(pattern, page_text, re.IGNORECASE)
-                if match:
-                    yes24_data["sales_index"] = match.group(1).replace(",", "")
+    def _extract_aladin(self, soup: BeautifulSoup, aladin_data: Dict[str, Any]):
+        """파싱된 트리에서 알라딘 순위 정보 추출"""
+        # 컴퓨터/모바일 주간 순위, 대학교재/전문서적 순위, 순위 기간(예: 2주), Sales Point:
+        # 페이지 전체 → 베스트셀러 정보 섹션
+        self.fill_fields("aladin", soup, aladin_data, ALADIN_FIELD_TIERS)
+
+    def _extract_aladin_api(self, body: str, aladin_data: Dict[str, Any]):
+        """알라딘 상품 조회 API(JSON) 응답에서 Sales Point와 베스트셀러 순위 추출"""
+        with self.timer.measure("aladin", "parse"):
+            # output=js 응답은 끝에 세미콜론이 붙을 수 있다
+            response = json.loads(body.strip().rstrip(";"))
+        items = response.get("item") or []
+        if not items:
+            if response.get("errorMessage"):
+                logging.warning(f"알라딘 상품 조회 API 오류: {response['errorMessage']}")
+            return
+
+        started = time.perf_counter()
+        item = items[0]
+        if item.get("salesPoint") is not None:
+            aladin_data["sales_point"] = str(item["salesPoint"])
+            aladin_data["extracted_by"]["sales_point"] = "api/sales_point"
+        rank_text = (item.get("subInfo") or {}).get("bestSellerRank") or ""
+        for field, plan, convert in ALADIN_API_RANK_PLANS:
+            if aladin_data[field] or not rank_text:
+                continue
+            value, index = plan.search_hit(rank_text)
+            if value:
+                aladin_data[field] = convert(value)
+                aladin_data["extracted_by"][field] = f"api/ttb_api#{index}"
+        self.timer.add_tier("aladin", "ttb_api", time.perf_counter() - started)
+
+    def fill_json_ld(self, store: str, html: str, data: Dict[str, Any]):
+        """상품 페이지 본문의 JSON-LD 블록만 읽어 비어 있는 필드 채우기"""
+        started = time.perf_counter()
+        texts = []
+        for block in JSON_LD_SCRIPT.findall(html):
+            try:
+                parsed = json.loads(block)
+            except ValueError:
+                continue
+            # 트리 경로의 json_ld 단계와 같은 텍스트로 검사
+            if isinstance(parsed, dict):
+                texts.append(str(parsed))
+
+        for field, plan, convert in JSON_LD_PLANS[store]:
+            if data[field]:
+                continue
+            for text in texts:
+                value, index = plan.search_hit(text)
+                if value:
+                    data[field] = convert(value)
+                    data["extracted_by"][field] = f"embedded/json_ld#{index}"
                     break
+        self.timer.add_tier(store, "embedded", time.perf_counter() - started)
 
-            # 판매지수가 특정 요소에 있는 경우
-            if not yes24_data["sales_index"]:
-                # gd_infoBot 클래스 내부 검색
-                info_section = soup.find("div", class_="gd_infoBot")
-                if info_section:
-                    text = info_section.get_text()
-                    match = re.search(r"판매지수\s*(\d+(?:,\d+)*)", text)
-                    if match:
-                        yes24_data["sales_index"] = match.group(1).replace(",", "")
-
-            # URL에서 상품 ID 추출하여 베스트셀러 모듈 URL 생성
-            product_id_match = re.search(r"/goods/(\d+)", url)
-            if product_id_match:
-                product_id = product_id_match.group(1)
-                module_url = f"https://www.yes24.com/Product/addModules/BestSellerRank_Book/{product_id}/?categoryNumber=001001003025009&FreePrice=N"
-
-                logging.info(f"베스트셀러 모듈 URL 확인 중: {module_url}")
-
-                # 베스트셀러 모듈 페이지에서 IT 모바일 순위 추출
-                module_html = self.fetch_page(module_url)
-                if module_html:
-                    module_soup = BeautifulSoup(module_html, "html.parser")
-                    module_text = module_soup.get_text()
-
-                    # IT 모바일 순위 패턴 - 모듈 페이지에 특화된 패턴
-                    it_patterns = [
-                        r"IT\s*모바일\s*(\d+)위",
-                        r"IT\s*모바일\s*top\d+\s*(\d+)주",  # "IT 모바일 top20 1주" 형식도 고려
-                        r"IT/모바일\s*(\d+)위",
-                        r"IT\s*/\s*모바일\s*(\d+)",
-                    ]
-
-                    for pattern in it_patterns:
-                        match = re.search(pattern, module_text)
-                        if match:
-                            rank_num = match.group(1)
-                            # 순위가 숫자인지 확인 (주차는 제외)
-                            if (
-                                rank_num.isdigit() and int(rank_num) <= 100
-                            ):  # 100위 이하는 유효한 순위로 간주
-                                yes24_data["it_mobile_rank"] = int(rank_num)
-                                break
-
-                    if self.debug and module_text:
-                        logging.debug(f"모듈 페이지 내용 일부: {module_text[:200]}")
-                else:
-                    logging.warning("베스트셀러 모듈 페이지를 가져올 수 없습니다.")
-
-            # 메인 페이지에서도 IT 모바일 순위 시도 (보조 수단)
-            if not yes24_data["it_mobile_rank"]:
-                it_patterns = [
-                    r"IT\s*모바일\s*(\d+)위",
-                    r"IT/모바일\s*(\d+)위",
-                    r"IT\s*/\s*모바일\s*(\d+)",
-                    r"컴퓨터/IT\s*(\d+)위",
-                    r"컴퓨터\s*/\s*모바일\s*(\d+)위",
-                    r"컴퓨터\s*모바일\s*(\d+)위",
-                    r"IT\s*(\d+)위",
-                    r"IT/컴퓨터\s*(\d+)위",
-                ]
+    def target_fields(self, store: str):
+        """상품 페이지까지 볼지 판단하는 목표 필드 (스트리밍 조기 종료 기준과 같음)"""
+        if store == "yes24" and self.yes24_module_only:
+            return YES24_SALES_REQUIRED_FIELDS
+        return STREAM_TARGET_FIELDS[store]
 
-                for pattern in it_patterns:
-                    match = re.search(pattern, page_text)
-                    if match:
-                        yes24_data["it_mobile_rank"] = int(match.group(1))
-                        break
+    def fill_from_source(self, store: str, endpoint, body: str, data: Dict[str, Any]) -> bool:
+        """
+        구조화 소스 하나로 비어 있는 필드 채우기
 
-                # 베스트셀러 랭킹 섹션에서 찾기
-                if not yes24_data["it_mobile_rank"]:
-                    # 여러 가능한 클래스명으로 시도
-                    rank_classes = [
-                        "gd_best",
-                        "rank_row",
-                        "cate_best",
-                        "rankRow",
-                        "gd_nameH",
-                    ]
-                    for class_name in rank_classes:
-                        rank_elem = soup.find("div", class_=class_name)
-                        if rank_elem:
-                            rank_text = rank_elem.get_text()
-                            for pattern in it_patterns:
-                                match = re.search(pattern, rank_text)
-                                if match:
-                                    yes24_data["it_mobile_rank"] = int(match.group(1))
-                                    break
-                            if yes24_data["it_mobile_rank"]:
-                                break
-
-                # 베스트셀러 정보가 있는 dl, dt, dd 태그 검색
-                if not yes24_data["it_mobile_rank"]:
-                    dl_elements = soup.find_all("dl")
-                    for dl in dl_elements:
-                        text = dl.get_text()
-                        for pattern in it_patterns:
-                            match = re.search(pattern, text)
-                            if match:
-                                yes24_data["it_mobile_rank"] = int(match.group(1))
-                                break
-                        if yes24_data["it_mobile_rank"]:
-                            break
+        Returns:
+            이 소스가 새로 채운 필드가 있으면 True
+        """
+        filled = {field for field in STORE_FIELDS[store] if data[field]}
+        try:
+            getattr(self, endpoint.extractor)(body, data)
+        except Exception as e:
+            logging.warning(f"{endpoint.label} 추출 오류: {e}")
+        return any(data[field] for field in STORE_FIELDS[store] if field not in filled)
 
-            # 디버깅: 카테고리 정보가 포함된 영역 출력
-            if not yes24_data["it_mobile_rank"] and self.debug:
-                logging.debug(
-                    "IT 모바일 순위를 찾을 수 없음. 카테고리 관련 텍스트 검색 중..."
-                )
-                # 'IT', '모바일', '컴퓨터' 키워드가 포함된 요소 찾기
-                keywords = ["IT", "모바일", "컴퓨터"]
-                for keyword in keywords:
-                    elements = soup.find_all(text=re.compile(keyword))
-                    for elem in elements[:3]:  # 처음 3개만 확인
-                        if elem and "위" in elem:
-                            logging.debug(f"  찾은 텍스트: {elem.strip()[:100]}")
+    def apply_sources(
+        self, store: str, data: Dict[str, Any], sources: Dict[str, Dict[str, Any]]
+    ) -> List[str]:
+        """
+        별도로 받은 구조화 소스(조각/API)로 필드 채우기
+
+        Returns:
+            값을 낸 소스 이름 목록
+        """
+        used = []
+        for name, source in sources.items():
+            endpoint = endpoint_by_name(store, name)
+            if endpoint is None:
+                continue
+            if not source.get("body"):
+                logging.warning(f"{endpoint.label}를 가져올 수 없습니다.")
+                continue
+            if self.fill_from_source(store, endpoint, source["body"], data):
+                used.append(name)
+        return used
+
+    def stream_plan(self, store: str):
+        """스트리밍 다운로드 중 추출에 쓸 (추출 함수, 부분 파싱 영역, 목표 필드)"""
+        if store == "kyobobook":
+            return self._extract_kyobobook, KYOBO_REGIONS, STREAM_TARGET_FIELDS[store]
+        if store == "yes24":
+            if self.yes24_module_only:
+                return self._extract_yes24_sales, YES24_SALES_REGIONS, self.target_fields(store)
+            return self._extract_yes24_page, YES24_REGIONS, self.target_fields(store)
+        if store == "aladin":
+            return self._extract_aladin, ALADIN_REGIONS, STREAM_TARGET_FIELDS[store]
+        raise ValueError(f"지원하지 않는 서점입니다: {store}")
+
+    def parse_store(
+        self,
+        store: str,
+        data: Dict[str, Any],
+        html: Optional[str] = None,
+        sources: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        구조화 소스를 먼저 적용하고, 목표 필드가 남았을 때만 알맞은 parse_* 메서드 실행
+
+        결과의 source에 값을 낸 소스를 "+"로 이어 기록합니다 (예: "bestseller_module+page").
+
+        Args:
+            store: 서점 이름
+            data: 결과 기본 구조
+            html: 상품 페이지 HTML (구조화 소스로 충분해 받지 않았으면 None)
+            sources: 별도로 받은 구조화 소스 {이름: {"url": ..., "body": ...}}
+        """
+        parsers = {
+            "kyobobook": self.parse_kyobobook,
+            "yes24": self.parse_yes24,
+            "aladin": self.parse_aladin,
+        }
+        if store not in parsers:
+            raise ValueError(f"지원하지 않는 서점입니다: {store}")
+
+        used = self.apply_sources(store, data, sources or {})
+        if html is not None:
+            used += [
+                endpoint.name
+                for endpoint in embedded_endpoints(store)
+                if self.fill_from_source(store, endpoint, html, data)
+            ]
 
+        if html is None or all(data[field] for field in self.target_fields(store)):
+            data["source"] = "+".join(used)
             logging.info(
-                f"YES24 데이터: 판매지수 {yes24_data['sales_index']}, IT모바일 {yes24_data['it_mobile_rank']}위"
+                f"{STORE_NAMES[store]} 데이터: 구조화 소스로 추출 ({data['source'] or '없음'}), "
+                f"상품 페이지 파싱 생략"
             )
+            return data
+
+        parsers[store](html, data)
+        data["source"] = "+".join(used + ["page"])
+        return data
+
+
+class StreamingExtractor:
+    """
+    iter_bytes 청크를 받으며 목표 필드가 모두 채워졌는지 확인하는 증분 추출기
+
+    순위 키워드가 들어온 뒤에만, STREAM_CHECK_CHARS 간격으로 지금까지 받은 본문을
+    순위 영역만 부분 파싱해 확인하므로 청크마다 전체를 다시 파싱하지 않습니다.
+    """
+
+    def __init__(
+        self, parser: BookRankingParser, store: str, url: str, encoding: str = "utf-8"
+    ):
+        self.parser = parser
+        self.store = store
+        self.url = url
+        self.extract, self.regions, self.targets = parser.stream_plan(store)
+        self.trigger = STREAM_TRIGGERS[store]
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self.parts: List[str] = []
+        self.length = 0
+        self.checked_length = 0
+        self.pending = False
+        self.bytes_received = 0
+        self.done = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        청크 하나 추가
 
-        except Exception as e:
-            yes24_data["error"] = str(e)
-            logging.error(f"YES24 스크래핑 오류: {e}")
+        Returns:
+            목표 필드를 모두 찾아 더 받을 필요가 없으면 True
+        """
+        self.bytes_received += len(chunk)
+        text = self.decoder.decode(chunk)
+        tail = self.parts[-1][-STREAM_TRIGGER_OVERLAP:] if self.parts else ""
+        self.parts.append(text)
+        self.length += len(text)
+
+        if self.trigger.search(tail + text):
+            self.pending = True
+        if self.pending and self.length - self.checked_length >= STREAM_CHECK_CHARS:
+            self.pending = False
+            self.checked_length = self.length
+            self.done = self.targets_filled()
+        return self.done
+
+    def text(self) -> str:
+        if len(self.parts) > 1:
+            self.parts = ["".join(self.parts)]
+        return self.parts[0] if self.parts else ""
+
+    def targets_filled(self) -> bool:
+        data = self.parser.new_store_data(self.store, self.url)
+        with self.parser.timer.measure(self.store, "stream_check"):
+            self.extract(
+                BeautifulSoup(self.text(), PARTIAL_PARSER, parse_only=self.regions), data
+            )
+        return all(data[field] for field in self.targets)
+
+    def finish(self) -> str:
+        """받은 본문 전체 (중간에 끊겼으면 끊긴 지점까지)"""
+        self.parts.append(self.decoder.decode(b"", final=True))
+        return self.text()
+
+
+class BookRankingScraper(BookRankingParser):
+    def __init__(
+        self,
+        debug=False,
+        partial_parse=True,
+        yes24_module_only=False,
+        cache_path=None,
+        stats_path=None,
+        timings_path=None,
+        archive_path=None,
+        record_dir=None,
+        replay_dir=None,
+        replay_latency=0.0,
+        replay_jitter=0.0,
+        replay_bandwidth=0.0,
+        streaming=False,
+        retry_policy=None,
+        failure_threshold=3,
+        circuit_cooldown=300.0,
+        cycle_deadline=None,
+        connect_timeout=5.0,
+        read_timeout=30.0,
+        http2=False,
+        max_connections=20,
+        max_keepalive_connections=10,
+        keepalive_expiry=30.0,
+    ):
+        """
+        스크래퍼 초기화
 
-        return yes24_data
+        Args:
+            debug (bool): 디버깅 모드 활성화 여부
+            partial_parse (bool): 순위 영역만 먼저 파싱하는 빠른 경로 사용 여부
+            yes24_module_only (bool): YES24 IT 모바일 순위를 베스트셀러 모듈에서만 읽기
+            cache_path (str): 조건부 요청/추출 결과 캐시 파일 경로 (None이면 사용 안 함)
+            stats_path (str): 추출 경로 적중 통계 파일 경로 (None이면 기본 순서로만 추출)
+            timings_path (str): 수집 주기별 단계 시간을 추가할 JSONL 파일 경로
+                (None이면 기록하지 않음, 마지막 기록은 last_timings에 남음)
+            archive_path (str): 받은 상품 페이지 원본을 보관할 SQLite 파일 경로
+                (None이면 보관하지 않음, reextract_archive.py로 재추출)
+            record_dir (str): 모든 응답을 녹화할 픽스처 디렉토리
+            replay_dir (str): 네트워크 대신 응답을 재생할 픽스처 디렉토리
+            replay_latency (float): 재생 시 응답마다 추가할 지연시간(초)
+            replay_jitter (float): 재생 지연시간에 더할 무작위 최대값(초)
+            replay_bandwidth (float): 재생 시 본문 전송 속도(bytes/s, 0이면 제한 없음)
+            streaming (bool): 상품 페이지를 스트리밍으로 받으며 순위를 찾으면 다운로드 중단
+            retry_policy (RetryPolicy): 일시적 오류 재시도 정책 (None이면 기본값)
+            failure_threshold (int): 호스트 회로를 여는 연속 실패 횟수
+            circuit_cooldown (float): 회로가 열린 호스트를 건너뛰는 시간(초)
+            cycle_deadline (float): 수집 주기(scrape_all 등) 하나에 쓸 최대 시간(초)
+                (None이면 제한 없음, 마감을 넘긴 서점은 부분 결과로 기록)
+            connect_timeout (float): 요청 연결 타임아웃(초)
+            read_timeout (float): 요청 읽기 타임아웃(초)
+            http2 (bool): HTTP/2 사용 여부 (h2 패키지 필요, 같은 호스트 요청이 연결 하나를 공유)
+            max_connections (int): 연결 풀 전체 최대 연결 수
+            max_keepalive_connections (int): 재사용을 위해 열어 둘 최대 유휴 연결 수
+            keepalive_expiry (float): 유휴 연결을 닫기 전까지 유지하는 시간(초)
+        """
+        if record_dir and replay_dir:
+            raise ValueError("record_dir와 replay_dir는 동시에 지정할 수 없습니다")
 
-    def scrape_aladin(self, url: str) -> Dict[str, Any]:
+        super().__init__(
+            debug=debug, partial_parse=partial_parse, yes24_module_only=yes24_module_only
+        )
+        self.page_cache = PageCache(cache_path) if cache_path else None
+        self.extraction_stats = ExtractionStats(stats_path) if stats_path else None
+        self.refresh_extraction_order()
+        self.timings_path = timings_path
+        self.last_timings: Optional[Dict[str, Any]] = None
+        self._cycle_started: Optional[Tuple[datetime, float]] = None
+        self.html_archive = HtmlArchive(archive_path) if archive_path else None
+        self.cycle_id: Optional[str] = None
+        self.truncated_urls = set()
+        self.record_store = FixtureStore(record_dir) if record_dir else None
+        self.replay_store = FixtureStore(replay_dir) if replay_dir else None
+        self.replay_latency = replay_latency
+        self.replay_jitter = replay_jitter
+        self.replay_bandwidth = replay_bandwidth
+        self.streaming = streaming
+        self.bytes_received = 0
+        self.stream_early_exits = 0
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.circuit_cooldown = circuit_cooldown
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self.cycle_deadline = cycle_deadline
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.deadline: Optional[Deadline] = None
+        self.store_deadlines: Dict[str, Deadline] = {}
+        self.deadline_misses = set()
+        if http2 and not HTTP2_AVAILABLE:
+            logging.warning("h2 패키지가 없어 HTTP/1.1로 요청합니다 (uv pip install \"httpx[http2]\")")
+        self.http2 = http2 and HTTP2_AVAILABLE
+        # 서점과 상품 사이에 공유하는 연결 풀 한도 (호스트별 동시 연결은 비동기
+        # 스크래퍼의 max_in_flight_per_host로 묶임)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+            "Accept-Language": "ko-KR,ko;q=0.9,en;q=0.8",
+            "Accept-Encoding": ACCEPT_ENCODING,
+            "Connection": "keep-alive",
+            "Upgrade-Insecure-Requests": "1",
+        }
+        self.client = httpx.Client(
+            headers=self.headers,
+            follow_redirects=True,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            http2=self.http2,
+            limits=self.limits,
+            transport=self.make_transport(),
+        )
+        self.results = {}
+
+    def make_transport(self, asynchronous=False):
+        """녹화/재생 모드에 맞는 httpx transport (일반 모드면 None)"""
+        if self.replay_store is not None:
+            return ReplayTransport(
+                self.replay_store,
+                self.replay_latency,
+                self.replay_jitter,
+                bandwidth=self.replay_bandwidth,
+            )
+        if self.record_store is not None:
+            # 녹화 transport가 감싸는 실제 transport에도 같은 풀 설정을 적용
+            if asynchronous:
+                return AsyncRecordingTransport(
+                    self.record_store,
+                    httpx.AsyncHTTPTransport(http2=self.http2, limits=self.limits),
+                )
+            return RecordingTransport(
+                self.record_store, httpx.HTTPTransport(http2=self.http2, limits=self.limits)
+            )
+        return None
+
+    def fetch_page(
+        self, url: str, store: Optional[str] = None, source: Optional[str] = None
+    ) -> Optional[str]:
         """
-        알라딘에서 순위 정보 추출
-        - 컴퓨터/모바일 주간 순위
-        - 대학교재/전문서적 top100 순위
-        - Sales Point
+        페이지 HTML 가져오기 (일시적 오류는 재시도)
+
+        Args:
+            url: 페이지 URL
+            store: 서점 상품 페이지면 서점 이름 (스트리밍 모드에서 조기 종료 기준)
+            source: 수신 바이트를 집계할 소스 이름 (None이면 상품 페이지는 "page")
         """
-        logging.info("알라딘 스크래핑 시작...")
-        aladin_data = {
-            "url": url,
-            "timestamp": datetime.now().isoformat(),
-            "computer_weekly_rank": None,
-            "textbook_rank": None,
-            "sales_point": None,
-            "rank_period": None,
-            "error": None,
+        deadline = self.deadline_for(url)
+        if self.past_deadline(url, deadline):
+            return None
+
+        breaker = self.circuit_breaker_for(url)
+        if not breaker.allow_request():
+            logging.warning(f"회로 차단 중이라 요청을 건너뜁니다: {redact_url(url)}")
+            return None
+
+        for attempt in range(self.retry_policy.max_retries + 1):
+            try:
+                body = self.request_page(url, store, source)
+                breaker.record_success()
+                return body
+            except Exception as e:
+                if self.past_deadline(url, deadline, e):
+                    return None
+                if not self.should_retry(url, e, attempt, breaker):
+                    return None
+                delay = self.retry_policy.delay(attempt, e)
+                if self.past_deadline(url, deadline, e, delay):
+                    return None
+                time.sleep(delay)
+        return None
+
+    def request_page(
+        self, url: str, store: Optional[str] = None, source: Optional[str] = None
+    ) -> Optional[str]:
+        """요청 한 번 실행 (스트리밍 모드의 상품 페이지는 순위를 찾는 대로 중단)"""
+        headers = self.conditional_headers(url)
+        timing = RequestTiming()
+        extractor = None
+        with self.client.stream(
+            "GET",
+            url,
+            headers=headers,
+            timeout=self.request_timeout(url),
+            extensions=timing.extensions(),
+        ) as response:
+            timing.mark_headers()
+            try:
+                if self.streaming and store and response.status_code == 200:
+                    extractor = self.new_stream_extractor(store, url, response)
+                    for chunk in response.iter_bytes():
+                        if extractor.feed(chunk):
+                            break
+                else:
+                    response.read()
+            finally:
+                self.count_download(url, response, timing, source or (store and "page"))
+
+        if extractor is None:
+            return self.read_response(url, response)
+        return self.finish_stream(url, response, extractor)
+
+    def deadline_for(self, url: str) -> Optional[Deadline]:
+        """URL이 속한 서점의 마감 (서점별 마감이 없으면 주기 마감)"""
+        return self.store_deadlines.get(store_for_url(url), self.deadline)
+
+    def request_timeout(self, url: str):
+        """마감까지 남은 시간으로 줄인 요청 타임아웃 (마감이 없으면 클라이언트 기본값)"""
+        deadline = self.deadline_for(url)
+        if deadline is None:
+            return httpx.USE_CLIENT_DEFAULT
+        return deadline.timeout(self.connect_timeout, self.read_timeout)
+
+    def past_deadline(
+        self,
+        url: str,
+        deadline: Optional[Deadline],
+        error: Optional[Exception] = None,
+        wait: float = 0.0,
+    ) -> bool:
+        """
+        마감을 넘겼거나 wait초를 기다리면 넘기는지 확인하고, 그렇다면 서점을 마감 초과로 기록
+
+        마감 때문에 줄어든 타임아웃으로 실패한 요청은 회로 차단기 실패로 세지 않습니다.
+        """
+        if deadline is None or deadline.remaining() > wait:
+            return False
+        store = store_for_url(url)
+        self.deadline_misses.add(store)
+        reason = f": {redact_url(str(error))}" if error else ""
+        logging.warning(f"⏰ 수집 기한 초과로 요청 중단 ({redact_url(url)}){reason}")
+        return True
+
+    def count_download(
+        self,
+        url: str,
+        response: httpx.Response,
+        timing: RequestTiming,
+        source: Optional[str] = None,
+    ):
+        """요청 하나의 수신 바이트와 연결/TTFB/다운로드 시간 집계 (소스별 바이트 포함)"""
+        timing.mark_finished(response)
+        self.bytes_received += response.num_bytes_downloaded
+        self.timer.add_request(
+            store_for_url(url), timing, response.num_bytes_downloaded, source
+        )
+
+    def new_stream_extractor(
+        self, store: str, url: str, response: httpx.Response
+    ) -> StreamingExtractor:
+        return StreamingExtractor(self, store, url, response.charset_encoding or "utf-8")
+
+    def finish_stream(
+        self, url: str, response: httpx.Response, extractor: StreamingExtractor
+    ) -> str:
+        """스트리밍 응답 본문 반환 (끝까지 받은 본문만 페이지 캐시에 저장)"""
+        body = extractor.finish()
+        if extractor.done:
+            self.stream_early_exits += 1
+            self.truncated_urls.add(url)
+            logging.info(
+                f"순위 정보를 찾아 다운로드 중단: {redact_url(url)} "
+                f"({extractor.bytes_received / 1024:.0f}KB 수신)"
+            )
+        elif self.page_cache is not None:
+            if self.page_cache.put_page(url, body, response.headers):
+                logging.info(f"변경 없음 (본문 해시 동일): {redact_url(url)}")
+        return body
+
+    def circuit_breaker_for(self, url: str) -> CircuitBreaker:
+        """URL 호스트의 회로 차단기 (수집 주기를 넘어 유지)"""
+        host = urlparse(url).netloc
+        if host not in self.circuit_breakers:
+            self.circuit_breakers[host] = CircuitBreaker(
+                self.failure_threshold, self.circuit_cooldown
+            )
+        return self.circuit_breakers[host]
+
+    def should_retry(
+        self, url: str, error: Exception, attempt: int, breaker: CircuitBreaker
+    ) -> bool:
+        """
+        요청 오류 처리: 재시도할지 판단하고, 마지막 실패면 로그와 회로 상태를 기록
+
+        Returns:
+            다시 요청해야 하면 True
+        """
+        retryable = self.retry_policy.is_retryable(error)
+        if retryable and attempt < self.retry_policy.max_retries:
+            logging.warning(
+                f"재시도 {attempt + 1}/{self.retry_policy.max_retries} ({redact_url(url)}): "
+                f"{redact_url(str(error))}"
+            )
+            return True
+
+        if isinstance(error, httpx.HTTPStatusError):
+            logging.error(f"HTTP 오류 ({redact_url(url)}): {error.response.status_code}")
+        else:
+            logging.error(f"페이지 가져오기 실패 ({redact_url(url)}): {redact_url(str(error))}")
+
+        if retryable:
+            breaker.record_failure()
+            if breaker.state == CircuitBreaker.OPEN:
+                logging.warning(
+                    f"{urlparse(url).netloc} 회로 열림: "
+                    f"{breaker.cooldown:.0f}초 동안 요청을 건너뜁니다"
+                )
+        else:
+            # 4xx, 본문 디코딩 오류, 리디렉션 초과 등은 호스트가 응답하고 있다는 뜻이므로
+            # 회로 상태에는 성공으로 본다 (반열림 상태의 시험 요청도 여기서 끝난다)
+            breaker.record_success()
+        return False
+
+    def circuit_breaker_states(self, urls: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """서점별 회로 차단기 상태 (결과 기록용)"""
+        return {
+            store: self.circuit_breaker_for(url).snapshot() for store, url in urls.items()
         }
 
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """캐시된 검증 헤더 (캐시를 쓰지 않으면 빈 딕셔너리)"""
+        if self.page_cache is None:
+            return {}
+        return self.page_cache.conditional_headers(url)
+
+    def read_response(self, url: str, response: httpx.Response) -> Optional[str]:
+        """응답 본문 반환 (304면 캐시된 본문, 200이면 캐시 갱신)"""
+        if response.status_code == 304 and self.page_cache is not None:
+            body = self.page_cache.get_body(url)
+            if body is not None:
+                logging.info(f"변경 없음 (304): {redact_url(url)}")
+                return body
+
+        response.raise_for_status()
+        # httpx는 자동으로 인코딩을 감지하지만, 필요시 명시적 설정
+        if response.encoding is None:
+            response.encoding = "utf-8"
+        body = response.text
+
+        if self.page_cache is not None:
+            if self.page_cache.put_page(url, body, response.headers):
+                logging.info(f"변경 없음 (본문 해시 동일): {redact_url(url)}")
+        return body
+
+    def page_bodies(self, pages: Dict[str, Any]) -> List[Optional[str]]:
+        """추출 결과를 결정하는 페이지 본문 목록 (구조화 소스와 YES24 추출 모드 포함)"""
+        bodies = [pages.get("html")]
+        sources = pages.get("sources") or {}
+        for name in sorted(sources):
+            bodies.extend([name, sources[name].get("body")])
+        if self.yes24_module_only and "bestseller_module" in sources:
+            bodies.append("module_only")
+        return bodies
+
+    def cached_result(
+        self, url: str, pages: Dict[str, Any]
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        페이지 내용이 이전과 같으면 이전 추출 결과 반환
+
+        Returns:
+            (재사용할 결과 또는 None, 새 결과를 저장할 때 쓸 content key)
+        """
+        if self.page_cache is None:
+            return None, None
+
+        content_key = self.page_cache.content_key(self.page_bodies(pages))
+        cached = self.page_cache.get_result(url, content_key)
+        if cached is not None:
+            logging.info(f"이전 추출 결과 재사용 (파싱 생략): {url}")
+            cached["timestamp"] = datetime.now().isoformat()
+        return cached, content_key
+
+    def remember_result(self, url: str, content_key: Optional[str], result: Dict[str, Any]):
+        """다음 수집에서 재사용할 수 있도록 추출 결과 저장"""
+        if self.page_cache is not None and content_key and not result.get("error"):
+            self.page_cache.put_result(url, content_key, result)
+
+    def parse_fetched(
+        self, store: str, url: str, data: Dict[str, Any], pages: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """가져온 페이지 파싱 (내용이 그대로면 이전 결과 재사용)"""
+        self.archive_pages(store, url, pages)
+        cached, content_key = self.cached_result(url, pages)
+        if cached is not None:
+            return cached
+
+        result = self.parse_store(store, data, **pages)
+        self.remember_result(url, content_key, result)
+        self.record_extraction(store, result)
+        return result
+
+    def archive_pages(self, store: str, url: str, pages: Dict[str, Any]):
+        """받은 페이지 원본을 이번 수집 주기 기록으로 보관 (보관소를 쓰지 않으면 무시)"""
+        if self.html_archive is None:
+            return
         try:
-            html = self.fetch_page(url)
-            if not html:
-                aladin_data["error"] = "페이지를 가져올 수 없습니다"
-                return aladin_data
+            self.html_archive.record_capture(
+                self.cycle_id or datetime.now().isoformat(),
+                store,
+                url,
+                pages,
+                complete=url not in self.truncated_urls,
+            )
+        except sqlite3.Error as e:
+            logging.warning(f"원본 HTML 보관 실패 ({url}): {e}")
+
+    def record_extraction(self, store: str, result: Dict[str, Any]):
+        """새로 추출한 결과의 필드별 추출 경로를 통계에 기록"""
+        if self.extraction_stats is None or result.get("error"):
+            return
+        extracted_by = result.get("extracted_by", {})
+        self.extraction_stats.record(
+            store,
+            {
+                field: extracted_by.get(field) if result.get(field) else None
+                for field in STORE_FIELDS[store]
+            },
+        )
 
-            soup = BeautifulSoup(html, "html.parser")
-            page_text = soup.get_text()
+    def refresh_extraction_order(self):
+        """누적 통계로 다음 추출의 단계/패턴 시도 순서 갱신"""
+        if self.extraction_stats is not None:
+            self.extraction_order = self.extraction_stats.order_hints()
 
-            # 컴퓨터/모바일 주간 순위
-            computer_patterns = [
-                r"컴퓨터/모바일\s*주간\s*(\d+)위",
-                r"컴퓨터\s*/\s*모바일\s*.*?(\d+)위",
-                r"IT/컴퓨터.*?주간\s*(\d+)",
-            ]
+    def save_extraction_stats(self):
+        if self.extraction_stats is None:
+            return
+        try:
+            self.extraction_stats.save()
+        except OSError as e:
+            logging.warning(f"추출 통계 저장 실패: {e}")
 
-            for pattern in computer_patterns:
-                match = re.search(pattern, page_text)
-                if match:
-                    aladin_data["computer_weekly_rank"] = int(match.group(1))
-                    break
+    def start_cycle(self, deadline: Optional[float] = None, cycle_id: Optional[str] = None):
+        """
+        수집 주기 시작: 단계 시간 누적과 마감 초기화
 
-            # 대학교재/전문서적 순위
-            textbook_patterns = [
-                r"대학교재/전문서적\s*top\s*100\s*(\d+)",
-                r"대학교재\s*/\s*전문서적.*?(\d+)위",
-                r"전문서적.*?top.*?(\d+)",
-            ]
+        Args:
+            deadline: 이번 주기에 쓸 최대 시간(초, None이면 제한 없음)
+            cycle_id: 원본 HTML 보관 기록에 쓸 주기 식별자 (결과의 scraping_date)
+        """
+        self.cycle_id = cycle_id
+        self.truncated_urls = set()
+        self.timer.reset()
+        self._cycle_started = (datetime.now(), time.perf_counter())
+        self.deadline = Deadline(deadline) if deadline else None
+        self.store_deadlines = {}
+        self.deadline_misses = set()
+
+    def begin_store(self, store: str, urls: Dict[str, str]):
+        """
+        순차 수집에서 서점 하나의 마감 지정
 
-            for pattern in textbook_patterns:
-                match = re.search(pattern, page_text, re.IGNORECASE)
-                if match:
-                    aladin_data["textbook_rank"] = int(match.group(1))
-                    break
+        남은 주기 시간을 아직 수집하지 않은 서점 수로 나눠 주므로, 앞 서점이
+        빨리 끝나면 뒤 서점이 더 긴 시간을 받습니다.
+        """
+        if self.deadline is None:
+            return
+        remaining_stores = [
+            name for name in STORE_NAMES if name in urls and name not in self.store_deadlines
+        ]
+        self.store_deadlines[store] = Deadline(
+            self.deadline.remaining() / max(len(remaining_stores), 1), parent=self.deadline
+        )
 
-            # 순위 기간 (예: 2주)
-            period_match = re.search(r"(\d+)주\s*\|", page_text)
-            if period_match:
-                aladin_data["rank_period"] = f"{period_match.group(1)}주"
+    def pause(self, seconds: float):
+        """서점 사이 요청 간격 (주기 마감까지 남은 시간보다 길게 쉬지 않음)"""
+        if self.deadline is not None:
+            seconds = min(seconds, self.deadline.remaining())
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def mark_deadline_misses(self, results: Dict[str, Any], stores: List[str]):
+        """마감을 넘긴 서점 결과를 부분 결과로 표시"""
+        missed = [store for store in stores if store in self.deadline_misses]
+        for store in missed:
+            data = results.get(store)
+            if data is None:
+                continue
+            data["partial"] = True
+            if data.get("error"):
+                data["error"] = DEADLINE_ERROR
+        if missed:
+            results["deadline_missed"] = missed
+            logging.warning(
+                f"⏰ 수집 기한({self.deadline.budget:.0f}초) 초과: "
+                f"{', '.join(STORE_NAMES[store] for store in missed)}"
+            )
 
-            # Sales Point
-            sales_patterns = [
-                r"Sales\s*Point\s*:\s*(\d+(?:,\d+)*)",
-                r"판매지수\s*:\s*(\d+(?:,\d+)*)",
-                r"Sales\s*Point\s*(\d+(?:,\d+)*)",
-            ]
+    def finish_cycle(self, mode: str, **extra) -> Dict[str, Any]:
+        """
+        수집 주기 종료: 단계 시간 레코드를 만들고 timings_path가 있으면 JSONL에 추가
 
-            for pattern in sales_patterns:
-                match = re.search(pattern, page_text, re.IGNORECASE)
-                if match:
-                    aladin_data["sales_point"] = match.group(1).replace(",", "")
-                    break
+        Args:
+            mode: 수집 방식 (sync, async, lists, batch 등)
+            **extra: 레코드에 함께 남길 값 (상품 수 등)
+        """
+        started_at, started = self._cycle_started or (datetime.now(), time.perf_counter())
+        if self.deadline is not None:
+            extra.update(
+                deadline_sec=self.deadline.budget,
+                deadline_missed=sorted(self.deadline_misses),
+            )
+        record = cycle_record(
+            self.timer, mode, started_at, time.perf_counter() - started, **extra
+        )
+        self.last_timings = record
+        if self.timings_path:
+            append_cycle_record(self.timings_path, record)
+        return record
+
+    def print_timings(self, record: Optional[Dict[str, Any]] = None):
+        """마지막 수집 주기의 서점별 단계 시간 출력"""
+        record = record or self.last_timings
+        if not record:
+            return
+        logging.info(f"⏱️ 수집 주기 단계 시간 ({record['mode']}, {record['elapsed_ms']:.0f}ms):")
+        for line in summary_lines(record):
+            logging.info(f"  {line}")
+
+    def source_plan(
+        self, store: str, url: str
+    ) -> Tuple[List[Tuple[Any, str]], bool]:
+        """
+        상품 하나에서 요청할 구조화 소스와 상품 페이지를 처음부터 함께 받을지 결정
+
+        구조화 소스로 채울 수 없는 목표 필드가 있으면 상품 페이지가 어차피 필요하므로
+        소스와 동시에 요청하고, 모두 채울 수 있으면 소스를 먼저 받아 본 뒤에 결정합니다.
+
+        Returns:
+            ([(소스, URL), ...], 상품 페이지를 동시에 요청할지)
+        """
+        endpoints = remote_endpoints(store, url)
+        for endpoint, endpoint_url in endpoints:
+            logging.info(f"{endpoint.label} URL 확인 중: {redact_url(endpoint_url)}")
+        covered = {field for endpoint, _ in endpoints for field in endpoint.fields}
+        return endpoints, not set(self.target_fields(store)) <= covered
+
+    def sources_sufficient(
+        self, store: str, url: str, sources: Dict[str, Dict[str, Any]]
+    ) -> bool:
+        """받은 구조화 소스만으로 목표 필드를 모두 채울 수 있는지 (상품 페이지 생략 판단)"""
+        probe = self.new_store_data(store, url)
+        self.apply_sources(store, probe, sources)
+        return all(probe[field] for field in self.target_fields(store))
+
+    @staticmethod
+    def store_pages(
+        data: Dict[str, Any],
+        html: Optional[str],
+        sources: Dict[str, Dict[str, Any]],
+        page_requested: bool,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        parse_store에 넘길 페이지 구성
+
+        상품 페이지를 요청했는데 받지 못했으면 data에 오류를 남기고 None을 반환합니다.
+        """
+        if page_requested and not html:
+            data["error"] = "메인 페이지를 가져올 수 없습니다" if sources else "페이지를 가져올 수 없습니다"
+            return None
+        return {"html": html, "sources": sources}
 
-            # 베스트셀러 정보 섹션에서 추가 검색
-            bestseller_section = soup.find("div", class_=re.compile("best|rank"))
-            if bestseller_section and not all(
-                [
-                    aladin_data["computer_weekly_rank"],
-                    aladin_data["textbook_rank"],
-                    aladin_data["sales_point"],
+    def fetch_store_pages(
+        self, store: str, url: str
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        서점 상품의 구조화 소스와 (필요하면) 상품 페이지 수집
+
+        Returns:
+            (결과 기본 구조, parse_store에 넘길 페이지 - 가져오지 못했으면 None)
+        """
+        logging.info(f"{STORE_NAMES[store]} 스크래핑 시작...")
+        data = self.new_store_data(store, url)
+        endpoints, page_first = self.source_plan(store, url)
+
+        html = None
+        if page_first and endpoints:
+            # 소스 URL은 상품 ID만으로 정해지므로 상품 페이지와 동시에 요청
+            with ThreadPoolExecutor(max_workers=len(endpoints)) as pool:
+                futures = [
+                    pool.submit(self.fetch_page, endpoint_url, source=endpoint.name)
+                    for endpoint, endpoint_url in endpoints
                 ]
-            ):
-                section_text = bestseller_section.get_text()
-
-                # 추가 패턴 매칭 시도
-                if not aladin_data["computer_weekly_rank"]:
-                    match = re.search(r"컴퓨터.*?(\d+)위", section_text)
-                    if match:
-                        aladin_data["computer_weekly_rank"] = int(match.group(1))
-
-                if not aladin_data["sales_point"]:
-                    match = re.search(
-                        r"(\d+(?:,\d+)*)\s*point", section_text, re.IGNORECASE
-                    )
-                    if match:
-                        aladin_data["sales_point"] = match.group(1).replace(",", "")
+                html = self.fetch_page(url, store)
+                bodies = [future.result() for future in futures]
+        else:
+            bodies = [
+                self.fetch_page(endpoint_url, source=endpoint.name)
+                for endpoint, endpoint_url in endpoints
+            ]
+            if page_first:
+                html = self.fetch_page(url, store)
+        sources = {
+            endpoint.name: {"url": endpoint_url, "body": body}
+            for (endpoint, endpoint_url), body in zip(endpoints, bodies)
+        }
 
-            logging.info(
-                f"알라딘 데이터: 컴퓨터/모바일 {aladin_data['computer_weekly_rank']}위, "
-                f"대학교재 {aladin_data['textbook_rank']}위, "
-                f"Sales Point {aladin_data['sales_point']}"
-            )
+        page_requested = page_first or not self.sources_sufficient(store, url, sources)
+        if page_requested and not page_first:
+            html = self.fetch_page(url, store)
+        return data, self.store_pages(data, html, sources, page_requested)
 
-        except Exception as e:
-            aladin_data["error"] = str(e)
-            logging.error(f"알라딘 스크래핑 오류: {e}")
+    def scrape_store(self, store: str, url: str) -> Dict[str, Any]:
+        """서점 상품 하나를 수집해 파싱"""
+        data, pages = self.fetch_store_pages(store, url)
+        if pages is None:
+            return data
+        return self.parse_fetched(store, url, data, pages)
 
-        return aladin_data
+    def scrape_kyobobook(self, url: str) -> Dict[str, Any]:
+        """
+        교보문고에서 주간베스트 순위 추출
+        - 국내 도서 순위
+        - 컴퓨터/IT 순위
+        (페이지에 포함된 JSON-LD를 먼저 확인하고, 부족하면 페이지 전체 파싱)
+        """
+        return self.scrape_store("kyobobook", url)
+
+    def scrape_yes24(self, url: str) -> Dict[str, Any]:
+        """
+        YES24에서 판매지수와 IT 모바일 순위 추출
+        베스트셀러 모듈 페이지와 메인 상품 페이지를 모두 확인
+        """
+        return self.scrape_store("yes24", url)
+
+    def scrape_aladin(self, url: str) -> Dict[str, Any]:
+        """
+        알라딘에서 순위 정보 추출
+        - 컴퓨터/모바일 주간 순위
+        - 대학교재/전문서적 top100 순위
+        - Sales Point
+        (ALADIN_TTB_KEY가 있으면 상품 조회 API를 먼저 확인하고, 부족할 때만 상품 페이지 수집)
+        """
+        return self.scrape_store("aladin", url)
 
     def scrape_all(self, urls: Dict[str, str]) -> Dict[str, Any]:
         """
@@ -487,27 +1655,104 @@ class BookRankingScraper:
             "yes24": None,
             "aladin": None,
         }
+        self.refresh_extraction_order()
+        self.start_cycle(self.cycle_deadline, results["scraping_date"])
 
         # 교보문고 스크래핑
         if "kyobobook" in urls:
+            self.begin_store("kyobobook", urls)
             results["kyobobook"] = self.scrape_kyobobook(urls["kyobobook"])
-            time.sleep(1)  # 요청 간격 두기
+            self.pause(1)  # 요청 간격 두기
 
         # YES24 스크래핑
         if "yes24" in urls:
+            self.begin_store("yes24", urls)
             results["yes24"] = self.scrape_yes24(urls["yes24"])
-            time.sleep(1)
+            self.pause(1)
 
         # 알라딘 스크래핑
         if "aladin" in urls:
+            self.begin_store("aladin", urls)
             results["aladin"] = self.scrape_aladin(urls["aladin"])
 
+        self.mark_deadline_misses(results, list(urls))
+        results["circuit_breakers"] = self.circuit_breaker_states(urls)
+        self.save_extraction_stats()
+        self.finish_cycle("sync")
         logging.info(
             f"모든 사이트 스크래핑 완료: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
         )
 
         return results
 
+    def fetch_bestseller_index(self, store: str) -> Optional[Dict[str, int]]:
+        """서점 카테고리 베스트셀러 목록으로 상품 ID → 순위 색인 생성"""
+        spec = BESTSELLER_LISTS[store]
+        bodies = []
+        for page_url in spec.page_urls():
+            body = self.fetch_page(page_url, source="bestseller_list")
+            if not body:
+                break
+            bodies.append(body)
+        return self.build_bestseller_index(store, bodies)
+
+    @staticmethod
+    def build_bestseller_index(
+        store: str, bodies: List[Optional[str]]
+    ) -> Optional[Dict[str, int]]:
+        """받은 목록 페이지로 색인 생성 (첫 페이지도 못 받았으면 None)"""
+        spec = BESTSELLER_LISTS[store]
+        if not bodies or not bodies[0]:
+            logging.error(f"{spec.name} 베스트셀러 목록을 가져올 수 없습니다")
+            return None
+        index = spec.build_index(bodies)
+        logging.info(f"{spec.name} 베스트셀러 목록: {len(index)}개 상품 색인")
+        return index
+
+    def rank_from_index(
+        self, store: str, url: str, index: Optional[Dict[str, int]]
+    ) -> Dict[str, Any]:
+        """베스트셀러 색인에서 상품 하나의 순위 결과 생성 (목록에 없으면 순위 None)"""
+        spec = BESTSELLER_LISTS[store]
+        data = self.new_store_data(store, url)
+        data["source"] = "bestseller_list"
+        if index is None:
+            data["error"] = "베스트셀러 목록을 가져올 수 없습니다"
+            return data
+
+        rank = index.get(product_id_from_url(store, url))
+        data[spec.rank_field] = rank
+        if rank is not None:
+            data.update(spec.extra_fields)
+            data["extracted_by"][spec.rank_field] = "bestseller_list"
+        return data
+
+    def list_breaker_states(self, stores: List[str]) -> Dict[str, Dict[str, Any]]:
+        """베스트셀러 목록 호스트의 서점별 회로 차단기 상태"""
+        return self.circuit_breaker_states(
+            {store: BESTSELLER_LISTS[store].page_urls()[0] for store in stores}
+        )
+
+    def scrape_all_from_lists(self, urls: Dict[str, str]) -> Dict[str, Any]:
+        """
+        상품 페이지 대신 카테고리 베스트셀러 목록으로 모든 사이트 순위 수집
+
+        Returns:
+            scrape_all과 같은 구조의 결과 (목록에 있는 순위 필드만 채워짐)
+        """
+        logging.info("베스트셀러 목록으로 순위 수집 시작")
+        results = {"scraping_date": datetime.now().isoformat()}
+        self.start_cycle(self.cycle_deadline)
+        stores = [store for store in STORE_NAMES if store in urls]
+        for store in stores:
+            self.begin_store(store, urls)
+            index = self.fetch_bestseller_index(store)
+            results[store] = self.rank_from_index(store, urls[store], index)
+        self.mark_deadline_misses(results, stores)
+        results["circuit_breakers"] = self.list_breaker_states(stores)
+        self.finish_cycle("lists")
+        return results
+
     def save_results(self, results: Dict[str, Any], filename: str = None):
         """결과를 JSON 파일로 저장"""
         if filename is None:
@@ -551,12 +1796,639 @@ class BookRankingScraper:
                 )
             else:
                 logging.error(f"📙 알라딘: ❌ 오류: {data['error']}")
+
+        for store, breaker in (results.get("circuit_breakers") or {}).items():
+            if breaker["state"] != CircuitBreaker.CLOSED:
+                logging.warning(
+                    f"⚡ {STORE_NAMES.get(store, store)}: 회로 {breaker['state']} "
+                    f"(연속 실패 {breaker['failures']}회)"
+                )
+        for store in results.get("deadline_missed") or []:
+            logging.warning(f"⏰ {STORE_NAMES.get(store, store)}: 수집 기한 초과 (부분 결과)")
         logging.info("========================================")
 
     def close(self):
         """리소스 정리"""
         if hasattr(self, "client"):
             self.client.close()
+        if self.page_cache is not None:
+            self.page_cache.close()
+        if self.html_archive is not None:
+            self.html_archive.close()
+
+
+# 프로세스 풀 워커마다 하나씩 두는 파서
+_worker_parser: Optional[BookRankingParser] = None
+
+
+def init_parse_worker(
+    debug: bool,
+    partial_parse: bool,
+    yes24_module_only: bool,
+    extraction_order: Dict[str, Dict[str, Any]],
+):
+    """파싱 워커 프로세스 초기화"""
+    global _worker_parser
+    _worker_parser = BookRankingParser(
+        debug=debug, partial_parse=partial_parse, yes24_module_only=yes24_module_only
+    )
+    _worker_parser.extraction_order = extraction_order
+
+
+def parse_in_worker(
+    store: str, data: Dict[str, Any], pages: Dict[str, Any]
+) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """
+    워커 프로세스에서 HTML 파싱/추출 실행
+
+    Returns:
+        (결과, 이번 파싱의 단계 시간 - 메인 프로세스 PhaseTimer.merge용)
+    """
+    _worker_parser.timer.reset()
+    result = _worker_parser.parse_store(store, data, **pages)
+    return result, _worker_parser.timer.snapshot()
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """정렬되지 않은 값 목록의 백분위수 (선형 보간)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class TokenBucket:
+    """
+    호스트별 요청 속도 제한용 토큰 버킷
+
+    초당 rate개의 토큰이 채워지고 최대 capacity개까지 쌓입니다.
+    요청 하나당 토큰 하나를 소비합니다.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    async def acquire(self):
+        """토큰 하나를 얻을 때까지 대기"""
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncBookRankingScraper(BookRankingScraper):
+    """
+    httpx.AsyncClient 기반 비동기 스크래퍼
+
+    서점별 요청을 동시에 보내되, 호스트마다 토큰 버킷으로 요청 속도를
+    제한하고 동시에 진행 중인 요청 수를 max_in_flight_per_host로 묶습니다.
+    """
+
+    def __init__(
+        self,
+        debug=False,
+        host_rate: float = 1.0,
+        host_burst: float = 1.0,
+        max_in_flight_per_host: int = 2,
+        parse_workers: Optional[int] = 0,
+        parse_queue_size: int = 32,
+        **kwargs,
+    ):
+        """
+        비동기 스크래퍼 초기화
+
+        Args:
+            debug (bool): 디버깅 모드 활성화 여부
+            host_rate (float): 호스트별 초당 요청 수
+            host_burst (float): 호스트별 토큰 버킷 크기 (순간 최대 요청 수)
+            max_in_flight_per_host (int): 호스트별 동시 요청 수 상한
+            parse_workers (int): 배치 모드 파싱 프로세스 수
+                (0이면 이벤트 루프에서 직접 파싱, None이면 CPU 코어 수)
+            parse_queue_size (int): fetch 단계와 parse 단계 사이 큐 크기
+            **kwargs: BookRankingScraper 옵션 (partial_parse, cache_path, replay_dir 등)
+        """
+        super().__init__(debug=debug, **kwargs)
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.max_in_flight_per_host = max_in_flight_per_host
+        self.parse_workers = os.cpu_count() if parse_workers is None else parse_workers
+        self.parse_queue_size = parse_queue_size
+        self.async_client = None
+        self._client_loop = None
+        self._host_limiters: Dict[str, TokenBucket] = {}
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.host_latencies: Dict[str, List[float]] = {}
+        self.pages_fetched = 0
+
+    async def _get_async_client(self) -> httpx.AsyncClient:
+        """현재 이벤트 루프에서 사용할 AsyncClient 반환"""
+        loop = asyncio.get_running_loop()
+        if (
+            self.async_client is None
+            or self.async_client.is_closed
+            or self._client_loop is not loop
+        ):
+            # 클라이언트와 세마포어는 이벤트 루프에 묶이므로 루프가 바뀌면 새로 만든다
+            # 이전 루프에서 aclose하지 않은 클라이언트는 연결 풀부터 닫음 (루프마다 끝날 때 aclose 권장 -
+            # 이전 루프가 이미 닫혔으면 소켓은 가비지 컬렉션 때 닫힘)
+            if self.async_client is not None and not self.async_client.is_closed:
+                try:
+                    await self.async_client.aclose()
+                except Exception as e:
+                    logging.warning(f"이전 이벤트 루프의 AsyncClient를 정상적으로 닫지 못했습니다: {e}")
+            self.async_client = httpx.AsyncClient(
+                headers=self.headers,
+                follow_redirects=True,
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                http2=self.http2,
+                limits=self.limits,
+                transport=self.make_transport(asynchronous=True),
+            )
+            self._client_loop = loop
+            self._host_semaphores = {}
+        return self.async_client
+
+    def _get_host_limiter(self, host: str) -> TokenBucket:
+        if host not in self._host_limiters:
+            self._host_limiters[host] = TokenBucket(self.host_rate, self.host_burst)
+        return self._host_limiters[host]
+
+    def _get_host_semaphore(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(
+                self.max_in_flight_per_host
+            )
+        return self._host_semaphores[host]
+
+    async def fetch_page_async(
+        self, url: str, store: Optional[str] = None, source: Optional[str] = None
+    ) -> Optional[str]:
+        """페이지 HTML 비동기로 가져오기 (store, source는 fetch_page와 같은 의미)"""
+        client = await self._get_async_client()
+        host = urlparse(url).netloc
+
+        deadline = self.deadline_for(url)
+        if self.past_deadline(url, deadline):
+            return None
+
+        breaker = self.circuit_breaker_for(url)
+        if not breaker.allow_request():
+            logging.warning(f"회로 차단 중이라 요청을 건너뜁니다: {redact_url(url)}")
+            return None
+
+        for attempt in range(self.retry_policy.max_retries + 1):
+            try:
+                async with self._get_host_semaphore(host):
+                    await self._get_host_limiter(host).acquire()
+                    started = time.perf_counter()
+                    try:
+                        body = await self.request_page_async(client, url, store, source)
+                    finally:
+                        self.pages_fetched += 1
+                        self.host_latencies.setdefault(host, []).append(
+                            time.perf_counter() - started
+                        )
+                breaker.record_success()
+                return body
+            except Exception as e:
+                if self.past_deadline(url, deadline, e):
+                    return None
+                if not self.should_retry(url, e, attempt, breaker):
+                    return None
+                delay = self.retry_policy.delay(attempt, e)
+                if self.past_deadline(url, deadline, e, delay):
+                    return None
+                # 대기 중에는 호스트 동시 요청 슬롯을 잡고 있지 않는다
+                await asyncio.sleep(delay)
+        return None
+
+    async def request_page_async(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        store: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> Optional[str]:
+        """request_page의 비동기 버전"""
+        headers = self.conditional_headers(url)
+        timing = RequestTiming()
+        extractor = None
+        async with client.stream(
+            "GET",
+            url,
+            headers=headers,
+            timeout=self.request_timeout(url),
+            extensions=timing.extensions(asynchronous=True),
+        ) as response:
+            timing.mark_headers()
+            try:
+                if self.streaming and store and response.status_code == 200:
+                    extractor = self.new_stream_extractor(store, url, response)
+                    async for chunk in response.aiter_bytes():
+                        if extractor.feed(chunk):
+                            break
+                else:
+                    await response.aread()
+            finally:
+                self.count_download(url, response, timing, source or (store and "page"))
+
+        if extractor is None:
+            return self.read_response(url, response)
+        return self.finish_stream(url, response, extractor)
+
+    async def fetch_store_pages_async(
+        self, store: str, url: str
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        서점 상품 페이지 수집 (fetch 단계)
+
+        Returns:
+            (결과 기본 구조, parse_store에 넘길 페이지 - 가져오지 못했으면 None)
+        """
+        logging.info(f"{STORE_NAMES[store]} 스크래핑 시작...")
+        data = self.new_store_data(store, url)
+        endpoints, page_first = self.source_plan(store, url)
+
+        requests = [
+            self.fetch_page_async(endpoint_url, source=endpoint.name)
+            for endpoint, endpoint_url in endpoints
+        ]
+        if page_first:
+            # 상품 페이지가 어차피 필요하면 구조화 소스와 동시에 요청
+            *bodies, html = await asyncio.gather(
+                *requests, self.fetch_page_async(url, store)
+            )
+        else:
+            bodies = await asyncio.gather(*requests)
+            html = None
+        sources = {
+            endpoint.name: {"url": endpoint_url, "body": body}
+            for (endpoint, endpoint_url), body in zip(endpoints, bodies)
+        }
+
+        page_requested = page_first or not self.sources_sufficient(store, url, sources)
+        if page_requested and not page_first:
+            html = await self.fetch_page_async(url, store)
+        return data, self.store_pages(data, html, sources, page_requested)
+
+    async def scrape_store_async(self, store: str, url: str) -> Dict[str, Any]:
+        """서점 상품 페이지를 가져와 이벤트 루프에서 바로 파싱"""
+        data, pages = await self.fetch_store_pages_async(store, url)
+        if pages is None:
+            return data
+        return self.parse_fetched(store, url, data, pages)
+
+    async def scrape_kyobobook_async(self, url: str) -> Dict[str, Any]:
+        """교보문고 비동기 스크래핑"""
+        return await self.scrape_store_async("kyobobook", url)
+
+    async def scrape_yes24_async(self, url: str) -> Dict[str, Any]:
+        """YES24 비동기 스크래핑"""
+        return await self.scrape_store_async("yes24", url)
+
+    async def scrape_aladin_async(self, url: str) -> Dict[str, Any]:
+        """알라딘 비동기 스크래핑"""
+        return await self.scrape_store_async("aladin", url)
+
+    async def scrape_all_async(self, urls: Dict[str, str]) -> Dict[str, Any]:
+        """
+        모든 사이트를 동시에 스크래핑
+
+        Args:
+            urls: {'kyobobook': url, 'yes24': url, 'aladin': url}
+
+        Returns:
+            scrape_all과 같은 구조의 스크래핑 결과
+        """
+        logging.info(
+            f"모든 사이트 비동기 스크래핑 시작: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        )
+
+        results = {
+            "scraping_date": datetime.now().isoformat(),
+            "kyobobook": None,
+            "yes24": None,
+            "aladin": None,
+        }
+
+        self.refresh_extraction_order()
+        self.start_cycle(self.cycle_deadline, results["scraping_date"])
+        stores = [store for store in STORE_NAMES if store in urls]
+        store_results = await self.gather_stores(
+            {store: self.scrape_store_async(store, urls[store]) for store in stores}
+        )
+        for store in stores:
+            results[store] = store_results[store]
+            if results[store] is None:
+                # 마감까지 끝나지 않아 취소된 서점
+                results[store] = self.new_store_data(store, urls[store])
+                results[store]["error"] = DEADLINE_ERROR
+        self.mark_deadline_misses(results, stores)
+        results["circuit_breakers"] = self.circuit_breaker_states(urls)
+        self.save_extraction_stats()
+        self.finish_cycle("async")
+
+        logging.info(
+            f"모든 사이트 비동기 스크래핑 완료: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        )
+
+        return results
+
+    async def gather_stores(self, coroutines: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        서점별 작업을 동시에 실행하고 서점 → 결과 반환
+
+        주기 마감이 있으면 마감까지 끝나지 않은 서점 작업을 취소하고 결과를 None으로 둡니다.
+        """
+        tasks = {store: asyncio.create_task(coro) for store, coro in coroutines.items()}
+        if not tasks:
+            return {}
+        timeout = self.deadline.remaining() if self.deadline is not None else None
+        _, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        results = {}
+        for store, task in tasks.items():
+            if task in pending:
+                self.deadline_misses.add(store)
+                logging.warning(f"⏰ 수집 기한 초과로 {STORE_NAMES[store]} 수집 취소")
+                results[store] = None
+            else:
+                results[store] = task.result()
+        return results
+
+    async def fetch_bestseller_index_async(self, store: str) -> Optional[Dict[str, int]]:
+        """서점 베스트셀러 목록 페이지를 동시에 받아 색인 생성"""
+        bodies = await asyncio.gather(
+            *(
+                self.fetch_page_async(page_url, source="bestseller_list")
+                for page_url in BESTSELLER_LISTS[store].page_urls()
+            )
+        )
+        return self.build_bestseller_index(store, list(bodies))
+
+    async def fetch_bestseller_indexes_async(
+        self, stores: List[str]
+    ) -> Dict[str, Optional[Dict[str, int]]]:
+        """여러 서점의 베스트셀러 색인을 동시에 생성 (마감을 넘긴 서점은 None)"""
+        return await self.gather_stores(
+            {store: self.fetch_bestseller_index_async(store) for store in stores}
+        )
+
+    async def scrape_all_from_lists_async(self, urls: Dict[str, str]) -> Dict[str, Any]:
+        """scrape_all_from_lists의 비동기 버전 (서점별 목록을 동시에 요청)"""
+        logging.info("베스트셀러 목록으로 순위 비동기 수집 시작")
+        results = {"scraping_date": datetime.now().isoformat()}
+        self.start_cycle(self.cycle_deadline)
+        stores = [store for store in STORE_NAMES if store in urls]
+        indexes = await self.fetch_bestseller_indexes_async(stores)
+        for store in stores:
+            results[store] = self.rank_from_index(store, urls[store], indexes[store])
+        self.mark_deadline_misses(results, stores)
+        results["circuit_breakers"] = self.list_breaker_states(stores)
+        self.finish_cycle("async_lists")
+        return results
+
+    @staticmethod
+    def unsupported_store_result(store: str, product_id: str) -> Dict[str, Any]:
+        return {
+            "store": store,
+            "product_id": product_id,
+            "error": f"지원하지 않는 서점입니다: {store}",
+        }
+
+    async def scrape_product_async(self, store: str, product_id: str) -> Dict[str, Any]:
+        """서점과 상품 ID로 한 권의 도서 정보를 스크래핑"""
+        if store not in PRODUCT_URL_TEMPLATES:
+            return self.unsupported_store_result(store, product_id)
+
+        url = PRODUCT_URL_TEMPLATES[store].format(product_id=product_id)
+        data = await self.scrape_store_async(store, url)
+        data["store"] = store
+        data["product_id"] = product_id
+        return data
+
+    async def scrape_products_pipelined(
+        self, products: List[Tuple[str, str]], workers: int
+    ) -> List[Dict[str, Any]]:
+        """
+        fetch 단계와 parse 단계를 크기 제한 큐로 연결해 여러 도서를 스크래핑
+
+        fetch 단계는 이벤트 루프에서 페이지를 받아 큐에 넣고, parse 단계는
+        큐에서 꺼낸 HTML을 ProcessPoolExecutor 워커에서 파싱합니다.
+        큐가 가득 차면 fetch 단계가 기다리므로 메모리에 쌓이는 HTML이 제한됩니다.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.parse_queue_size)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(products)
+
+        async def fetch_stage(index: int, store: str, product_id: str):
+            if store not in PRODUCT_URL_TEMPLATES:
+                results[index] = self.unsupported_store_result(store, product_id)
+                return
+            url = PRODUCT_URL_TEMPLATES[store].format(product_id=product_id)
+            data, pages = await self.fetch_store_pages_async(store, url)
+            await queue.put((index, store, product_id, url, data, pages))
+
+        async def parse_stage(pool: ProcessPoolExecutor):
+            while True:
+                index, store, product_id, url, data, pages = await queue.get()
+                try:
+                    if pages is not None:
+                        self.archive_pages(store, url, pages)
+                        cached, content_key = self.cached_result(url, pages)
+                        if cached is not None:
+                            data = cached
+                        else:
+                            data, timings = await loop.run_in_executor(
+                                pool, parse_in_worker, store, data, pages
+                            )
+                            self.timer.merge(timings)
+                            self.remember_result(url, content_key, data)
+                            self.record_extraction(store, data)
+                except Exception as e:
+                    data["error"] = str(e)
+                    logging.error(f"파싱 워커 오류 ({url}): {e}")
+                finally:
+                    data["store"] = store
+                    data["product_id"] = product_id
+                    results[index] = data
+                    queue.task_done()
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_parse_worker,
+            initargs=(
+                self.debug,
+                self.partial_parse,
+                self.yes24_module_only,
+                self.extraction_order,
+            ),
+        ) as pool:
+            parsers = [asyncio.create_task(parse_stage(pool)) for _ in range(workers)]
+            try:
+                await asyncio.gather(
+                    *(
+                        fetch_stage(index, store, product_id)
+                        for index, (store, product_id) in enumerate(products)
+                    )
+                )
+                await queue.join()
+            finally:
+                for task in parsers:
+                    task.cancel()
+                await asyncio.gather(*parsers, return_exceptions=True)
+
+        return results
+
+    async def scrape_products_from_lists(
+        self, products: List[Tuple[str, str]]
+    ) -> List[Dict[str, Any]]:
+        """서점별 베스트셀러 목록 색인 하나로 모든 도서의 순위 조회"""
+        stores = [store for store in STORE_NAMES if any(p[0] == store for p in products)]
+        indexes = await self.fetch_bestseller_indexes_async(stores)
+
+        results = []
+        for store, product_id in products:
+            if store not in PRODUCT_URL_TEMPLATES:
+                results.append(self.unsupported_store_result(store, product_id))
+                continue
+            url = PRODUCT_URL_TEMPLATES[store].format(product_id=product_id)
+            data = self.rank_from_index(store, url, indexes[store])
+            data["store"] = store
+            data["product_id"] = product_id
+            results.append(data)
+        return results
+
+    async def scrape_products_async(
+        self, products: List[Tuple[str, str]], from_lists: bool = False
+    ) -> Dict[str, Any]:
+        """
+        여러 도서를 한 번에 스크래핑 (배치 모드)
+
+        Args:
+            products: [(서점, 상품 ID), ...] 목록
+            from_lists: 상품 페이지 대신 카테고리 베스트셀러 목록에서 순위 조회
+
+        Returns:
+            {'scraping_date': ..., 'products': [결과, ...], 'report': 실행 리포트}
+        """
+        logging.info(f"배치 스크래핑 시작: {len(products)}개 상품")
+
+        self.host_latencies = {}
+        self.pages_fetched = 0
+        self.bytes_received = 0
+        self.stream_early_exits = 0
+        scraping_date = datetime.now().isoformat()
+        started = time.perf_counter()
+        self.refresh_extraction_order()
+        self.start_cycle(cycle_id=scraping_date)
+
+        if from_lists:
+            product_results = await self.scrape_products_from_lists(products)
+        elif self.parse_workers:
+            product_results = await self.scrape_products_pipelined(
+                products, self.parse_workers
+            )
+        else:
+            product_results = await asyncio.gather(
+                *(
+                    self.scrape_product_async(store, product_id)
+                    for store, product_id in products
+                )
+            )
+
+        elapsed = time.perf_counter() - started
+        self.save_extraction_stats()
+        self.finish_cycle(
+            "batch_lists" if from_lists else "batch", products=len(products)
+        )
+        report = self.build_batch_report(len(products), elapsed)
+        logging.info(
+            f"배치 스크래핑 완료: {report['pages']}페이지, "
+            f"{report['pages_per_sec']:.2f} pages/s"
+        )
+
+        return {
+            "scraping_date": scraping_date,
+            "products": list(product_results),
+            "report": report,
+        }
+
+    def build_batch_report(self, product_count: int, elapsed: float) -> Dict[str, Any]:
+        """배치 실행 처리량과 호스트별 지연시간 백분위수 집계"""
+        hosts = {}
+        for host, latencies in self.host_latencies.items():
+            hosts[host] = {
+                "requests": len(latencies),
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p90_ms": percentile(latencies, 90) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+                "max_ms": max(latencies) * 1000,
+            }
+
+        return {
+            "products": product_count,
+            "pages": self.pages_fetched,
+            "elapsed_sec": elapsed,
+            "pages_per_sec": self.pages_fetched / elapsed if elapsed > 0 else 0.0,
+            "parse_workers": self.parse_workers,
+            "bytes_received": self.bytes_received,
+            "stream_early_exits": self.stream_early_exits,
+            "hosts": hosts,
+            "timings": self.last_timings,
+            "connections": (self.last_timings or {}).get("connections"),
+            "circuit_breakers": {
+                host: breaker.snapshot()
+                for host, breaker in self.circuit_breakers.items()
+            },
+        }
+
+    def print_batch_report(self, report: Dict[str, Any]):
+        """배치 실행 리포트 출력"""
+        logging.info("========== 🚀 배치 스크래핑 리포트 ==========")
+        logging.info(
+            f"상품 {report['products']}개, 페이지 {report['pages']}개, "
+            f"{report['elapsed_sec']:.1f}초 ({report['pages_per_sec']:.2f} pages/s), "
+            f"수신 {report['bytes_received'] / 1024:.0f}KB "
+            f"(스트리밍 조기 종료 {report['stream_early_exits']}건)"
+        )
+        for host, stats in report["hosts"].items():
+            logging.info(
+                f"  {host}: {stats['requests']}건, "
+                f"p50 {stats['p50_ms']:.0f}ms, p90 {stats['p90_ms']:.0f}ms, "
+                f"p99 {stats['p99_ms']:.0f}ms, max {stats['max_ms']:.0f}ms"
+            )
+        if report.get("timings"):
+            for line in summary_lines(report["timings"]):
+                logging.info(f"  ⏱️ {line}")
+        for host, breaker in report.get("circuit_breakers", {}).items():
+            if breaker["state"] != CircuitBreaker.CLOSED:
+                logging.warning(f"  ⚡ {host}: 회로 {breaker['state']}")
+        logging.info("========================================")
+
+    async def aclose(self):
+        """비동기 리소스 정리"""
+        if self.async_client is not None:
+            await self.async_client.aclose()
+            self.async_client = None
 
 
 # 사용 예시
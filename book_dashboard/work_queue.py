@@ -0,0 +1,449 @@
+"""
+SQLite 작업 큐 (만료 시간이 있는 임대)
+book_rankings와 같은 데이터베이스의 scrape_tasks 테이블에 (서점, 상품 ID) 수집 작업을 두고,
+여러 모니터 프로세스/컨테이너가 작업을 임대해 상품 목록을 나눠 수집합니다.
+
+임대:
+    작업자는 수집할 차례(next_run)가 된 작업을 BEGIN IMMEDIATE 트랜잭션 안에서 골라
+    lease_owner/lease_expires를 기록합니다. 같은 작업을 두 작업자가 동시에 가져가지 않습니다.
+    작업자가 죽어 임대가 만료되면 다른 작업자가 그 작업을 이어받습니다.
+    임대가 만료된 뒤 끝난 작업(이미 다른 작업자가 가져간 작업)의 결과는 버립니다.
+
+수집 간격:
+    적응형 스케줄(adaptive_schedule.py)을 주면 작업을 마칠 때마다 그 도서·서점의 최근 순위 변동성으로
+    다음 간격(adaptive_interval_sec)을 정합니다. interval_sec은 기록이 부족할 때의 간격입니다.
+
+작업자 통계:
+    queue_workers 테이블에 작업자별 처리 건수와 수집에 쓴 시간을 누적해,
+    작업자를 늘렸을 때 전체 처리량이 어떻게 늘어나는지 비교할 수 있습니다.
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import observations
+from storage import open_storage
+
+
+def default_worker_id() -> str:
+    """호스트 이름(컨테이너 ID)과 프로세스 ID로 만든 작업자 ID"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    def __init__(
+        self,
+        db_path: str,
+        worker_id: Optional[str] = None,
+        lease_seconds: float = 600.0,
+        schedule=None,
+    ):
+        """
+        Args:
+            db_path: book_rankings가 있는 데이터베이스 경로
+            worker_id: 임대 기록에 남길 작업자 ID (None이면 호스트 이름-PID)
+            lease_seconds: 임대 유지 시간(초) - 작업 묶음 하나를 수집하는 시간보다 길어야 함
+            schedule: adaptive_schedule.AdaptiveSchedule (None이면 항상 interval_sec 간격)
+        """
+        self.db_path = db_path
+        self.storage = open_storage(db_path)
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.schedule = schedule
+        self.init_database()
+
+    def init_database(self):
+        """작업 큐 테이블 생성"""
+        with self.storage.write() as conn:
+            observations.create_tables(conn)
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS scrape_tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                store TEXT NOT NULL,
+                product_id TEXT NOT NULL,
+                interval_sec REAL NOT NULL,  -- 수집 간격 (적응형이면 기록이 부족할 때의 간격)
+                adaptive_interval_sec REAL,  -- 적응형 스케줄로 정한 현재 간격
+                next_run REAL NOT NULL,  -- 다음 수집 시각 (time.time 기준)
+                lease_owner TEXT,  -- 임대한 작업자 ID
+                lease_expires REAL,  -- 임대 만료 시각 (time.time 기준)
+                attempts INTEGER NOT NULL DEFAULT 0,  -- 마지막 완료 이후 임대 횟수
+                last_finished REAL,
+                last_error TEXT,
+                last_result TEXT,  -- 마지막 수집 결과 JSON
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (store, product_id)
+            )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(scrape_tasks)")}
+            if "adaptive_interval_sec" not in columns:
+                conn.execute("ALTER TABLE scrape_tasks ADD COLUMN adaptive_interval_sec REAL")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_scrape_tasks_next_run ON scrape_tasks(next_run)"
+            )
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS scrape_task_results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id INTEGER NOT NULL,
+                store TEXT NOT NULL,
+                product_id TEXT NOT NULL,
+                worker_id TEXT NOT NULL,
+                finished_at DATETIME NOT NULL,
+                error TEXT,
+                result TEXT  -- 수집 결과 JSON
+            )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_scrape_task_results_product "
+                "ON scrape_task_results(store, product_id, finished_at)"
+            )
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS queue_workers (
+                worker_id TEXT PRIMARY KEY,
+                started_at REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                batches INTEGER NOT NULL DEFAULT 0,
+                completed INTEGER NOT NULL DEFAULT 0,
+                failed INTEGER NOT NULL DEFAULT 0,
+                lost INTEGER NOT NULL DEFAULT 0,  -- 임대가 만료돼 버린 결과
+                taken_over INTEGER NOT NULL DEFAULT 0,  -- 만료된 임대를 이어받은 작업
+                busy_sec REAL NOT NULL DEFAULT 0  -- 수집에 쓴 시간
+            )
+            """)
+
+    def enqueue(self, products: List[Tuple[str, ...]], interval: float) -> int:
+        """
+        수집 작업 추가 (이미 있는 작업은 수집 간격만 바꿈)
+
+        Args:
+            products: (서점, 상품 ID) 또는 (서점, 상품 ID, 도서 이름) 목록 -
+                같은 도서 이름의 서점별 상품은 관측값에서 한 도서로 묶임
+            interval: 수집 간격(초)
+
+        Returns:
+            새로 추가된 작업 수
+        """
+        now = time.time()
+        with self.storage.write() as conn:
+            for store, product_id, *book in products:
+                if book:
+                    observations.ensure_book(
+                        conn, book[0], title=book[0], products=[(store, product_id)]
+                    )
+            before = conn.execute("SELECT COUNT(*) FROM scrape_tasks").fetchone()[0]
+            conn.executemany(
+                """
+            INSERT INTO scrape_tasks (store, product_id, interval_sec, next_run)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (store, product_id) DO UPDATE SET interval_sec = excluded.interval_sec
+            """,
+                [(store, str(product_id), interval, now) for store, product_id, *_ in products],
+            )
+            after = conn.execute("SELECT COUNT(*) FROM scrape_tasks").fetchone()[0]
+        return after - before
+
+    def lease(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        수집할 차례가 된 작업을 최대 limit개 임대
+
+        아직 임대되지 않았거나 임대가 만료된 작업만 가져옵니다.
+
+        Returns:
+            [{"id", "store", "product_id", "attempts", "taken_over"}, ...]
+        """
+        now = time.time()
+        with self.storage.write() as conn:
+            rows = conn.execute(
+                """
+            SELECT id, store, product_id, attempts, lease_owner FROM scrape_tasks
+            WHERE next_run <= ? AND (lease_owner IS NULL OR lease_expires <= ?)
+            ORDER BY next_run LIMIT ?
+            """,
+                (now, now, limit),
+            ).fetchall()
+            conn.executemany(
+                """
+            UPDATE scrape_tasks SET lease_owner = ?, lease_expires = ?, attempts = attempts + 1
+            WHERE id = ?
+            """,
+                [(self.worker_id, now + self.lease_seconds, row[0]) for row in rows],
+            )
+            taken_over = sum(1 for row in rows if row[4] is not None)
+            self.update_worker(conn, now, taken_over=taken_over)
+
+        tasks = []
+        for task_id, store, product_id, attempts, previous_owner in rows:
+            if previous_owner is not None:
+                logging.warning(
+                    f"🔁 {store}/{product_id}: {previous_owner}의 임대가 만료돼 이어받습니다 "
+                    f"(시도 {attempts + 1}회째)"
+                )
+            tasks.append(
+                {
+                    "id": task_id,
+                    "store": store,
+                    "product_id": product_id,
+                    "attempts": attempts + 1,
+                    "taken_over": previous_owner is not None,
+                }
+            )
+        return tasks
+
+    def complete(
+        self,
+        tasks: List[Dict[str, Any]],
+        results: List[Dict[str, Any]],
+        busy_sec: float,
+    ):
+        """
+        임대한 작업의 수집 결과 기록 후 임대 해제, 다음 수집 시각 지정
+
+        임대가 만료돼 다른 작업자에게 넘어간 작업은 결과를 버립니다.
+        """
+        with self.storage.write() as conn:
+            self.record_completions(conn, [self.completion(tasks, results, busy_sec)])
+
+    def completion(
+        self,
+        tasks: List[Dict[str, Any]],
+        results: List[Dict[str, Any]],
+        busy_sec: float,
+    ) -> Dict[str, Any]:
+        """작업 묶음 하나의 완료 기록 - 쓰기 버퍼에 모았다가 record_completions로 저장 (JSON 값만)"""
+        return {
+            "kind": "queue",
+            "worker_id": self.worker_id,
+            "finished": time.time(),
+            "finished_at": datetime.now().isoformat(" "),
+            "busy_sec": busy_sec,
+            "tasks": [
+                {"id": task["id"], "store": task["store"], "product_id": task["product_id"]}
+                for task in tasks
+            ],
+            "results": results,
+        }
+
+    def record_completions(self, conn: sqlite3.Connection, completions: List[Dict[str, Any]]):
+        """
+        완료 기록 저장 (열린 쓰기 트랜잭션 안에서 호출)
+
+        임대 확인은 작업마다 rowcount가 필요해 따로 하고, 결과와 관측값은 전체를 한 번에 저장합니다.
+        임대는 완료 기록을 만든 작업자 ID로 확인하므로 재시작 후 스풀에서 복구한 기록도
+        그사이 다른 작업자가 가져가지 않은 작업이면 그대로 반영됩니다.
+        """
+        result_rows = []
+        observation_rows = []
+        # 적응형 간격을 다시 정할 작업 (작업 ID, 서점, 도서 ID, 완료 시각)
+        finished_tasks = []
+        for completion in completions:
+            worker_id = completion["worker_id"]
+            now = completion["finished"]
+            finished_at = completion["finished_at"]
+            completed = failed = lost = 0
+            for task, result in zip(completion["tasks"], completion["results"]):
+                error = result.get("error")
+                result_json = json.dumps(result, ensure_ascii=False)
+                updated = conn.execute(
+                    """
+                UPDATE scrape_tasks SET
+                    lease_owner = NULL, lease_expires = NULL, attempts = 0,
+                    next_run = ? + interval_sec, last_finished = ?,
+                    last_error = ?, last_result = ?
+                WHERE id = ? AND lease_owner = ?
+                """,
+                    (now, now, error, result_json, task["id"], worker_id),
+                ).rowcount
+                if not updated:
+                    lost += 1
+                    logging.warning(
+                        f"⌛ {task['store']}/{task['product_id']}: 임대가 만료돼 결과를 버립니다"
+                    )
+                    continue
+                result_rows.append(
+                    (
+                        task["id"],
+                        task["store"],
+                        task["product_id"],
+                        worker_id,
+                        finished_at,
+                        error,
+                        result_json,
+                    )
+                )
+                book_id = observations.book_for_product(conn, task["store"], task["product_id"])
+                observation_rows.extend(
+                    observations.store_rows(book_id, task["store"], result, finished_at)
+                )
+                finished_tasks.append((task["id"], task["store"], book_id, now))
+                if error:
+                    failed += 1
+                else:
+                    completed += 1
+            self.update_worker(
+                conn,
+                now,
+                worker_id=worker_id,
+                batches=1,
+                completed=completed,
+                failed=failed,
+                lost=lost,
+                busy_sec=completion["busy_sec"],
+            )
+            logging.info(
+                f"📥 작업 {len(completion['tasks'])}개 완료 기록: 성공 {completed}, 실패 {failed}"
+                + (f", 임대 만료 {lost}" if lost else "")
+            )
+        conn.executemany(
+            """
+        INSERT INTO scrape_task_results
+            (task_id, store, product_id, worker_id, finished_at, error, result)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+            result_rows,
+        )
+        observations.record_rows(conn, observation_rows)
+        if self.schedule is not None:
+            # 방금 저장한 관측값까지 포함한 변동성으로 다음 수집 시각을 다시 정함
+            self.schedule_tasks(conn, finished_tasks)
+
+    def schedule_tasks(self, conn: sqlite3.Connection, finished_tasks: List[Tuple[Any, ...]]):
+        """마친 작업의 도서·서점별 적응형 간격과 다음 수집 시각 (열린 쓰기 트랜잭션 안에서 호출)"""
+        updates = []
+        for task_id, store, book_id, finished in finished_tasks:
+            default, current = conn.execute(
+                "SELECT interval_sec, adaptive_interval_sec FROM scrape_tasks WHERE id = ?",
+                (task_id,),
+            ).fetchone()
+            interval = self.schedule.interval_for(
+                store, book_id, current=current, default=default, conn=conn
+            )
+            updates.append((interval, finished + interval, task_id))
+        conn.executemany(
+            "UPDATE scrape_tasks SET adaptive_interval_sec = ?, next_run = ? WHERE id = ?",
+            updates,
+        )
+
+    def release(self, tasks: List[Dict[str, Any]]):
+        """끝내지 못한 작업의 임대를 바로 해제 (종료 시 다른 작업자가 만료를 기다리지 않도록)"""
+        if not tasks:
+            return
+        with self.storage.write() as conn:
+            conn.executemany(
+                "UPDATE scrape_tasks SET lease_owner = NULL, lease_expires = NULL "
+                "WHERE id = ? AND lease_owner = ?",
+                [(task["id"], self.worker_id) for task in tasks],
+            )
+        logging.info(f"작업 {len(tasks)}개 임대 해제")
+
+    def update_worker(
+        self, conn: sqlite3.Connection, now: float, worker_id: Optional[str] = None, **counts
+    ):
+        """작업자 통계 누적 (열린 트랜잭션 안에서 호출, worker_id가 없으면 이 작업자)"""
+        worker_id = worker_id or self.worker_id
+        conn.execute(
+            "INSERT INTO queue_workers (worker_id, started_at, last_seen) VALUES (?, ?, ?) "
+            "ON CONFLICT (worker_id) DO UPDATE SET last_seen = excluded.last_seen",
+            (worker_id, now, now),
+        )
+        if counts:
+            conn.execute(
+                f"UPDATE queue_workers SET "
+                f"{', '.join(f'{name} = {name} + ?' for name in counts)} WHERE worker_id = ?",
+                (*counts.values(), worker_id),
+            )
+
+    def next_wakeup(self, poll_interval: float) -> float:
+        """다음에 임대할 작업이 생기는 시각 (최대 poll_interval초 뒤 - 다른 작업자가 추가한 작업 확인)"""
+        now = time.time()
+        with self.storage.read() as conn:
+            row = conn.execute(
+                """
+            SELECT MIN(CASE WHEN lease_owner IS NULL THEN next_run
+                            ELSE MAX(next_run, lease_expires) END)
+            FROM scrape_tasks
+            """
+            ).fetchone()
+        if row[0] is None:
+            return now + poll_interval
+        return min(max(row[0], now), now + poll_interval)
+
+    def stats(self, active_within: float = 3600.0) -> Dict[str, Any]:
+        """
+        큐 상태와 작업자별 처리량
+
+        Args:
+            active_within: 이 시간(초) 안에 활동한 작업자만 포함
+        """
+        now = time.time()
+        with self.storage.read() as conn:
+            pending, due, leased, expired = conn.execute(
+                """
+            SELECT COUNT(*),
+                   SUM(next_run <= ? AND lease_owner IS NULL),
+                   SUM(lease_owner IS NOT NULL AND lease_expires > ?),
+                   SUM(lease_owner IS NOT NULL AND lease_expires <= ?)
+            FROM scrape_tasks
+            """,
+                (now, now, now),
+            ).fetchone()
+            rows = conn.execute(
+                """
+            SELECT worker_id, started_at, last_seen, batches, completed, failed,
+                   lost, taken_over, busy_sec
+            FROM queue_workers WHERE last_seen >= ? ORDER BY started_at
+            """,
+                (now - active_within,),
+            ).fetchall()
+
+        workers = []
+        for worker_id, started_at, last_seen, batches, completed, failed, lost, taken_over, busy in rows:
+            finished = completed + failed
+            span = last_seen - started_at
+            workers.append(
+                {
+                    "worker_id": worker_id,
+                    "batches": batches,
+                    "completed": completed,
+                    "failed": failed,
+                    "lost": lost,
+                    "taken_over": taken_over,
+                    "busy_sec": busy,
+                    # 실제 수집 시간 기준 처리량과 가동 시간 기준 처리량
+                    "tasks_per_busy_min": finished / busy * 60 if busy > 0 else 0.0,
+                    "tasks_per_min": finished / span * 60 if span > 0 else 0.0,
+                    "utilization": busy / span if span > 0 else 0.0,
+                }
+            )
+        return {
+            "tasks": pending,
+            "due": due or 0,
+            "leased": leased or 0,
+            "expired_leases": expired or 0,
+            "workers": workers,
+            "total_tasks_per_min": sum(worker["tasks_per_min"] for worker in workers),
+        }
+
+    def summary(self, active_within: float = 3600.0) -> List[str]:
+        """작업 큐 상태와 작업자별 처리량 요약"""
+        stats = self.stats(active_within)
+        lines = [
+            f"작업 {stats['tasks']}개 (수집 대기 {stats['due']}, 임대 중 {stats['leased']}, "
+            f"임대 만료 {stats['expired_leases']})"
+        ]
+        for worker in stats["workers"]:
+            lines.append(
+                f"{worker['worker_id']}: 완료 {worker['completed']}, 실패 {worker['failed']}, "
+                f"임대 만료 {worker['lost']}, 이어받음 {worker['taken_over']} - "
+                f"{worker['tasks_per_min']:.1f}건/분 "
+                f"(수집 중 {worker['tasks_per_busy_min']:.1f}건/분, 가동률 {worker['utilization']:.0%})"
+            )
+        if stats["workers"]:
+            lines.append(
+                f"작업자 {len(stats['workers'])}명 합계 {stats['total_tasks_per_min']:.1f}건/분"
+            )
+        return lines
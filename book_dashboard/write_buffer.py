@@ -0,0 +1,183 @@
+"""
+그룹 커밋 쓰기 버퍼 (스풀 파일로 복구)
+수집 결과마다 트랜잭션을 열고 커밋하지 않고, 결과를 모아 두었다가 한 트랜잭션에서
+executemany로 저장합니다. 모인 행이 max_rows개가 되거나 flush_seconds가 지나면 저장합니다.
+
+스풀:
+    버퍼에 넣는 결과는 먼저 스풀 파일(JSON Lines)에 한 줄씩 덧붙입니다.
+    저장하기 전에 프로세스가 죽으면 다음 시작 때 스풀에서 결과를 다시 읽어 저장합니다.
+    저장 트랜잭션 안에서 마지막으로 저장한 스풀 번호를 observation_meta에 스풀 파일별로 함께 기록하므로,
+    커밋한 뒤 스풀을 비우기 전에 죽어도 같은 결과를 두 번 저장하지 않습니다.
+    번호는 프로세스마다 시각 기준으로 매기므로 다른 스풀(모니터와 작업자)의 기록과 비교하지 않습니다.
+    기본은 운영체제에 쓰기만 하고 fsync하지 않습니다 (프로세스가 죽어도 남음).
+    전원이 나가는 경우까지 지키려면 fsync=True - 저장소의 synchronous=NORMAL과 같은 기준이
+    기본값입니다.
+
+스풀 파일 하나는 프로세스 하나만 씁니다 (다른 프로세스가 쓰고 있으면 시작하지 않음).
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import observations
+
+try:
+    import fcntl
+except ImportError:  # Windows - 스풀 잠금 없이 사용
+    fcntl = None
+
+DEFAULT_MAX_ROWS = 100
+DEFAULT_FLUSH_SECONDS = 10.0
+# 스풀 파일별 마지막으로 저장한 번호의 observation_meta 키 접두어 (뒤에 스풀 파일 이름)
+META_KEY = "write_spool_flushed_through"
+
+
+def meta_key(spool_path: str) -> str:
+    """스풀 파일의 저장 번호 키 (호스트와 컨테이너에서 경로가 달라도 같도록 파일 이름 기준)"""
+    return f"{META_KEY}:{os.path.basename(spool_path)}"
+
+
+class WriteBuffer:
+    def __init__(
+        self,
+        storage,
+        write_batch: Callable[[Any, List[Dict[str, Any]]], None],
+        spool_path: Optional[str] = None,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        flush_seconds: float = DEFAULT_FLUSH_SECONDS,
+        fsync: bool = False,
+    ):
+        """
+        Args:
+            storage: storage.Storage (observation_meta가 있는 데이터베이스)
+            write_batch: (쓰기 트랜잭션 연결, 항목 목록)을 받아 한 번에 저장하는 함수
+            spool_path: 스풀 파일 경로 (None이면 스풀 없이 메모리에만 보관)
+            max_rows: 모이면 바로 저장할 행 수 (항목마다 add의 rows만큼 셈)
+            flush_seconds: 저장 주기(초) - 0이면 항목을 넣을 때마다 저장
+            fsync: 스풀에 쓸 때마다 fsync할지 여부
+        """
+        self.storage = storage
+        self.write_batch = write_batch
+        self.spool_path = spool_path
+        self.max_rows = max(1, max_rows)
+        self.flush_seconds = flush_seconds
+        self.fsync = fsync
+        self.pending: List[Dict[str, Any]] = []
+        self.pending_rows = 0
+        self.last_seq = 0
+        self.last_flush = time.monotonic()
+        # 수집 스레드의 add와 스케줄러의 flush가 겹치지 않도록
+        self._lock = threading.RLock()
+        self._spool = None
+        self.meta_key = meta_key(spool_path) if spool_path else None
+        if spool_path:
+            Path(spool_path).parent.mkdir(parents=True, exist_ok=True)
+            self._spool = open(spool_path, "a", encoding="utf-8")
+            if fcntl is not None:
+                try:
+                    fcntl.flock(self._spool.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    self._spool.close()
+                    raise RuntimeError(f"다른 프로세스가 쓰고 있는 스풀 파일입니다: {spool_path}")
+            self.recover()
+
+    def recover(self):
+        """스풀에 남아 있는 항목 중 아직 저장하지 않은 것을 버퍼로 다시 읽음"""
+        with self.storage.read() as conn:
+            flushed = observations.get_meta(conn, self.meta_key)
+            if flushed is None:
+                # 스풀별 키 이전에 모든 스풀이 함께 쓰던 키
+                flushed = observations.get_meta(conn, META_KEY)
+            flushed = int(flushed or 0)
+        entries = []
+        with open(self.spool_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 쓰는 도중 죽어 잘린 마지막 줄
+                    logging.warning(f"스풀의 읽을 수 없는 줄을 건너뜁니다: {line[:80]!r}")
+                    continue
+                self.last_seq = max(self.last_seq, entry["seq"])
+                if entry["seq"] > flushed:
+                    entries.append(entry)
+                    self.pending_rows += entry.get("rows", 1)
+        if entries:
+            logging.info(f"♻️ 스풀에서 저장하지 못한 결과 {len(entries)}건을 복구했습니다")
+        self.pending = entries
+        # 복구한 항목은 아래 flush에서 저장되고, 그 전에 다시 죽어도 스풀에 그대로 남음
+        if not entries:
+            self._spool.truncate(0)
+
+    def add(self, entry: Dict[str, Any], rows: int = 1) -> bool:
+        """
+        항목을 스풀에 기록하고 버퍼에 추가 (JSON으로 쓸 수 있는 값만)
+
+        Args:
+            entry: write_batch에 넘길 항목
+            rows: 항목이 저장할 행 수 (작업 묶음처럼 여러 행이면 max_rows에 그만큼 반영)
+
+        Returns:
+            max_rows/flush_seconds에 걸려 바로 저장했으면 True
+        """
+        with self._lock:
+            # 재시작해도 번호가 줄지 않도록 시각 기준
+            self.last_seq = max(time.time_ns(), self.last_seq + 1)
+            entry = {"seq": self.last_seq, "rows": rows, **entry}
+            if self._spool is not None:
+                self._spool.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                self._spool.flush()
+                if self.fsync:
+                    os.fsync(self._spool.fileno())
+            self.pending.append(entry)
+            self.pending_rows += rows
+            if self.pending_rows >= self.max_rows or self.due():
+                return self.flush() > 0
+        return False
+
+    def due(self) -> bool:
+        """flush_seconds가 지나 저장할 차례인지"""
+        return time.monotonic() - self.last_flush >= self.flush_seconds
+
+    def flush(self) -> int:
+        """
+        모인 항목을 한 트랜잭션에서 저장하고 스풀 비우기
+
+        저장에 실패하면 항목을 버퍼와 스풀에 남겨 두고 다음 저장 때 다시 시도합니다.
+
+        Returns:
+            저장한 항목 수
+        """
+        with self._lock:
+            self.last_flush = time.monotonic()
+            if not self.pending:
+                return 0
+            entries = self.pending
+            try:
+                with self.storage.write() as conn:
+                    self.write_batch(conn, entries)
+                    if self.meta_key is not None:
+                        observations.set_meta(conn, self.meta_key, entries[-1]["seq"])
+            except Exception as e:
+                logging.error(
+                    f"❌ 버퍼 저장 실패 ({len(entries)}건, 다음 주기에 재시도): {e}", exc_info=True
+                )
+                return 0
+            self.pending = []
+            self.pending_rows = 0
+            if self._spool is not None:
+                self._spool.truncate(0)
+            return len(entries)
+
+    def close(self):
+        """남은 항목 저장 후 스풀 파일 닫기"""
+        with self._lock:
+            self.flush()
+            if self._spool is not None:
+                self._spool.close()
+                self._spool = None
@@ -13,6 +13,28 @@ import json
 from pathlib import Path
 
 
+# (서점, 지표) → 화면에 쓰는 컬럼 이름 (book_dashboard/observations.py의 metric_key와 같음)
+METRIC_COLUMNS = {
+    ("kyobobook", "domestic_rank"): "kyobo_domestic_rank",
+    ("kyobobook", "it_rank"): "kyobo_it_rank",
+    ("yes24", "sales_index"): "yes24_sales_index",
+    ("yes24", "it_mobile_rank"): "yes24_it_mobile_rank",
+    ("aladin", "computer_weekly_rank"): "aladin_computer_weekly_rank",
+    ("aladin", "textbook_rank"): "aladin_textbook_rank",
+    ("aladin", "sales_point"): "aladin_sales_point",
+    ("aladin", "rank_period"): "aladin_rank_period",
+}
+
+
+# 이보다 긴 기간은 시간 집계, HOURLY_DAYS일보다 길면 일 집계 (book_dashboard/rollups.py와 같음)
+RAW_HOURS = 48
+HOURLY_DAYS = 31
+
+
+def metric_column(store, metric):
+    return METRIC_COLUMNS.get((store, metric), f"{store}_{metric}")
+
+
 class BookRankingDashboard:
     def __init__(self, db_path="book_rankings.db"):
         """대시보드 초기화"""
@@ -22,106 +44,116 @@ class BookRankingDashboard:
         """데이터베이스 연결"""
         return sqlite3.connect(self.db_path)
 
-    def load_data(self, hours=24):
-        """데이터 로드"""
+    def get_books(self):
+        """도서 목록 [(id, 이름), ...] (기본 도서가 먼저)"""
         conn = self.get_connection()
-
-        since = datetime.now() - timedelta(hours=hours)
-
-        query = """
-        SELECT 
-            timestamp,
-            kyobo_domestic_rank,
-            kyobo_it_rank,
-            yes24_sales_index,
-            yes24_it_mobile_rank,
-            aladin_computer_weekly_rank,
-            aladin_textbook_rank,
-            aladin_sales_point,
-            aladin_rank_period
-        FROM book_rankings 
-        WHERE timestamp >= ? 
-        ORDER BY timestamp
-        """
-
-        df = pd.read_sql_query(query, conn, params=(since,))
+        rows = conn.execute(
+            "SELECT id, COALESCE(title, key) FROM books ORDER BY key != 'default', id"
+        ).fetchall()
         conn.close()
+        return rows
 
-        # 타임스탬프를 datetime으로 변환
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-
-        return df
+    def load_data(self, book_id, hours=24):
+        """
+        데이터 로드 (hours가 0이면 전체)
 
-    def load_all_data(self):
-        """전체 데이터 로드"""
+        관측값 (시각, 서점, 지표, 값)을 도서·기간 기본 키 범위로 읽어
+        시각별 한 행, 지표별 한 컬럼으로 펼칩니다.
+        RAW_HOURS보다 긴 기간은 시간/일 집계(숫자 지표는 평균, 문자열 지표는 마지막 값)를 읽습니다.
+        """
         conn = self.get_connection()
 
-        query = """
-        SELECT 
-            *
-        FROM book_rankings 
-        ORDER BY timestamp
-        """
+        since = datetime.now() - timedelta(hours=hours) if hours else ""
 
-        df = pd.read_sql_query(query, conn)
+        if hours and hours <= RAW_HOURS:
+            query = """
+            SELECT ts AS timestamp, store, metric, value
+            FROM observations
+            WHERE book_id = ? AND ts >= ?
+            ORDER BY ts
+            """
+        else:
+            table = (
+                "observations_hourly"
+                if hours and hours <= HOURLY_DAYS * 24
+                else "observations_daily"
+            )
+            if since:
+                since = since.strftime("%Y-%m-%d %H:00:00")
+            query = f"""
+            SELECT bucket AS timestamp, store, metric,
+                   CASE WHEN sum_value IS NOT NULL THEN ROUND(sum_value * 1.0 / n, 2)
+                        ELSE last_value END AS value
+            FROM {table}
+            WHERE book_id = ? AND bucket >= ?
+            ORDER BY bucket
+            """
+
+        long_df = pd.read_sql_query(query, conn, params=(book_id, since))
         conn.close()
 
+        if long_df.empty:
+            return pd.DataFrame(columns=["timestamp", *METRIC_COLUMNS.values()])
+
+        long_df["column"] = [
+            metric_column(store, metric)
+            for store, metric in zip(long_df["store"], long_df["metric"])
+        ]
+        df = long_df.pivot(index="timestamp", columns="column", values="value")
+        df = df.reset_index().rename_axis(columns=None)
+        for column in METRIC_COLUMNS.values():
+            if column not in df.columns:
+                df[column] = None
+            elif column != "aladin_rank_period":
+                df[column] = pd.to_numeric(df[column], errors="coerce")
+
         # 타임스탬프를 datetime으로 변환
         df["timestamp"] = pd.to_datetime(df["timestamp"])
 
         return df
 
-    def get_latest_data(self):
-        """최신 데이터 조회"""
+    def get_latest_data(self, book_id):
+        """최신 데이터 조회 (지표별 마지막 값)"""
         conn = self.get_connection()
 
         query = """
-        SELECT * FROM book_rankings 
-        ORDER BY timestamp DESC 
-        LIMIT 1
+        SELECT store, metric, ts, value FROM latest_observations
+        WHERE book_id = ?
         """
 
-        result = conn.execute(query).fetchone()
+        rows = conn.execute(query, (book_id,)).fetchall()
         conn.close()
 
-        if result:
-            columns = [
-                "id",
-                "timestamp",
-                "scraping_date",
-                "kyobo_domestic_rank",
-                "kyobo_it_rank",
-                "kyobo_error",
-                "yes24_sales_index",
-                "yes24_it_mobile_rank",
-                "yes24_error",
-                "aladin_computer_weekly_rank",
-                "aladin_textbook_rank",
-                "aladin_sales_point",
-                "aladin_rank_period",
-                "aladin_error",
-                "raw_data",
-                "created_at",
-            ]
-            return dict(zip(columns, result))
+        if rows:
+            latest = {column: None for column in METRIC_COLUMNS.values()}
+            for store, metric, _, value in rows:
+                latest[metric_column(store, metric)] = value
+            latest["timestamp"] = max(ts for _, _, ts, _ in rows)
+            return latest
         return None
 
-    def get_stats(self):
-        """통계 정보"""
+    def get_stats(self, book_id):
+        """통계 정보 (도서의 관측 시각 수)"""
         conn = self.get_connection()
 
-        # 총 레코드 수
-        total_records = conn.execute("SELECT COUNT(*) FROM book_rankings").fetchone()[0]
-
-        # 최신/최오래된 데이터
-        oldest, newest = conn.execute(
-            "SELECT MIN(timestamp), MAX(timestamp) FROM book_rankings"
+        # 총 레코드 수, 최신/최오래된 데이터
+        total_records, oldest, newest = conn.execute(
+            "SELECT COUNT(DISTINCT ts), MIN(ts), MAX(ts) FROM observations WHERE book_id = ?",
+            (book_id,),
+        ).fetchone()
+        # 보관 기간이 지나 지운 관측 시각 (book_dashboard/rollups.py의 prune이 기록)
+        pruned = conn.execute(
+            "SELECT records, oldest FROM observations_pruned WHERE book_id = ?", (book_id,)
         ).fetchone()
+        if pruned:
+            total_records += pruned[0]
+            oldest = pruned[1]
 
         # 최근 24시간 데이터 수
         since_24h = datetime.now() - timedelta(hours=24)
         recent_24h = conn.execute(
-            "SELECT COUNT(*) FROM book_rankings WHERE timestamp >= ?", (since_24h,)
+            "SELECT COUNT(DISTINCT ts) FROM observations WHERE book_id = ? AND ts >= ?",
+            (book_id, since_24h),
         ).fetchone()[0]
 
         conn.close()
@@ -159,6 +191,7 @@ def main():
         "최근 24시간": 24,
         "최근 48시간": 48,
         "최근 7일": 168,
+        "최근 30일": 720,
         "전체 데이터": 0,
     }
 
@@ -167,6 +200,23 @@ def main():
     )
     hours = time_options[selected_time]
 
+    # 도서 선택
+    try:
+        books = dashboard.get_books()
+    except Exception as e:
+        st.error(f"도서 목록을 읽을 수 없습니다: {e}")
+        st.info(
+            "먼저 `uv run book_ranking_monitor.py --once` 명령으로 데이터를 수집해주세요."
+        )
+        return
+    if not books:
+        st.warning("등록된 도서가 없습니다.")
+        return
+    book_names = dict(books)
+    book_id = st.sidebar.selectbox(
+        "도서", list(book_names), format_func=lambda key: book_names[key]
+    )
+
     # 자동 새로고침
     auto_refresh = st.sidebar.checkbox("자동 새로고침 (30초)", value=True)
 
@@ -175,13 +225,10 @@ def main():
 
     # 데이터 로드
     try:
-        if hours == 0:
-            df = dashboard.load_all_data()
-        else:
-            df = dashboard.load_data(hours)
+        df = dashboard.load_data(book_id, hours)
 
-        latest_data = dashboard.get_latest_data()
-        stats = dashboard.get_stats()
+        latest_data = dashboard.get_latest_data(book_id)
+        stats = dashboard.get_stats(book_id)
 
     except Exception as e:
         st.error(f"데이터를 로드할 수 없습니다: {e}")